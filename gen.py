@@ -16,7 +16,9 @@ standard_libs = set(sys.builtin_module_names)  # Built-in modules are included h
 # Extend with more standard library modules
 standard_libs.update({
     "datetime", "math", "os", "sys", "logging", "json", "socket", "platform", "unittest", "collections", "subprocess",
-    "argparse", "csv", "hashlib", "http", "itertools", "pickle", "random", "re", "struct", "time", "uuid", "shutil", "zipfile"
+    "argparse", "csv", "hashlib", "http", "itertools", "pickle", "random", "re", "struct", "time", "uuid", "shutil", "zipfile",
+    "asyncio", "array", "ipaddress", "xml.etree.ElementTree", "concurrent.futures",
+    "sqlite3", "tempfile", "signal", "ssl", "select", "mmap", "bisect", "atexit", "threading"
     # Add any additional modules from Python's standard library here
 })
 
@@ -79,8 +81,9 @@ def find_all_imports_in_directory(directory):
     return all_imports
 
 def filter_third_party_imports(imports):
-    """Filter out the standard library modules from the imports."""
-    return {pkg for pkg in imports if pkg not in standard_libs}
+    """Filter out the standard library modules and the toolkit's own scripts from the imports."""
+    local_modules = {os.path.splitext(file)[0] for file in os.listdir(scripts_directory) if file.endswith(".py")}
+    return {pkg for pkg in imports if pkg not in standard_libs and pkg not in local_modules}
 
 def detect_environment_and_install(package):
     """Install a package based on the detected environment."""
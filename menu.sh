@@ -325,8 +325,10 @@ done <<< "$banner"
              "\t9. HTTP Request\n" \
              "\t10. Logs Viewer\n" \
              "\t11. Virus Scanner\n" \
-             "\t12. Install Required Modules\n" \
-             "\t13. Auto Update Script\n" \
+             "\t12. ASN Lookup\n" \
+             "\t13. DNS Resolver\n" \
+             "\t14. Install Required Modules\n" \
+             "\t15. Auto Update Script\n" \
              "\t0. Exit"
 
         echo -e "\n${DARK_RESET}Enter your choice: "
@@ -344,8 +346,10 @@ done <<< "$banner"
             9) run_script "http_request.py" ;;
             10) run_script "logs_viewer.py" ;;
             11) run_script "clam_av.py" ;;
-            12) run_modules "gen.py" ;;
-            13) auto_update ;;
+            12) run_script "asn_lookup.py" ;;
+            13) run_script "dns_resolver.py" ;;
+            14) run_modules "gen.py" ;;
+            15) auto_update ;;
             0) 
     clear
     echo -e "${DARK_GREEN}Exiting...${DARK_RESET}"
@@ -0,0 +1,150 @@
+import ipaddress
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+
+import asn_lookup  # noqa: E402
+
+
+class BruteForce:
+    """Longest-prefix match by trying every prefix length, longest first."""
+
+    def __init__(self, rows):
+        self.tables = {4: {}, 6: {}}
+        for prefix, asn, org in rows:
+            network = ipaddress.ip_network(prefix, strict=False)
+            bits = network.max_prefixlen
+            key = int(network.network_address) >> (bits - network.prefixlen)
+            # Later lines win, as in build_asn_database
+            self.tables[network.version].setdefault(network.prefixlen, {})[key] = (str(network), asn, org)
+
+    def lookup(self, ip):
+        address = ipaddress.ip_address(ip)
+        bits = address.max_prefixlen
+        table = self.tables[address.version]
+        for length in sorted(table, reverse=True):
+            match = table[length].get(int(address) >> (bits - length))
+            if match:
+                return {"prefix": match[0], "asn": match[1], "org": match[2]}
+        return None
+
+
+class AsnTrieTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="asn_trie_")
+        self.source = os.path.join(self.directory, "prefixes.csv")
+        self.path = os.path.join(self.directory, "asn.db")
+
+    def tearDown(self):
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def build(self, rows):
+        with open(self.source, "w", encoding="utf-8") as source:
+            source.write("prefix,asn,org\n")
+            source.writelines(f"{prefix},{asn},{org}\n" for prefix, asn, org in rows)
+        asn_lookup.build_asn_database(self.source, self.path)
+        database = asn_lookup.AsnDatabase(self.path)
+        self.addCleanup(database.close)
+        return database
+
+    def test_matches_brute_force(self):
+        rng = random.Random(20240517)
+        rows = []
+        networks = []
+        for index in range(3000):
+            version = 4 if rng.random() < 0.7 else 6
+            bits = 32 if version == 4 else 128
+            if networks and rng.random() < 0.4:
+                # Nest inside (or duplicate) an earlier prefix of the same family
+                parent = rng.choice([network for network in networks if network.version == version] or [None])
+            else:
+                parent = None
+            if parent is None:
+                length = rng.randint(8, 24) if version == 4 else rng.randint(16, 64)
+                address = rng.getrandbits(bits)
+            else:
+                length = rng.randint(parent.prefixlen, min(parent.prefixlen + 16, bits))
+                address = int(parent.network_address) | rng.getrandbits(bits - parent.prefixlen)
+            network = (ipaddress.IPv4Network if version == 4 else ipaddress.IPv6Network)((address, length), strict=False)
+            networks.append(network)
+            rows.append((str(network), 64512 + index, f"ORG-{index}"))
+        database = self.build(rows)
+        reference = BruteForce(rows)
+
+        addresses = []
+        for _ in range(20000):
+            choice = rng.random()
+            network = rng.choice(networks)
+            bits = network.max_prefixlen
+            if choice < 0.5:
+                value = int(network.network_address) | rng.getrandbits(bits - network.prefixlen)
+            elif choice < 0.8:
+                # First and last addresses of a prefix, and the ones just outside it
+                value = int(rng.choice((network.network_address, network.broadcast_address)))
+                value = (value + rng.choice((-1, 0, 1))) % (1 << bits)
+            else:
+                value = rng.getrandbits(bits)
+            addresses.append(str((ipaddress.IPv4Address if bits == 32 else ipaddress.IPv6Address)(value)))
+        hits = 0
+        for address in addresses:
+            expected = reference.lookup(address)
+            self.assertEqual(database.lookup(address), expected, address)
+            hits += expected is not None
+        self.assertGreater(hits, 10000)
+
+    def test_edge_cases(self):
+        database = self.build([
+            ("0.0.0.0/0", 1, "DEFAULT4"),
+            ("::/0", 2, "DEFAULT6"),
+            ("10.0.0.0/8", 10, "TEN"),
+            ("10.1.0.0/16", 11, "TEN-ONE"),
+            ("10.1.2.0/24", 12, "TEN-ONE-TWO"),
+            ("10.1.2.3/32", 13, "HOST"),
+            ("10.1.2.3/32", 14, "HOST-LATER"),
+            ("192.0.2.0/24", 20, "DOC"),
+            ("2001:db8::/32", 30, "DOC6"),
+            ("2001:db8:0:1::/64", 31, "DOC6-SUBNET"),
+            ("2001:db8::1/128", 32, "DOC6-HOST"),
+            ("255.255.255.255/32", 40, "BROADCAST"),
+        ])
+
+        def owner(ip):
+            match = database.lookup(ip)
+            return match and (match["prefix"], match["asn"])
+
+        self.assertEqual(owner("8.8.8.8"), ("0.0.0.0/0", 1))
+        self.assertEqual(owner("10.200.0.1"), ("10.0.0.0/8", 10))
+        self.assertEqual(owner("10.1.3.1"), ("10.1.0.0/16", 11))
+        self.assertEqual(owner("10.1.2.2"), ("10.1.2.0/24", 12))
+        self.assertEqual(owner("10.1.2.3"), ("10.1.2.3/32", 14))
+        self.assertEqual(owner("10.1.2.4"), ("10.1.2.0/24", 12))
+        self.assertEqual(owner("255.255.255.255"), ("255.255.255.255/32", 40))
+        self.assertEqual(owner("255.255.255.254"), ("0.0.0.0/0", 1))
+        self.assertEqual(owner("2001:db8::1"), ("2001:db8::1/128", 32))
+        self.assertEqual(owner("2001:db8::2"), ("2001:db8::/32", 30))
+        self.assertEqual(owner("2001:db8:0:1::5"), ("2001:db8:0:1::/64", 31))
+        self.assertEqual(owner("2001:db9::1"), ("::/0", 2))
+        self.assertEqual(owner("fe80::1%eth0"), ("::/0", 2))
+        # IPv4-mapped IPv6 addresses are looked up as the IPv4 address they carry
+        self.assertEqual(owner("::ffff:10.1.2.3"), ("10.1.2.3/32", 14))
+        self.assertEqual(owner("::ffff:192.0.2.7"), ("192.0.2.0/24", 20))
+        self.assertIsNone(database.lookup("not an address"))
+
+    def test_without_default_route(self):
+        database = self.build([("192.0.2.0/25", 1, "LOW"), ("192.0.2.128/25", 2, "HIGH"), ("2001:db8::/48", 3, "")])
+        self.assertEqual(database.lookup("192.0.2.127")["asn"], 1)
+        self.assertEqual(database.lookup("192.0.2.128")["asn"], 2)
+        self.assertIsNone(database.lookup("192.0.3.0"))
+        self.assertIsNone(database.lookup("192.0.1.255"))
+        self.assertIsNone(database.lookup("2001:db8:1::"))
+        self.assertEqual(database.lookup("2001:db8::ffff"), {"prefix": "2001:db8::/48", "asn": 3, "org": ""})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,236 @@
+import asyncio
+import os
+import socket
+import struct
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+
+import dns_resolver  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "dns")
+
+
+def fixture(name):
+    """Wire-format message from a hex fixture; '#' lines are comments."""
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as handle:
+        return bytes.fromhex("".join(line for line in handle if not line.startswith("#")))
+
+
+def soa_record(ttl=3600, minimum=900):
+    # mname/rname point back at the question name (offset 12), as servers usually compress them
+    rdata = b"\x02ns\xc0\x0c" + b"\x0ahostmaster\xc0\x0c" + struct.pack("!IIIII", 2024010101, 7200, 3600, 1209600, minimum)
+    return dns_resolver.TYPE_SOA, ttl, rdata
+
+
+def response(query, rcode=0, answers=(), authority=()):
+    """A reply to `query` whose records all name the question (pointer 0xc00c)."""
+    question_end = query.index(b"\x00", 12) + 5
+    header = query[:2] + struct.pack("!HHHHH", 0x8180 | rcode, 1, len(answers), len(authority), 0)
+    body = b"".join(b"\xc0\x0c" + struct.pack("!HHIH", rtype, 1, ttl, len(rdata)) + rdata
+                    for rtype, ttl, rdata in list(answers) + list(authority))
+    return header + query[12:question_end] + body
+
+
+class FakeNameserver(asyncio.DatagramProtocol):
+    """Answers from a {(name, qtype): (rcode, answers, authority)} table; anything else gets SERVFAIL."""
+
+    def __init__(self, zone):
+        self.zone = zone
+        self.queries = []
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        name, offset = dns_resolver.read_name(data, 12)
+        qtype = struct.unpack_from("!H", data, offset)[0]
+        self.queries.append((name, qtype))
+        reply = self.zone.get((name, qtype), (2, (), ()))
+        if isinstance(reply, bytes):
+            self.transport.sendto(data[:2] + reply[2:], addr)  # a recorded reply, under this query's ID
+        else:
+            self.transport.sendto(response(data, *reply), addr)
+
+
+ZONE = {
+    ("exists.test", dns_resolver.TYPE_A): (0, [(dns_resolver.TYPE_A, 300, socket.inet_aton("192.0.2.1"))], []),
+    ("exists.test", dns_resolver.TYPE_AAAA): (0, [], [soa_record()]),
+    ("missing.test", dns_resolver.TYPE_A): (dns_resolver.RCODE_NXDOMAIN, [], [soa_record()]),
+    ("missing.test", dns_resolver.TYPE_AAAA): (dns_resolver.RCODE_NXDOMAIN, [], [soa_record()]),
+    ("1.2.0.192.in-addr.arpa", dns_resolver.TYPE_PTR): (dns_resolver.RCODE_NXDOMAIN, [], [soa_record()]),
+    ("www.example.com", dns_resolver.TYPE_A): fixture("cname_a.hex"),
+    ("missing.example.com", dns_resolver.TYPE_A): fixture("nxdomain_soa.hex"),
+    ("example.com", 16): fixture("truncated.hex"),
+    ("cut.example.com", dns_resolver.TYPE_A): fixture("cname_a.hex")[:60],
+}
+
+
+async def with_resolver(test):
+    loop = asyncio.get_running_loop()
+    transport, server = await loop.create_datagram_endpoint(lambda: FakeNameserver(ZONE), local_addr=("127.0.0.1", 0))
+    resolver = dns_resolver.Resolver(nameservers=[transport.get_extra_info("sockname")], cache=dns_resolver.DnsCache(),
+                                     timeout=0.5)
+    resolver.ndots = 1
+    fallbacks = []
+
+    async def system_query(name, qtype):
+        fallbacks.append((name, qtype))
+        return [], dns_resolver.NEGATIVE_TTL
+
+    resolver._system_query = system_query
+    try:
+        return await test(resolver, server, fallbacks)
+    finally:
+        transport.close()
+
+
+class NegativeAnswerTest(unittest.TestCase):
+    def test_nodata_and_nxdomain_are_final(self):
+        async def test(resolver, server, fallbacks):
+            self.assertEqual(await resolver.resolve("exists.test"), ("192.0.2.1", socket.AF_INET))
+            with self.assertRaises(socket.gaierror):
+                await resolver.resolve("missing.test")
+            self.assertIsNone(await resolver.reverse("192.0.2.1"))
+            return fallbacks
+
+        self.assertEqual(asyncio.run(with_resolver(test)), [])
+
+    def test_negative_answers_cached_for_soa_ttl(self):
+        async def test(resolver, server, fallbacks):
+            for attempt in range(2):
+                with self.assertRaises(socket.gaierror):
+                    await resolver.resolve("missing.test")
+                await resolver.resolve("exists.test")
+                if attempt == 0:
+                    queries = len(server.queries)
+            self.assertEqual(len(server.queries), queries)
+            return resolver.cache.entries
+
+        entries = asyncio.run(with_resolver(test))
+        now = time.time()
+        self.assertAlmostEqual(entries[("missing.test", dns_resolver.TYPE_A)][0] - now, 900, delta=5)
+        self.assertAlmostEqual(entries[("exists.test", dns_resolver.TYPE_AAAA)][0] - now, 900, delta=5)
+        self.assertAlmostEqual(entries[("exists.test", dns_resolver.TYPE_A)][0] - now, 300, delta=5)
+
+    def test_fallback_only_without_an_answer(self):
+        async def test(resolver, server, fallbacks):
+            await resolver.query("servfail.test", dns_resolver.TYPE_A)
+            await resolver.query("printer.local", dns_resolver.TYPE_A)
+            await resolver.query("intranet", dns_resolver.TYPE_A)
+            return fallbacks, server.queries
+
+        fallbacks, queries = asyncio.run(with_resolver(test))
+        self.assertEqual(fallbacks, [("servfail.test", dns_resolver.TYPE_A), ("printer.local", dns_resolver.TYPE_A),
+                                     ("intranet", dns_resolver.TYPE_A)])
+        self.assertEqual({name for name, _ in queries}, {"servfail.test"})
+
+
+class MessageTest(unittest.TestCase):
+    def test_build_query(self):
+        question = fixture("cname_a.hex")[12:33]
+        self.assertEqual(dns_resolver.build_query("www.example.com.", dns_resolver.TYPE_A, 0x1A2B),
+                         bytes.fromhex("1a2b 0100 0001 0000 0000 0000") + question)
+        query = dns_resolver.build_query("bücher.example", dns_resolver.TYPE_AAAA, 1)
+        self.assertEqual(dns_resolver.read_name(query, 12), ("xn--bcher-kva.example", len(query) - 4))
+
+    def test_compressed_names(self):
+        data = fixture("cname_a.hex")
+        self.assertEqual(dns_resolver.read_name(data, 12), ("www.example.com", 29))
+        # CNAME rdata: a label followed by a pointer into the question
+        self.assertEqual(dns_resolver.read_name(data, 45), ("edge.example.com", 52))
+        self.assertEqual(dns_resolver.read_name(data, 52), ("edge.example.com", 54))
+        data = fixture("nxdomain_soa.hex")
+        self.assertEqual(dns_resolver.read_name(data, 49), ("ns.icann.org", 63))
+        self.assertEqual(dns_resolver.read_name(data, 63), ("noc.dns.icann.org", 73))
+        with self.assertRaises(ValueError):
+            dns_resolver.read_name(data[:12] + b"\xc0\x0c", 12)
+
+    def test_cname_chain(self):
+        # Only A records are kept, with the smallest TTL along the chain
+        self.assertEqual(dns_resolver.parse_response(fixture("cname_a.hex"), dns_resolver.TYPE_A),
+                         (0, ["93.184.216.34", "93.184.216.35"], 60))
+        self.assertEqual(dns_resolver.parse_response(fixture("cname_a.hex"), dns_resolver.TYPE_AAAA),
+                         (0, [], dns_resolver.NEGATIVE_TTL))
+
+    def test_nxdomain_negative_ttl(self):
+        # min(SOA TTL 3600, MINIMUM 1800)
+        self.assertEqual(dns_resolver.parse_response(fixture("nxdomain_soa.hex"), dns_resolver.TYPE_A),
+                         (dns_resolver.RCODE_NXDOMAIN, [], 1800))
+
+    def test_truncated(self):
+        data = fixture("truncated.hex")
+        self.assertEqual(dns_resolver.parse_response(data, 16), (0, [], dns_resolver.NEGATIVE_TTL))
+        # A datagram cut short anywhere past the header is rejected, never misread or crashing
+        data = fixture("cname_a.hex")
+        for end in range(13, len(data) - 11):
+            with self.assertRaises((ValueError, struct.error)):
+                dns_resolver.parse_response(data[:end], dns_resolver.TYPE_A)
+
+    def test_recorded_replies_through_the_resolver(self):
+        async def test(resolver, server, fallbacks):
+            self.assertEqual(await resolver.query("www.example.com", dns_resolver.TYPE_A),
+                             ["93.184.216.34", "93.184.216.35"])
+            self.assertEqual(await resolver.query("missing.example.com", dns_resolver.TYPE_A), [])
+            await resolver.query("example.com", 16)
+            await resolver.query("cut.example.com", dns_resolver.TYPE_A)
+            return fallbacks, resolver.cache.entries
+
+        fallbacks, entries = asyncio.run(with_resolver(test))
+        # TC and unparseable replies count as no answer
+        self.assertEqual(fallbacks, [("example.com", 16), ("cut.example.com", dns_resolver.TYPE_A)])
+        now = time.time()
+        self.assertAlmostEqual(entries[("www.example.com", dns_resolver.TYPE_A)][0] - now, 60, delta=5)
+        self.assertAlmostEqual(entries[("missing.example.com", dns_resolver.TYPE_A)][0] - now, 1800, delta=5)
+
+
+class DnsCacheTest(unittest.TestCase):
+    def test_expiry(self):
+        cache = dns_resolver.DnsCache()
+        with mock.patch.object(dns_resolver.time, "time", return_value=1000.0) as clock:
+            cache.put(("a.test", 1), ["192.0.2.1"], 30)
+            cache.put(("b.test", 1), [], 10 ** 9)
+            cache.put(("c.test", 1), ["192.0.2.3"], -5)
+            self.assertEqual(cache.entries[("b.test", 1)][0], 1000.0 + dns_resolver.MAX_TTL)
+            self.assertIsNone(cache.get(("c.test", 1)))
+            clock.return_value = 1029.9
+            self.assertEqual(cache.get(("a.test", 1)), ["192.0.2.1"])
+            self.assertEqual(cache.get(("b.test", 1)), [])
+            clock.return_value = 1030.0
+            self.assertIsNone(cache.get(("a.test", 1)))
+            self.assertNotIn(("a.test", 1), cache.entries)
+
+    def test_lru_eviction(self):
+        cache = dns_resolver.DnsCache(max_entries=2)
+        cache.put(("a.test", 1), ["192.0.2.1"], 60)
+        cache.put(("b.test", 1), ["192.0.2.2"], 60)
+        cache.get(("a.test", 1))
+        cache.put(("c.test", 1), ["192.0.2.3"], 60)
+        self.assertEqual(list(cache.entries), [("a.test", 1), ("c.test", 1)])
+        cache.put(("a.test", 1), ["192.0.2.9"], 60)
+        cache.put(("d.test", 1), [], 60)
+        self.assertEqual(list(cache.entries), [("a.test", 1), ("d.test", 1)])
+
+    def test_save_skips_expired(self):
+        directory = tempfile.mkdtemp(prefix="dns_cache_")
+        path = os.path.join(directory, "cache.json")
+        try:
+            cache = dns_resolver.DnsCache()
+            cache.put(("a.test", 1), ["192.0.2.1"], 60)
+            cache.put(("b.test", 28), [], 60)
+            cache.put(("c.test", 1), ["192.0.2.3"], 0)
+            cache.save(path)
+            loaded = dns_resolver.DnsCache()
+            self.assertEqual(loaded.load(path), 2)
+            self.assertEqual(loaded.get(("b.test", 28)), [])
+        finally:
+            os.remove(path)
+            os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
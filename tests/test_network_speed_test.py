@@ -0,0 +1,151 @@
+import math
+import os
+import select
+import socket
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+
+import network_speed_test  # noqa: E402
+
+
+class SpeedHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="speed_history_")
+        for index in range(5):
+            network_speed_test.record_speed_result(self.directory, timestamp=1000 + index,
+                                                   download_mbps=10 + index, ping_ms=5)
+
+    def tearDown(self):
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def test_missing_column_keeps_history(self):
+        os.remove(os.path.join(self.directory, "ping_ms.f"))
+        network_speed_test.record_speed_result(self.directory, timestamp=1010, download_mbps=99, ping_ms=7)
+        history = network_speed_test.load_history(0, 2000, directory=self.directory)
+        self.assertEqual(list(history["timestamp"]), [1000, 1001, 1002, 1003, 1004, 1010])
+        self.assertEqual(list(history["download_mbps"]), [10, 11, 12, 13, 14, 99])
+        self.assertTrue(all(math.isnan(value) for value in history["ping_ms"][:5]))
+        self.assertEqual(history["ping_ms"][5], 7)
+
+    def test_long_and_short_columns_fit_the_timestamps(self):
+        with open(os.path.join(self.directory, "upload_mbps.f"), "ab") as column_file:
+            column_file.write(b"\0" * 8)  # two stray rows from an interrupted write
+        with open(os.path.join(self.directory, "download_mbps.f"), "r+b") as column_file:
+            column_file.truncate(3 * 4)
+        network_speed_test.record_speed_result(self.directory, timestamp=1005, download_mbps=20)
+        history = network_speed_test.load_history(0, 2000, directory=self.directory)
+        self.assertEqual(len(history["timestamp"]), 6)
+        self.assertEqual(len(history["upload_mbps"]), 6)
+        self.assertEqual(list(history["download_mbps"][:3]), [10, 11, 12])
+        self.assertTrue(math.isnan(history["download_mbps"][3]) and math.isnan(history["download_mbps"][4]))
+        self.assertEqual(history["download_mbps"][5], 20)
+
+
+class UdpStatsTest(unittest.TestCase):
+    def test_rfc3550_jitter(self):
+        stats = network_speed_test._new_udp_stats()
+        # Transit times of 1000, 3000, 2000 and 2000 ns: J += (|D| - J) / 16
+        for seq, arrival in enumerate((1000, 3000, 2000, 2000)):
+            network_speed_test._update_udp_stats(stats, seq, 0, arrival)
+        self.assertEqual(stats["jitter_ns"], 168.45703125)
+        self.assertEqual((stats["received"], stats["reordered"], stats["duplicates"]), (4, 0, 0))
+
+    def test_loss_reorder_and_duplicates(self):
+        stats = network_speed_test._new_udp_stats()
+        for seq in (0, 1, 3, 2, 3, 6, 2, 5):
+            network_speed_test._update_udp_stats(stats, seq, 0, 0)
+        self.assertEqual((stats["received"], stats["highest"], stats["reordered"], stats["duplicates"]), (6, 6, 2, 2))
+        # Older than the duplicate window: counted as late, not as a duplicate
+        network_speed_test._update_udp_stats(stats, network_speed_test.UDP_DUP_WINDOW + 10, 0, 0)
+        network_speed_test._update_udp_stats(stats, 1, 0, 0)
+        self.assertEqual((stats["received"], stats["reordered"], stats["duplicates"]), (8, 3, 2))
+
+
+class ImpairedRelay:
+    """Forward datagrams between one client and the server, dropping, holding back and duplicating chosen ones.
+
+    Data datagrams are re-stamped as they leave, with `delay(seq)` nanoseconds
+    taken off the sender clock, so the server sees a known transit pattern.
+    """
+
+    def __init__(self, server, drop, hold, duplicate, delay):
+        self.server, self.drop, self.hold, self.duplicate, self.delay = server, drop, hold, duplicate, delay
+        self.front = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.front.bind(("127.0.0.1", 0))
+        self.back = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.back.connect(server)
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def forward(self, data):
+        data = bytearray(data)
+        magic, kind, seq, _ = network_speed_test.UDP_HEADER.unpack_from(data)
+        if kind == network_speed_test.UDP_DATA:
+            network_speed_test.UDP_HEADER.pack_into(data, 0, magic, kind, seq, time.perf_counter_ns() - self.delay(seq))
+        self.back.send(data)
+
+    def run(self):
+        client = None
+        held = {}
+        while not self.stop.is_set():
+            readable, _, _ = select.select([self.front, self.back], [], [], 0.1)
+            if self.back in readable:
+                data = self.back.recv(65535)
+                if client is not None:
+                    self.front.sendto(data, client)
+            if self.front in readable:
+                data, client = self.front.recvfrom(65535)
+                seq = network_speed_test.UDP_HEADER.unpack_from(data)[2]
+                if data[4] != network_speed_test.UDP_DATA or seq not in self.drop | set(self.hold):
+                    self.forward(data)
+                    if data[4] == network_speed_test.UDP_DATA and seq in self.duplicate:
+                        self.forward(data)
+                elif seq in self.hold:
+                    held[self.hold[seq]] = data
+                if seq in held:
+                    self.forward(held.pop(seq))
+
+    def close(self):
+        self.stop.set()
+        self.thread.join()
+        self.front.close()
+        self.back.close()
+
+
+class UdpLoopbackTest(unittest.TestCase):
+    def test_report_counts_injected_impairments(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        server.bind(("127.0.0.1", 0))
+        stop = threading.Event()
+        serving = threading.Thread(target=network_speed_test.serve_udp, args=(server, stop), daemon=True)
+        serving.start()
+        # Drop 10, 11 and 50; deliver 20 after 23 and 40 after 41; send 30 twice. Transit alternates
+        # between +0 and +4 ms, so every |D| is 4 ms and the jitter estimate converges on it
+        relay = ImpairedRelay(server.getsockname(), drop={10, 11, 50}, hold={20: 23, 40: 41}, duplicate={30},
+                              delay=lambda seq: 4000000 * (seq % 2))
+        try:
+            result = network_speed_test.run_udp_client("127.0.0.1", relay.front.getsockname()[1], bitrate_mbps=0.4,
+                                                       duration=1.0, quiet=True, record=False)
+        finally:
+            relay.close()
+            stop.set()
+            serving.join()
+            server.close()
+        self.assertGreater(result["sent"], 200)
+        self.assertEqual(result["lost"], 3)
+        self.assertEqual(result["received"], result["sent"] - 3)
+        self.assertEqual(result["reordered"], 2)
+        self.assertEqual(result["duplicates"], 1)
+        self.assertAlmostEqual(result["jitter_ms"], 4.0, delta=0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+import asyncio
+import io
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+
+import port_scanner  # noqa: E402
+
+CERTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "certs")
+
+
+def certificate(name):
+    with open(os.path.join(CERTS, name), "rb") as handle:
+        return handle.read()
+
+NMAP_XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<nmaprun scanner="nmap" args="nmap -oX - -p 1-1000 gateway.test 192.0.2.9" version="7.94">
+<host><status state="up" reason="syn-ack"/>
+<address addr="192.0.2.1" addrtype="ipv4"/>
+<hostnames><hostname name="gateway.test" type="user"/><hostname name="gw.example" type="PTR"/></hostnames>
+<ports><extraports state="closed" count="997"><extrareasons reason="reset" count="997"/></extraports>
+<port protocol="tcp" portid="22"><state state="open" reason="syn-ack"/><service name="ssh" method="table"/></port>
+<port protocol="tcp" portid="53"><state state="open" reason="syn-ack"/><service name="domain" method="table"/></port>
+<port protocol="tcp" portid="80"><state state="filtered" reason="no-response"/><service name="http" method="table"/></port>
+</ports></host>
+<host><status state="up" reason="echo-reply"/>
+<address addr="192.0.2.9" addrtype="ipv4"/><hostnames/>
+<ports><extraports state="filtered" count="600"/><extraports state="closed" count="399"/>
+<port protocol="tcp" portid="443"><state state="open" reason="syn-ack"/><service name="https" method="table"/></port>
+</ports></host>
+<host><status state="down" reason="no-response"/><address addr="192.0.2.10" addrtype="ipv4"/></host>
+</nmaprun>
+"""
+
+
+class NmapXmlTest(unittest.TestCase):
+    def test_extraports_stay_folded(self):
+        records = list(port_scanner.parse_nmap_xml(io.BytesIO(NMAP_XML)))
+        self.assertEqual([(r["host"], r["port"], r["state"]) for r in records], [
+            ("gateway.test", 22, "open"), ("gateway.test", 53, "open"), ("gateway.test", 80, "filtered"),
+            ("gateway.test", None, "closed"), ("192.0.2.9", 443, "open"), ("192.0.2.9", None, "closed"),
+        ])
+        self.assertEqual(records[3]["count"], 997)
+        self.assertEqual(records[5]["count"], 999)
+
+    def test_store_closes_folded_ports(self):
+        store = port_scanner.open_scan_store(":memory:")
+        records = list(port_scanner.parse_nmap_xml(io.BytesIO(NMAP_XML)))
+        diff = port_scanner.store_scan_results(store, records, now=1000.0, scanned_ports=range(1, 1001))
+        self.assertEqual(len(diff["opened"]), 3)
+        # 53 is folded into the closed extraports on the next scan
+        rescan = [r for r in records if r["port"] != 53]
+        diff = port_scanner.store_scan_results(store, rescan, now=2000.0, scanned_ports=range(1, 1001))
+        self.assertEqual([(r["host"], r["port"], r["state"]) for r in diff["closed"]], [("gateway.test", 53, "closed")])
+        self.assertEqual(store.execute("SELECT COUNT(*) FROM port_results").fetchone()[0], 4)
+
+    def test_merge_keeps_summary(self):
+        results = port_scanner.merge_scan_results(port_scanner.parse_nmap_xml(io.BytesIO(NMAP_XML)))
+        self.assertEqual(results["gateway.test"]["extraports"], {"state": "closed", "count": 997})
+        self.assertEqual(len(results["gateway.test"]["ports"]), 3)
+        self.assertEqual(sorted((r["host"], r["port"]) for r in port_scanner.iter_merged_records(results)
+                                if r["port"] is None), [("192.0.2.9", None), ("gateway.test", None)])
+
+
+class HostTimingTest(unittest.TestCase):
+    def test_rto_follows_rfc6298(self):
+        timing = port_scanner.HostTiming(100)
+        self.assertEqual(timing.rto, port_scanner.ADAPTIVE_INITIAL_TIMEOUT)
+        # First sample: SRTT = R, RTTVAR = R/2, RTO = SRTT + 4 * RTTVAR
+        timing.on_response(0.2)
+        self.assertAlmostEqual(timing.srtt, 0.2)
+        self.assertAlmostEqual(timing.rttvar, 0.1)
+        self.assertAlmostEqual(timing.rto, 0.6)
+        # RTTVAR = 3/4 RTTVAR + 1/4 |SRTT - R| (with the old SRTT), SRTT = 7/8 SRTT + 1/8 R
+        timing.on_response(0.3)
+        self.assertAlmostEqual(timing.rttvar, 0.1)
+        self.assertAlmostEqual(timing.srtt, 0.2125)
+        self.assertAlmostEqual(timing.rto, 0.6125)
+        timing.on_response(0.1)
+        self.assertAlmostEqual(timing.rttvar, 0.103125)
+        self.assertAlmostEqual(timing.srtt, 0.1984375)
+        self.assertAlmostEqual(timing.rto, 0.6109375)
+
+    def test_rto_is_clamped(self):
+        timing = port_scanner.HostTiming(100)
+        for _ in range(100):
+            timing.on_response(0.001)
+        self.assertEqual(timing.rto, port_scanner.ADAPTIVE_MIN_TIMEOUT)
+        timing = port_scanner.HostTiming(100, max_timeout=0.5)
+        self.assertEqual(timing.rto, 0.5)
+        timing.on_response(2.0)
+        self.assertEqual(timing.rto, 0.5)
+
+    def test_window(self):
+        timing = port_scanner.HostTiming(20, initial_window=10)
+        timing.on_response(0.2)
+        timing.on_response(0.2)
+        self.assertEqual(timing.window, 12)  # slow start: one more probe per answer
+        timing.on_loss()
+        self.assertEqual((timing.ssthresh, timing.window), (9, 9))
+        timing.on_loss()  # a second loss within one SRTT is the same congestion event
+        self.assertEqual(timing.window, 9)
+        timing.on_response(0.2)
+        self.assertAlmostEqual(timing.window, 9 + port_scanner.ADAPTIVE_INCREASE / 9)
+        for _ in range(100):
+            timing.on_response(0.2)
+        self.assertEqual(timing.window, 20)
+        self.assertEqual(port_scanner.HostTiming(5).window, 5)
+
+    def test_acquire_waits_for_room(self):
+        async def fill():
+            timing = port_scanner.HostTiming(2, initial_window=2)
+            await timing.acquire()
+            await timing.acquire()
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(timing.acquire(), 0.05)
+            waiter = asyncio.create_task(timing.acquire())
+            await timing.release()
+            await asyncio.wait_for(waiter, 1)
+            return timing.in_flight
+
+        self.assertEqual(asyncio.run(fill()), 2)
+
+
+class AdaptiveScanTest(unittest.TestCase):
+    """A simulated 50 ms, 2% loss host that congests above 40 probes in flight."""
+
+    ports = list(range(1, 1001))
+    open_ports = set(random.Random(2).sample(ports, 25))
+
+    def scan(self, adaptive, timeout):
+        async def run():
+            probe = port_scanner.simulated_lossy_target(self.open_ports, latency=0.05, jitter=0.0075, seed=1)
+            found = set()
+            async for record in port_scanner.connect_scan(["127.0.0.1"], self.ports, timeout=timeout,
+                                                          adaptive=adaptive, probe=probe):
+                if record["state"] == "open":
+                    found.add(record["port"])
+            return found
+
+        return asyncio.run(run())
+
+    def test_adaptive_beats_a_short_fixed_timeout(self):
+        # Three quarters of the RTT: only the fastest few answers make it in time
+        fixed = self.scan(False, 0.0375)
+        adaptive = self.scan(True, None)
+        self.assertLessEqual(len(fixed), 5)
+        self.assertGreaterEqual(len(adaptive), 22)
+        self.assertLessEqual(fixed | adaptive, self.open_ports)
+
+class CertificateTest(unittest.TestCase):
+    """Certificates made with the openssl CLI (EC P-256 keys)."""
+
+    def test_leaf_with_san(self):
+        der = certificate("san.der")
+        self.assertEqual(port_scanner.certificate_names(der), (
+            "C=DE, O=Example Org, OU=Web, CN=www.example.test", "C=US, O=Example Test CA, CN=Example Test Root"))
+        # Walk tbsCertificate to the extensions ([3]) and decode the subjectAltName GeneralNames
+        _, cert_start, cert_end = port_scanner._der_element(der, 0)
+        self.assertEqual((cert_start, cert_end), (4, len(der)))
+        _, tbs_start, tbs_end = port_scanner._der_element(der, cert_start)
+        fields = list(port_scanner._der_children(der, tbs_start, tbs_end))
+        self.assertEqual([tag for tag, _, _ in fields], [0xA0, 0x02, 0x30, 0x30, 0x30, 0x30, 0x30, 0xA3])
+        self.assertEqual(der[fields[1][1]:fields[1][2]], (4660).to_bytes(2, "big"))
+        _, extensions_start, extensions_end = port_scanner._der_element(der, fields[7][1])
+        names = None
+        for _, start, end in port_scanner._der_children(der, extensions_start, extensions_end):
+            (_, oid_start, oid_end), *_, (_, value_start, value_end) = port_scanner._der_children(der, start, end)
+            if der[oid_start:oid_end] == b"\x55\x1d\x11":
+                _, names_start, names_end = port_scanner._der_element(der, value_start)
+                names = [(tag, der[start:end]) for tag, start, end in port_scanner._der_children(der, names_start, names_end)]
+        self.assertEqual(names, [(0x82, b"www.example.test"), (0x82, b"example.test"), (0x87, bytes([192, 0, 2, 10]))])
+
+    def test_version_1_certificate(self):
+        # No explicit [0] version, so every field sits one position earlier
+        self.assertEqual(port_scanner.certificate_names(certificate("v1.der")), (
+            "C=DE, O=Example Org, OU=Web, CN=www.example.test", "C=US, O=Example Test CA, CN=Example Test Root"))
+
+    def test_non_ascii_names(self):
+        subject, issuer = port_scanner.certificate_names(certificate("utf8_cn.der"))
+        self.assertEqual(subject, "C=JP, O=Bücher & Straße GmbH, CN=東京.example.test")
+        self.assertEqual(issuer, subject)
+        # BMPString (UTF-16BE), as some older CAs and appliances still issue
+        self.assertEqual(port_scanner.certificate_names(certificate("bmp_cn.der")), ("CN=Ünïcødé Gerät",) * 2)
+
+    def test_der_lengths(self):
+        self.assertEqual(port_scanner._der_element(b"\x02\x01\x05", 0), (0x02, 2, 3))
+        self.assertEqual(port_scanner._der_element(b"\x04\x81\x80" + bytes(128), 0), (0x04, 3, 131))
+        self.assertEqual(port_scanner._der_element(b"\x30\x82\x01\x00" + bytes(256), 0), (0x30, 4, 260))
+        for data in (b"\x30", b"\x30\x80\x00\x00", b"\x30\x85\x01\x00\x00\x00\x00", b"\x30\x82\x01",
+                     b"\x30\x05\x00\x00"):
+            with self.assertRaises(ValueError):
+                port_scanner._der_element(data, 0)
+        # A child claiming more than its parent holds
+        with self.assertRaises(ValueError):
+            list(port_scanner._der_children(b"\x30\x03\x02\x02\x01\x00", 2, 5))
+
+    def test_malformed_certificates(self):
+        der = bytearray(certificate("san.der"))
+        broken = [bytes(der[:300]), b"\x30\x00", b"\x30\x03\x30\x01\x00"]
+        longer = bytearray(der)
+        longer[2:4] = (len(der)).to_bytes(2, "big")  # outer length one element too long
+        broken.append(bytes(longer))
+        subject = bytearray(der)
+        # Give the subject's first RDN SET a length past the end of the subject Name
+        offset = bytes(der).index(b"\x31\x0b\x30\x09\x06\x03\x55\x04\x06\x13\x02DE")
+        subject[offset + 1] = 0x7F
+        broken.append(bytes(subject))
+        for data in broken:
+            with self.assertRaises(ValueError):
+                port_scanner.certificate_names(data)
+
+
+if __name__ == "__main__":
+    unittest.main()
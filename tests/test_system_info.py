@@ -0,0 +1,110 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+
+import system_info  # noqa: E402
+
+BLOCK = system_info.RING_BLOCK
+START = 1700000000
+
+
+class MetricRingTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="metrics_ring_")
+        self.path = os.path.join(self.directory, system_info.METRICS_RING_FILE)
+        self.ring = system_info.MetricRing(self.path, 2 * BLOCK, writable=True)
+
+    def tearDown(self):
+        self.ring.close()
+        os.remove(self.path)
+        os.rmdir(self.directory)
+
+    def fill(self, timestamps):
+        for timestamp in timestamps:
+            self.ring.append(timestamp, timestamp % 200 / 2, 50, 75, 1.0, 0.0, 100.0)
+
+    def test_file_size(self):
+        self.assertEqual(system_info.RING_RECORD.size, 6)
+        self.assertEqual(os.path.getsize(self.path), system_info.RING_HEADER_SIZE + 2 * 8 + 2 * BLOCK * 6)
+        weeks = system_info.RING_CAPACITY / (7 * 86400)
+        self.assertGreaterEqual(weeks, 4)
+        self.assertLess(system_info.RING_CAPACITY * 6 / weeks, 4 * 2 ** 20)
+
+    def test_encoding(self):
+        self.fill([START])
+        history = self.ring.query(START, START + 1)
+        self.assertEqual([history[field][0] for field in ("mem_pct", "disk_pct", "rx_mib_s")], [50, 75, 0])
+        self.assertAlmostEqual(history["load1"][0], 1.0, delta=0.03)
+        self.assertAlmostEqual(history["tx_mib_s"][0], 100.0, delta=3)
+        self.assertEqual(system_info._percent_code(120), 200)
+        self.assertEqual(system_info._log_code(1e9), 255)
+
+    def test_offset_wraps(self):
+        self.fill(range(START, START + 2 * BLOCK))
+        self.assertEqual(self.ring._offset(0), self.ring.records_start)
+        self.assertEqual(self.ring._offset(BLOCK + 3), self.ring.records_start + (BLOCK + 3) * 6)
+        self.fill([START + 2 * BLOCK])
+        # Block 0 was reused, so the oldest live block now starts halfway into the file
+        self.assertEqual(self.ring._offset(0), self.ring.records_start + BLOCK * 6)
+        self.assertEqual(self.ring._offset(BLOCK), self.ring.records_start)
+        self.assertEqual(len(self.ring), BLOCK + 1)
+
+    def test_bisect_across_wrap(self):
+        end = START + 3 * BLOCK + 10
+        self.fill(range(START, end))
+        first = START + 2 * BLOCK  # the first block was overwritten once the ring wrapped
+        self.assertEqual(self.ring._bisect(START), 0)
+        self.assertEqual(self.ring._bisect(first), 0)
+        self.assertEqual(self.ring._bisect(first + BLOCK - 1), BLOCK - 1)
+        self.assertEqual(self.ring._bisect(first + BLOCK), BLOCK)
+        self.assertEqual(self.ring._bisect(end - 1), BLOCK + 9)
+        self.assertEqual(self.ring._bisect(end), BLOCK + 10)
+
+    def test_query_spans_end_of_file(self):
+        end = START + 3 * BLOCK + 10
+        self.fill(range(START, end))
+        history = self.ring.query(end - 100, end)
+        self.assertEqual(list(history["timestamp"]), list(range(end - 100, end)))
+        self.assertEqual(list(history["cpu_pct"]), [timestamp % 200 / 2 for timestamp in range(end - 100, end)])
+        self.assertEqual(len(self.ring.query(0, end + 1)["timestamp"]), BLOCK + 10)
+
+    def test_gaps_start_new_blocks(self):
+        self.fill([START, START + 1, START + 2, START + 60, START + 61, START + 62.9])
+        self.assertEqual(list(self.ring.query(START, START + 100)["timestamp"]),
+                         [START, START + 1, START + 2, START + 60, START + 61, START + 62])
+        self.assertEqual(self.ring._bisect(START + 30), BLOCK)
+        self.fill([START + 100])  # no block left, so the oldest one is reused
+        self.assertEqual(list(self.ring.query(0, START + 200)["timestamp"]),
+                         [START + 60, START + 61, START + 62, START + 100])
+
+    def test_downsample_bucket_edges(self):
+        # 60-second buckets with records exactly on the boundaries, across the wrap
+        base = START - START % 60
+        self.fill(range(base, base + 2 * BLOCK + 120))
+        rows = self.ring.downsample(base + 2 * BLOCK, base + 2 * BLOCK + 120, 60)
+        first = base + 2 * BLOCK
+        self.assertEqual(rows[0]["timestamp"], first - first % 60)
+        self.assertEqual(sum(row["samples"] for row in rows), 120)
+        self.assertTrue(all(row["timestamp"] % 60 == 0 for row in rows))
+        self.assertTrue(all(row["samples"] == 60 for row in rows[1:-1]))
+        rows = self.ring.downsample(base + 300, base + 360, 60)
+        self.assertEqual([(row["timestamp"], row["samples"]) for row in rows], [(base + 300, 60)])
+        self.assertEqual(rows[0]["mem_pct"], (50, 50))
+        with self.assertRaises(ValueError):
+            self.ring.downsample(base, base + 60, 0)
+
+    def test_reopen(self):
+        self.fill(range(START, START + BLOCK + 5))
+        reader = system_info.MetricRing(self.path)
+        try:
+            self.assertEqual(len(reader), BLOCK + 5)
+            self.assertEqual(reader.interval, 1)
+        finally:
+            reader.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
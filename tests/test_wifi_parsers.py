@@ -0,0 +1,116 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tools"))
+
+import wifi_analyzer  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "wifi")
+NOW = 1700000000.0
+
+
+def fixture_lines(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as handle:
+        return handle.read().splitlines(keepends=True)
+
+
+def summary(records):
+    return [(r["bssid"], r["ssid"], r["channel"], r["frequency_mhz"], r["signal_dbm"], r["security"]) for r in records]
+
+
+class IwlistParserTest(unittest.TestCase):
+    def test_recorded_scan(self):
+        records = list(wifi_analyzer.parse_iwlist(fixture_lines("iwlist.txt"), now=NOW))
+        self.assertEqual(summary(records), [
+            ("64:66:b3:54:18:20", "HomeNet", 6, 2437, -48.0, "WPA2"),
+            ("64:66:b3:54:18:24", "HomeNet", 36, 5180, -59.0, "WPA2"),
+            ("c0:4a:00:1e:7b:90", "Neighbour_2G", 11, 2462, -80.0, "WPA/WPA2"),
+            ("02:1a:11:f3:2c:5d", "CoffeeShop Guest", 1, 2412, -67.0, "open"),
+            ("3c:84:6a:9e:01:77", "", 149, 5745, -90.0, "WPA2"),
+            ("00:90:4c:c5:12:38", "OldRouter", 6, 2437, -70.0, "WPA"),
+        ])
+        self.assertAlmostEqual(records[0]["last_seen"], NOW - 0.036)
+        self.assertTrue(all(set(record) == set(wifi_analyzer.RECORD_FIELDS) for record in records))
+
+    def test_malformed_fields_are_skipped(self):
+        lines = fixture_lines("iwlist.txt")
+        lines[2] = "                    Channel:six\n"
+        lines[4] = "                    Quality=62/70  Signal level=?? dBm\n"
+        lines[lines.index("                    Quality=60/100  Signal level=60/100  \n")] = (
+            "                    Quality=60/0  Signal level=60/0\n")
+        records = list(wifi_analyzer.parse_iwlist(lines, now=NOW))
+        self.assertEqual(len(records), 6)
+        self.assertEqual(records[0]["channel"], 6)  # still taken from the Frequency line
+        self.assertIsNone(records[0]["signal_dbm"])
+        self.assertIsNone(records[5]["signal_dbm"])
+
+
+class NetshParserTest(unittest.TestCase):
+    def test_recorded_scan(self):
+        records = list(wifi_analyzer.parse_netsh(fixture_lines("netsh.txt"), now=NOW))
+        self.assertEqual(summary(records), [
+            ("64:66:b3:54:18:20", "HomeNet", 6, 2437, -52.0, "WPA2"),
+            ("64:66:b3:54:18:24", "HomeNet", 36, 5180, -60.0, "WPA2"),
+            ("3c:84:6a:9e:01:77", "", 149, 5745, -90.0, "WPA2 Enterprise"),
+            ("02:1a:11:f3:2c:5d", "CoffeeShop Guest", 1, 2412, -67.0, "open"),
+            ("9a:2f:41:6c:0d:e2", "Studio6", 37, 6135, -73.0, "WPA3"),
+        ])
+        self.assertTrue(all(set(record) == set(wifi_analyzer.RECORD_FIELDS) for record in records))
+
+    def test_malformed_fields_are_skipped(self):
+        lines = [line.replace("Signal             : 96%", "Signal             : n/a")
+                 .replace("Channel            : 149", "Channel            : ?") for line in fixture_lines("netsh.txt")]
+        records = list(wifi_analyzer.parse_netsh(lines, now=NOW))
+        self.assertEqual(len(records), 5)
+        self.assertIsNone(records[0]["signal_dbm"])
+        self.assertIsNone(records[2]["channel"])
+        self.assertIsNone(records[2]["frequency_mhz"])
+
+
+class TermuxParserTest(unittest.TestCase):
+    def test_recorded_scan(self):
+        records = list(wifi_analyzer.parse_termux(fixture_lines("termux.json"), now=NOW))
+        self.assertEqual(summary(records), [
+            ("64:66:b3:54:18:20", "HomeNet", 6, 2437, -48, None),
+            ("64:66:b3:54:18:24", "HomeNet", 36, 5180, -59, None),
+            ("c0:4a:00:1e:7b:90", "Neighbour_2G", 11, 2462, -80, None),
+            ("02:1a:11:f3:2c:5d", "CoffeeShop Guest", 1, 2412, -67, None),
+            ("3c:84:6a:9e:01:77", "", 149, 5745, -90, None),
+        ])
+
+    def test_single_line_output(self):
+        with open(os.path.join(FIXTURES, "termux.json"), encoding="utf-8") as handle:
+            compact = handle.read().replace("\n", "")
+        self.assertEqual(len(list(wifi_analyzer.parse_termux([compact], now=NOW))), 5)
+
+    def test_malformed_fields_are_skipped(self):
+        lines = [line.replace('"rssi": -48', '"rssi": "weak"').replace('"frequency_mhz": 5180', '"frequency_mhz": "5.18"')
+                 for line in fixture_lines("termux.json")]
+        records = list(wifi_analyzer.parse_termux(lines, now=NOW))
+        self.assertEqual(len(records), 5)
+        self.assertIsNone(records[0]["signal_dbm"])
+        self.assertIsNone(records[1]["channel"])
+
+
+class FixtureTest(unittest.TestCase):
+    def test_detect_backend(self):
+        for name, backend in (("iwlist.txt", "iwlist"), ("netsh.txt", "netsh"), ("termux.json", "termux")):
+            self.assertEqual(wifi_analyzer.detect_backend("".join(fixture_lines(name))), backend)
+            self.assertEqual(len(wifi_analyzer.parse_scan_file(os.path.join(FIXTURES, name))),
+                             {"iwlist": 6, "netsh": 5, "termux": 5}[backend])
+
+    def test_scaled_recorded_fixtures(self):
+        for backend, parser in wifi_analyzer.PARSERS.items():
+            text = wifi_analyzer.scale_recorded_fixture(backend, 200, directory=FIXTURES)
+            self.assertEqual(len(list(parser(text.splitlines(keepends=True)))), 200)
+
+    def test_generated_fixtures_round_trip(self):
+        for backend, parser in wifi_analyzer.PARSERS.items():
+            text = wifi_analyzer.generate_fixture(backend, 50, seed=7)
+            self.assertEqual(wifi_analyzer.detect_backend(text), backend)
+            self.assertEqual(len(list(parser(text.splitlines(keepends=True)))), 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,299 @@
+import os
+import sys
+import mmap
+import time
+import socket
+import struct
+import random
+import logging
+import ipaddress
+from bisect import bisect_left
+from colorama import Fore, Style
+
+# Default location of the compiled database (built from a CSV/pfx2as file with option 1)
+DEFAULT_ASN_DB = os.environ.get("ASN_DB", "asn.db")
+
+# File layout: header, IPv4 nodes, IPv6 nodes, records, org name blob
+ASN_DB_MAGIC = b"ASNTRIE1"
+HEADER = struct.Struct("<8sIIII")        # magic, v4 nodes, v6 nodes, records, blob size
+V4_NODE = struct.Struct("<IIIBI")        # left, right, record + 1, prefix length, key
+V6_NODE = struct.Struct("<IIIBQQ")       # left, right, record + 1, prefix length, key (hi, lo)
+RECORD = struct.Struct("<IIH")           # asn, org offset, org length
+
+# Lookup benchmark size
+BENCHMARK_LOOKUPS = 100000
+
+# Set up logging configuration
+LOG_FILE = "data.log"
+logging.basicConfig(
+    filename=LOG_FILE,
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+def log_and_print(message, level="INFO"):
+    """Log a message to file and print to terminal."""
+    if level == "ERROR":
+        logging.error(message)
+        print(Fore.RED + f"[ERROR] {message}" + Style.RESET_ALL)
+    elif level == "WARNING":
+        logging.warning(message)
+        print(Fore.YELLOW + f"[WARNING] {message}" + Style.RESET_ALL)
+    else:
+        logging.info(message)
+        print(Fore.CYAN + f"[INFO] {message}" + Style.RESET_ALL)
+
+def _parse_asn(text):
+    """First origin AS of a field like "13335", "AS13335" or a multi-origin "64500_64501"."""
+    digits = ""
+    for char in text.strip().upper().removeprefix("AS"):
+        if not char.isdigit():
+            break
+        digits += char
+    if not digits:
+        raise ValueError(f"Bad AS number: {text!r}")
+    return int(digits)
+
+def read_prefix_file(path):
+    """Yield (network, asn, org) from a "prefix,asn[,org]" CSV or a CAIDA pfx2as file.
+
+    CSV lines look like "1.0.0.0/24,13335,CLOUDFLARENET"; pfx2as lines are
+    tab-separated "1.0.0.0<TAB>24<TAB>13335". Blank lines, comments and
+    header rows are skipped.
+    """
+    with open(path, encoding="utf-8", errors="replace") as prefix_file:
+        for line_number, line in enumerate(prefix_file, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                if "\t" in line:
+                    address, length, asn = line.split("\t")[:3]
+                    network, org = ipaddress.ip_network(f"{address}/{length}", strict=False), ""
+                else:
+                    fields = [field.strip().strip('"') for field in line.split(",", 2)]
+                    network = ipaddress.ip_network(fields[0], strict=False)
+                    asn, org = fields[1], fields[2] if len(fields) > 2 else ""
+                yield network, _parse_asn(asn), org
+            except (ValueError, IndexError):
+                if line_number > 1:
+                    logging.warning(f"{path}:{line_number}: skipped unparsable line")
+
+def _build_patricia(prefixes, bits):
+    """Build a path-compressed trie from (key, length, record) sorted by key then length.
+
+    Returns a list of [left, right, record + 1, length, key] nodes with the
+    root at index 0; child index 0 means "no child". Each node sits where the
+    prefixes below it branch or where a prefix ends, so chains of single-child
+    bits are skipped.
+    """
+    keys = [key for key, _, _ in prefixes]
+    nodes = [[0, 0, 0, 0, 0]]
+
+    def common_length(first, last, limit):
+        differing = first ^ last
+        return min(limit, bits - differing.bit_length())
+
+    def fill(index, lo, hi):
+        # prefixes[lo:hi] all lie under this node; one may end exactly here
+        depth, key = nodes[index][3], nodes[index][4]
+        if lo < hi and prefixes[lo][1] == depth and prefixes[lo][0] == key:
+            nodes[index][2] = prefixes[lo][2] + 1
+            lo += 1
+        if lo >= hi:
+            return
+        split = bisect_left(keys, key | (1 << (bits - depth - 1)), lo, hi)
+        for side, (start, end) in enumerate(((lo, split), (split, hi))):
+            if start >= end:
+                continue
+            shortest = min(length for _, length, _ in prefixes[start:end])
+            child_depth = common_length(prefixes[start][0], prefixes[end - 1][0], shortest)
+            child_key = prefixes[start][0] & ~((1 << (bits - child_depth)) - 1) if child_depth else 0
+            nodes.append([0, 0, 0, child_depth, child_key])
+            nodes[index][side] = len(nodes) - 1
+            fill(len(nodes) - 1, start, end)
+
+    if prefixes:
+        fill(0, 0, len(prefixes))
+    return nodes
+
+def build_asn_database(source_path, output_path=DEFAULT_ASN_DB):
+    """Compile a prefix file into the binary trie database; return (prefixes, nodes)."""
+    records = {}
+    by_family = {4: {}, 6: {}}
+    for network, asn, org in read_prefix_file(source_path):
+        record = records.setdefault((asn, org), len(records))
+        # Later lines win for duplicate prefixes
+        by_family[network.version][(int(network.network_address), network.prefixlen)] = record
+
+    tries = {}
+    for version, bits in ((4, 32), (6, 128)):
+        prefixes = sorted((key, length, record) for (key, length), record in by_family[version].items())
+        tries[version] = _build_patricia(prefixes, bits)
+
+    blob = bytearray()
+    packed_records = bytearray()
+    for (asn, org), _ in sorted(records.items(), key=lambda item: item[1]):
+        encoded = org.encode("utf-8")[:0xFFFF]
+        packed_records += RECORD.pack(asn, len(blob), len(encoded))
+        blob += encoded
+
+    # Write to a temp file and rename, so readers never map a half-written file
+    temp_path = output_path + ".tmp"
+    with open(temp_path, "wb") as db_file:
+        db_file.write(HEADER.pack(ASN_DB_MAGIC, len(tries[4]), len(tries[6]), len(records), len(blob)))
+        for left, right, value, length, key in tries[4]:
+            db_file.write(V4_NODE.pack(left, right, value, length, key))
+        for left, right, value, length, key in tries[6]:
+            db_file.write(V6_NODE.pack(left, right, value, length, key >> 64, key & 0xFFFFFFFFFFFFFFFF))
+        db_file.write(packed_records)
+        db_file.write(blob)
+    os.replace(temp_path, output_path)
+    return sum(len(prefixes) for prefixes in by_family.values()), len(tries[4]) + len(tries[6])
+
+class AsnDatabase:
+    """Read-only, memory-mapped view of a compiled prefix-to-ASN trie."""
+
+    def __init__(self, path=DEFAULT_ASN_DB):
+        self.path = path
+        with open(path, "rb") as db_file:
+            self.map = mmap.mmap(db_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, v4_nodes, v6_nodes, records, blob_size = HEADER.unpack_from(self.map)
+        if magic != ASN_DB_MAGIC:
+            self.map.close()
+            raise ValueError(f"{path} is not an ASN database")
+        self.v4_offset = HEADER.size
+        self.v6_offset = self.v4_offset + v4_nodes * V4_NODE.size
+        self.records_offset = self.v6_offset + v6_nodes * V6_NODE.size
+        self.blob_offset = self.records_offset + records * RECORD.size
+
+    def close(self):
+        self.map.close()
+
+    def _record(self, value):
+        asn, org_offset, org_length = RECORD.unpack_from(self.map, self.records_offset + (value - 1) * RECORD.size)
+        start = self.blob_offset + org_offset
+        return asn, self.map[start:start + org_length].decode("utf-8", "replace")
+
+    def _match_v4(self, address):
+        """Walk the IPv4 trie; return (record + 1, length, key) of the longest match."""
+        unpack, base, size = V4_NODE.unpack_from, self.v4_offset, V4_NODE.size
+        best = None
+        index = 0
+        while True:
+            left, right, value, length, key = unpack(self.map, base + index * size)
+            if (address ^ key) >> (32 - length):
+                return best
+            if value:
+                best = (value, length, key)
+            if length == 32:
+                return best
+            index = right if (address >> (31 - length)) & 1 else left
+            if not index:
+                return best
+
+    def _match_v6(self, address):
+        """Walk the IPv6 trie; return (record + 1, length, key) of the longest match."""
+        unpack, base, size = V6_NODE.unpack_from, self.v6_offset, V6_NODE.size
+        best = None
+        index = 0
+        while True:
+            left, right, value, length, high, low = unpack(self.map, base + index * size)
+            key = (high << 64) | low
+            if (address ^ key) >> (128 - length):
+                return best
+            if value:
+                best = (value, length, key)
+            if length == 128:
+                return best
+            index = right if (address >> (127 - length)) & 1 else left
+            if not index:
+                return best
+
+    def lookup(self, ip):
+        """Longest-prefix match for an IP string: {"prefix", "asn", "org"} or None."""
+        try:
+            if ":" in ip:
+                packed, bits = socket.inet_pton(socket.AF_INET6, ip.split("%")[0]), 128
+            else:
+                packed, bits = socket.inet_pton(socket.AF_INET, ip), 32
+        except OSError:
+            return None
+        address = int.from_bytes(packed, "big")
+        if bits == 128 and address >> 32 == 0xFFFF:
+            # IPv4-mapped (::ffff:a.b.c.d), as dual-stack sockets report IPv4 peers
+            address, bits = address & 0xFFFFFFFF, 32
+        match =self._match_v4(address) if bits == 32 else self._match_v6(address)
+        if match is None:
+            return None
+        value, length, key = match
+        asn, org = self._record(value)
+        network = ipaddress.ip_address(key.to_bytes(bits // 8, "big"))
+        return {"prefix": f"{network}/{length}", "asn": asn, "org": org}
+
+    def annotate(self, addresses):
+        """Look up many addresses at once; duplicates are looked up only once."""
+        return {address: self.lookup(address) for address in set(addresses) if address}
+
+def open_asn_database(path=DEFAULT_ASN_DB):
+    """Open the ASN database if one has been built, else return None (annotation is optional)."""
+    if not os.path.exists(path):
+        return None
+    try:
+        return AsnDatabase(path)
+    except (OSError, ValueError, struct.error) as e:
+        logging.warning(f"Could not open ASN database {path}: {e}")
+        return None
+
+def format_owner(info):
+    """Short "AS13335 CLOUDFLARENET" label for an annotation (empty if unknown)."""
+    if not info:
+        return ""
+    return f"AS{info['asn']} {info['org']}".strip()
+
+def benchmark_lookups(database, count=BENCHMARK_LOOKUPS):
+    """Time random IPv4 lookups against an open database."""
+    addresses = [socket.inet_ntoa(random.getrandbits(32).to_bytes(4, "big")) for _ in range(count)]
+    start = time.perf_counter()
+    hits = sum(1 for address in addresses if database.lookup(address))
+    elapsed = time.perf_counter() - start
+    log_and_print(f"{count} lookup(s) in {elapsed:.3f}s ({elapsed / count * 1e6:.2f} µs each), "
+                  f"{hits} matched a prefix.", level="INFO")
+
+if __name__ == "__main__":
+    log_and_print("ASN Lookup Utility started.", level="INFO")
+
+    print(Fore.CYAN + "1. Build the database from a prefix CSV or pfx2as file" + Style.RESET_ALL)
+    print(Fore.CYAN + "2. Look up IP addresses" + Style.RESET_ALL)
+    print(Fore.CYAN + "3. Benchmark lookups" + Style.RESET_ALL)
+    choice = input(Fore.CYAN + "Select an option (1-3): " + Style.RESET_ALL).strip()
+
+    if choice == "1":
+        source = input(Fore.CYAN + "Path to the prefix file: " + Style.RESET_ALL).strip()
+        output = input(Fore.CYAN + f"Database path [{DEFAULT_ASN_DB}]: " + Style.RESET_ALL).strip() or DEFAULT_ASN_DB
+        start = time.perf_counter()
+        try:
+            prefixes, nodes = build_asn_database(source, output)
+            log_and_print(f"Built {output}: {prefixes} prefix(es), {nodes} trie node(s) "
+                          f"in {time.perf_counter() - start:.2f}s.", level="INFO")
+        except OSError as e:
+            log_and_print(f"Could not build the database: {e}", level="ERROR")
+    elif choice in ("2", "3"):
+        database = open_asn_database()
+        if database is None:
+            log_and_print(f"No database at {DEFAULT_ASN_DB}; build one with option 1 first.", level="ERROR")
+            sys.exit(1)
+        if choice == "2":
+            addresses = [a.strip() for a in input(Fore.CYAN + "Enter IP addresses separated by commas: " + Style.RESET_ALL).split(",") if a.strip()]
+            for address, info in database.annotate(addresses).items():
+                if info:
+                    print(Fore.GREEN + f"{address:<39} {info['prefix']:<20} {format_owner(info)}" + Style.RESET_ALL)
+                else:
+                    print(Fore.YELLOW + f"{address:<39} no matching prefix" + Style.RESET_ALL)
+        else:
+            benchmark_lookups(database)
+        database.close()
+    else:
+        log_and_print("Invalid choice. Exiting.", level="ERROR")
+
+    log_and_print("ASN Lookup Utility finished.", level="INFO")
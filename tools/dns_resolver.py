@@ -0,0 +1,434 @@
+import os
+import json
+import time
+import socket
+import struct
+import random
+import atexit
+import asyncio
+import logging
+import ipaddress
+from collections import OrderedDict
+from colorama import Fore, Style
+
+# Resolver defaults
+RESOLV_CONF = "/etc/resolv.conf"
+HOSTS_FILE = "/etc/hosts"
+DNS_PORT = 53
+DNS_TIMEOUT = 1.0
+DNS_ATTEMPTS = 2
+DNS_CONCURRENCY = 64
+DNS_CACHE_SIZE = 4096
+
+# TTLs (seconds) for answers that carry none of their own
+NEGATIVE_TTL = 60
+FALLBACK_TTL = 60
+MAX_TTL = 86400
+
+# Set DNS_CACHE_FILE to keep the cache between runs (e.g. DNS_CACHE_FILE=dns_cache.json)
+DNS_CACHE_FILE = os.environ.get("DNS_CACHE_FILE", "")
+
+TYPE_A = 1
+TYPE_CNAME = 5
+TYPE_SOA = 6
+TYPE_PTR = 12
+TYPE_AAAA = 28
+RCODE_NXDOMAIN = 3
+
+# Set up logging configuration
+LOG_FILE = "data.log"
+logging.basicConfig(
+    filename=LOG_FILE,
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+def log_and_print(message, level="INFO"):
+    """Log a message to file and print to terminal."""
+    if level == "ERROR":
+        logging.error(message)
+        print(Fore.RED + f"[ERROR] {message}" + Style.RESET_ALL)
+    elif level == "WARNING":
+        logging.warning(message)
+        print(Fore.YELLOW + f"[WARNING] {message}" + Style.RESET_ALL)
+    else:
+        logging.info(message)
+        print(Fore.CYAN + f"[INFO] {message}" + Style.RESET_ALL)
+
+def read_nameservers(path=RESOLV_CONF):
+    """Nameserver (address, port) pairs from resolv.conf; empty if it is missing."""
+    nameservers = []
+    try:
+        with open(path) as resolv_file:
+            for line in resolv_file:
+                fields = line.split()
+                if len(fields) >= 2 and fields[0] == "nameserver":
+                    nameservers.append((fields[1].split("%")[0], DNS_PORT))
+    except OSError:
+        pass
+    return nameservers
+
+def read_ndots(path=RESOLV_CONF):
+    """The resolv.conf ndots option: names with fewer dots are tried against the search domains first."""
+    ndots = 1
+    try:
+        with open(path) as resolv_file:
+            for line in resolv_file:
+                fields = line.split()
+                if fields and fields[0] == "options":
+                    for option in fields[1:]:
+                        if option.startswith("ndots:") and option[6:].isdigit():
+                            ndots = min(int(option[6:]), 15)
+    except OSError:
+        pass
+    return ndots
+
+def read_hosts_file(path=HOSTS_FILE):
+    """Map lower-cased names in the hosts file to their addresses."""
+    hosts = {}
+    try:
+        with open(path) as hosts_file:
+            for line in hosts_file:
+                fields = line.split("#", 1)[0].split()
+                for name in fields[1:]:
+                    hosts.setdefault(name.lower(), []).append(fields[0])
+    except OSError:
+        pass
+    return hosts
+
+def reverse_name(address):
+    """The in-addr.arpa / ip6.arpa name for an address."""
+    return ipaddress.ip_address(address).reverse_pointer
+
+def build_query(name, qtype, query_id):
+    """Encode a recursive DNS query for one name and record type."""
+    labels = b"".join(bytes([len(label)]) + label for label in name.rstrip(".").encode("idna").split(b".") if label)
+    return struct.pack("!HHHHHH", query_id, 0x0100, 1, 0, 0, 0) + labels + b"\x00" + struct.pack("!HH", qtype, 1)
+
+def read_name(data, offset):
+    """Decode a possibly compressed domain name; return (name, offset after it)."""
+    labels = []
+    end = None
+    for _ in range(128):
+        if offset >= len(data):
+            raise ValueError("DNS name runs past the end of the message")
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            # Compression pointer: continue at the target, but resume after the pointer
+            if offset + 2 > len(data):
+                raise ValueError("DNS name runs past the end of the message")
+            end = end or offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        offset += 1
+        if not length:
+            return ".".join(labels), end or offset
+        if offset + length > len(data):
+            raise ValueError("DNS label runs past the end of the message")
+        labels.append(data[offset:offset + length].decode("ascii", "replace"))
+        offset += length
+    raise ValueError("DNS name compression loop")
+
+def parse_response(data, qtype):
+    """Decode a DNS reply: return (rcode, records of `qtype`, TTL for caching them).
+
+    CNAME chains are followed implicitly: only records of the asked type are
+    kept, and the TTL is the smallest one along the chain. Negative answers
+    take their TTL from the SOA in the authority section (RFC 2308).
+    """
+    query_id, flags, questions, answers, authorities, _ = struct.unpack_from("!HHHHHH", data)
+    offset = 12
+    for _ in range(questions):
+        _, offset = read_name(data, offset)
+        offset += 4
+    records = []
+    ttl = MAX_TTL
+    negative_ttl = NEGATIVE_TTL
+    for index in range(answers + authorities):
+        _, offset = read_name(data, offset)
+        rtype, _, record_ttl, length = struct.unpack_from("!HHIH", data, offset)
+        offset += 10
+        if offset + length > len(data):
+            raise ValueError("DNS record runs past the end of the message")
+        rdata = data[offset:offset + length]
+        if index < answers and rtype in (qtype, TYPE_CNAME):
+            ttl = min(ttl, record_ttl)
+            if rtype == TYPE_A and len(rdata) == 4:
+                records.append(socket.inet_ntop(socket.AF_INET, rdata))
+            elif rtype == TYPE_AAAA and len(rdata) == 16:
+                records.append(socket.inet_ntop(socket.AF_INET6, rdata))
+            elif rtype == TYPE_PTR == qtype:
+                records.append(read_name(data, offset)[0])
+        elif index >= answers and rtype == TYPE_SOA:
+            # MINIMUM is the last field of the SOA rdata
+            minimum = struct.unpack_from("!I", data, offset + length - 4)[0]
+            negative_ttl = min(record_ttl, minimum)
+        offset += length
+    return flags & 0x000F, records, ttl if records else negative_ttl
+
+class DnsCache:
+    """LRU cache of (name, type) -> records with per-entry expiry; [] is a cached "no such name"."""
+
+    def __init__(self, max_entries=DNS_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        """Records for a key, or None on a miss or an expired entry."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires, records = entry
+        if expires <= time.time():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return records
+
+    def put(self, key, records, ttl):
+        self.entries[key] = (time.time() + max(0, min(ttl, MAX_TTL)), records)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def load(self, path):
+        """Merge unexpired entries from a JSON file written by save()."""
+        try:
+            with open(path) as cache_file:
+                saved = json.load(cache_file)
+        except (OSError, ValueError):
+            return 0
+        now = time.time()
+        for key, (expires, records) in saved.items():
+            name, qtype = key.rsplit("|", 1)
+            if expires > now:
+                self.entries[(name, int(qtype))] = (expires, records)
+        return len(self.entries)
+
+    def save(self, path):
+        now = time.time()
+        saved = {f"{name}|{qtype}": entry for (name, qtype), entry in self.entries.items() if entry[0] > now}
+        with open(path + ".tmp", "w") as cache_file:
+            json.dump(saved, cache_file)
+        os.replace(path + ".tmp", path)
+
+class _ReplyProtocol(asyncio.DatagramProtocol):
+    """Resolve a future with the first datagram carrying the expected query ID."""
+
+    def __init__(self, query_id, future):
+        self.query_id = query_id
+        self.future = future
+
+    def datagram_received(self, data, addr):
+        if len(data) >= 12 and struct.unpack_from("!H", data)[0] == self.query_id and not self.future.done():
+            self.future.set_result(data)
+
+    def error_received(self, exc):
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+class Resolver:
+    """Async stub resolver shared by the network tools.
+
+    Queries go straight to the resolv.conf nameservers over UDP, so many
+    names can be resolved concurrently without the getaddrinfo thread pool.
+    Answers are cached for their TTL (failures for the SOA's negative TTL),
+    identical lookups in flight are coalesced, and anything the stub can't
+    answer (no nameservers, timeouts, truncation, names short of ndots that
+    go to the search domains, mDNS .local names) falls back to the system
+    resolver.
+    """
+
+    def __init__(self, nameservers=None, cache=None, timeout=DNS_TIMEOUT):
+        self.nameservers = read_nameservers() if nameservers is None else nameservers
+        self.ndots = read_ndots()
+        self.hosts = read_hosts_file()
+        self.host_names = {}
+        for name, addresses in self.hosts.items():
+            for address in addresses:
+                self.host_names.setdefault(address, name)
+        self.cache = cache or DnsCache()
+        self.timeout = timeout
+        self.inflight = {}
+        self.stats = {"hits": 0, "misses": 0, "fallbacks": 0}
+
+    async def _exchange(self, packet, query_id, server):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        transport, _ = await loop.create_datagram_endpoint(lambda: _ReplyProtocol(query_id, future), remote_addr=server)
+        try:
+            transport.sendto(packet)
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            transport.close()
+
+    async def _query_servers(self, name, qtype):
+        """Ask each nameserver in turn; return (records, ttl) or None if none gave an answer."""
+        for _ in range(DNS_ATTEMPTS):
+            for server in self.nameservers:
+                query_id = random.getrandbits(16)
+                try:
+                    data = await self._exchange(build_query(name, qtype, query_id), query_id, server)
+                    rcode, records, ttl = parse_response(data, qtype)
+                except (OSError, asyncio.TimeoutError, ValueError, struct.error, UnicodeError):
+                    continue
+                truncated = struct.unpack_from("!H", data, 2)[0] & 0x0200
+                if rcode == RCODE_NXDOMAIN or (rcode == 0 and not truncated):
+                    return records, ttl
+        return None
+
+    async def _system_query(self, name, qtype):
+        """Answer a query with getaddrinfo/getnameinfo (no TTL is known, so use FALLBACK_TTL)."""
+        loop = asyncio.get_running_loop()
+        self.stats["fallbacks"] += 1
+        try:
+            if qtype == TYPE_PTR:
+                host, _ = await loop.getnameinfo((name, 0), socket.NI_NAMEREQD)
+                return [host], FALLBACK_TTL
+            family = socket.AF_INET if qtype == TYPE_A else socket.AF_INET6
+            infos = await loop.getaddrinfo(name, None, family=family, type=socket.SOCK_DGRAM)
+            return list(dict.fromkeys(info[4][0] for info in infos)), FALLBACK_TTL
+        except (OSError, TypeError):
+            return [], NEGATIVE_TTL
+
+    async def query(self, name, qtype, fallback_name=None):
+        """Records of one type for a name, from the cache when possible."""
+        key = (name.lower().rstrip("."), qtype)
+        records = self.cache.get(key)
+        if records is not None:
+            self.stats["hits"] += 1
+            return records
+        if key in self.inflight:
+            return await asyncio.shield(self.inflight[key])
+        self.stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            answer = None
+            # Names short of ndots dots go to the resolv.conf search domains first and
+            # .local names to mDNS; both only reach us through the system resolver
+            if self.nameservers and key[0].count(".") >= max(self.ndots, 1) and not key[0].endswith(".local"):
+                answer = await self._query_servers(key[0], qtype)
+            # An NXDOMAIN or NODATA from a nameserver is final and cached for the
+            # SOA's negative TTL; only fall back when none of them answered
+            if answer is None:
+                answer = await self._system_query(fallback_name or key[0], qtype)
+            records, ttl = answer
+            self.cache.put(key, records, ttl)
+            future.set_result(records)
+            return records
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark it retrieved, in case nobody else was waiting on this lookup
+            future.exception()
+            raise
+        finally:
+            del self.inflight[key]
+
+    async def resolve(self, host):
+        """Resolve a host to (address, family), preferring IPv4 like getaddrinfo usually does."""
+        try:
+            address = ipaddress.ip_address(host)
+            return str(address), socket.AF_INET if address.version == 4 else socket.AF_INET6
+        except ValueError:
+            pass
+        addresses = self.hosts.get(host.lower()) or []
+        if not addresses:
+            ipv4, ipv6 = await asyncio.gather(self.query(host, TYPE_A), self.query(host, TYPE_AAAA))
+            addresses = ipv4 + ipv6
+        if not addresses:
+            raise socket.gaierror(socket.EAI_NONAME, f"Could not resolve {host}")
+        return addresses[0], socket.AF_INET6 if ":" in addresses[0] else socket.AF_INET
+
+    async def reverse(self, address):
+        """PTR name for an address (the hosts file wins), or None."""
+        if address in self.host_names:
+            return self.host_names[address]
+        try:
+            names = await self.query(reverse_name(address), TYPE_PTR, fallback_name=address)
+        except ValueError:
+            return None
+        return names[0].rstrip(".") if names else None
+
+    async def resolve_many(self, hosts, concurrency=DNS_CONCURRENCY):
+        """Resolve many hosts concurrently; map each to (address, family) or None."""
+        return await self._batch(self.resolve, hosts, concurrency)
+
+    async def reverse_many(self, addresses, concurrency=DNS_CONCURRENCY):
+        """Reverse-resolve many addresses concurrently; map each to its name or None."""
+        return await self._batch(self.reverse, addresses, concurrency)
+
+    async def _batch(self, lookup, items, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+        items = list(dict.fromkeys(item for item in items if item))
+
+        async def one(item):
+            async with semaphore:
+                try:
+                    return await lookup(item)
+                except OSError:
+                    return None
+
+        return dict(zip(items, await asyncio.gather(*(one(item) for item in items))))
+
+_resolver = None
+
+def get_resolver():
+    """The process-wide resolver; loads (and saves at exit) DNS_CACHE_FILE when it is set."""
+    global _resolver
+    if _resolver is None:
+        _resolver = Resolver()
+        if DNS_CACHE_FILE:
+            _resolver.cache.load(DNS_CACHE_FILE)
+            atexit.register(_resolver.cache.save, DNS_CACHE_FILE)
+    return _resolver
+
+def resolve_sync(host):
+    """Blocking resolve() for code that isn't running an event loop."""
+    return asyncio.run(get_resolver().resolve(host))
+
+def reverse_many_sync(addresses):
+    """Blocking reverse_many() for code that isn't running an event loop."""
+    return asyncio.run(get_resolver().reverse_many(addresses))
+
+def lookup_names(names, reverse=False):
+    """Resolve (or reverse-resolve) a batch twice to show the cache at work."""
+    resolver = get_resolver()
+    lookup = resolver.reverse_many if reverse else resolver.resolve_many
+    for attempt in ("cold", "cached"):
+        start = time.perf_counter()
+        results = asyncio.run(lookup(names))
+        elapsed = (time.perf_counter() - start) * 1000
+        log_and_print(f"{len(results)} lookup(s) {attempt}: {elapsed:.2f} ms.", level="INFO")
+    for name, result in results.items():
+        if result is None:
+            print(Fore.YELLOW + f"{name:<40} no answer" + Style.RESET_ALL)
+        else:
+            print(Fore.GREEN + f"{name:<40} {result[0] if isinstance(result, tuple) else result}" + Style.RESET_ALL)
+    log_and_print(f"Cache: {len(resolver.cache.entries)} entr(ies), {resolver.stats['hits']} hit(s), "
+                  f"{resolver.stats['misses']} miss(es), {resolver.stats['fallbacks']} system fallback(s).", level="INFO")
+
+if __name__ == "__main__":
+    log_and_print("DNS Resolver started.", level="INFO")
+    resolver = get_resolver()
+    servers = ", ".join(server for server, _ in resolver.nameservers) or "none (system resolver only)"
+    log_and_print(f"Nameservers: {servers}", level="INFO")
+
+    print(Fore.CYAN + "1. Resolve host names" + Style.RESET_ALL)
+    print(Fore.CYAN + "2. Reverse-resolve IP addresses" + Style.RESET_ALL)
+    choice = input(Fore.CYAN + "Select an option (1-2): " + Style.RESET_ALL).strip()
+
+    if choice in ("1", "2"):
+        prompt = "Enter host names" if choice == "1" else "Enter IP addresses"
+        names = [n.strip() for n in input(Fore.CYAN + f"{prompt} separated by commas: " + Style.RESET_ALL).split(",") if n.strip()]
+        if names:
+            lookup_names(names, reverse=choice == "2")
+        else:
+            log_and_print("Nothing to look up. Exiting.", level="ERROR")
+    else:
+        log_and_print("Invalid choice. Exiting.", level="ERROR")
+
+    log_and_print("DNS Resolver finished.", level="INFO")
@@ -11,6 +11,10 @@ from colorama import Fore, Style, init
 # Initialize colorama
 init(autoreset=True)
 
+# One session for the whole run: repeat requests to a host reuse its pooled
+# connection instead of resolving the name and connecting again
+session = requests.Session()
+
 # Logging setup
 LOG_FILE = "http_request_tester.log"
 logging.basicConfig(
@@ -123,28 +127,28 @@ def detect_environment_and_install():
 def send_get_request(url):
     """Send a GET request."""
     log_and_print(f"Sending GET request to {url}...", level="INFO")
-    response = requests.get(url)
+    response = session.get(url)
     print(Fore.GREEN + f"Response: {response.status_code}" + Style.RESET_ALL)
     print(Fore.GREEN + f"Content: {response.text}" + Style.RESET_ALL)
 
 def send_post_request(url, data):
     """Send a POST request."""
     log_and_print(f"Sending POST request to {url} with data {data}...", level="INFO")
-    response = requests.post(url, json=data)
+    response = session.post(url, json=data)
     print(Fore.GREEN + f"Response: {response.status_code}" + Style.RESET_ALL)
     print(Fore.GREEN + f"Content: {response.text}" + Style.RESET_ALL)
 
 def send_put_request(url, data):
     """Send a PUT request."""
     log_and_print(f"Sending PUT request to {url} with data {data}...", level="INFO")
-    response = requests.put(url, json=data)
+    response = session.put(url, json=data)
     print(Fore.GREEN + f"Response: {response.status_code}" + Style.RESET_ALL)
     print(Fore.GREEN + f"Content: {response.text}" + Style.RESET_ALL)
 
 def send_delete_request(url):
     """Send a DELETE request."""
     log_and_print(f"Sending DELETE request to {url}...", level="INFO")
-    response = requests.delete(url)
+    response = session.delete(url)
     print(Fore.GREEN + f"Response: {response.status_code}" + Style.RESET_ALL)
     print(Fore.GREEN + f"Content: {response.text}" + Style.RESET_ALL)
 
@@ -4,6 +4,71 @@ import subprocess
 import platform
 import shutil
 import logging
+import socket
+import struct
+import tempfile
+import threading
+import time
+import json
+import asyncio
+import math
+import mmap
+import random
+import re
+from array import array
+from bisect import bisect_left
+
+# Built-in throughput tester (client/server)
+DEFAULT_SPEED_PORT = 5201
+DEFAULT_STREAMS = 4
+DEFAULT_DURATION = 10.0
+DEFAULT_REPORT_INTERVAL = 1.0
+STREAM_CHUNK = 1 << 20
+STREAM_MAGIC = b"TKSP"
+# Stream header: magic, direction, test duration in seconds
+STREAM_HEADER = struct.Struct("!4sBd")
+UPLOAD = 0
+DOWNLOAD = 1
+# UDP quality test: datagram header is magic, kind, sequence number, sender clock (ns)
+UDP_HEADER = struct.Struct("!4sBIQ")
+UDP_DATA = 0
+UDP_END = 1
+UDP_REPORT = 2
+UDP_ECHO = 3
+# Report body: packets received, reordered, duplicated, RFC 3550 jitter (ms)
+UDP_REPORT_BODY = struct.Struct("!QQQd")
+DEFAULT_UDP_BITRATE = 1.0  # Mbit/s
+DEFAULT_UDP_SIZE = 200     # bytes, roughly a VoIP frame
+UDP_SESSION_IDLE = 60.0
+# Sequence numbers tracked below the highest one for duplicate detection
+UDP_DUP_WINDOW = 4096
+# Latency under load: RTT probe rate and timeout
+LATENCY_PROBE_INTERVAL = 0.1
+LATENCY_PROBE_TIMEOUT = 1.0
+
+# Server selection: candidates come from a JSON list of {"name", "host", "port"}
+SPEED_SERVERS_FILE = "speed_servers.json"
+SERVER_CACHE_FILE = "speed_server_cache.json"
+SERVER_CACHE_TTL = 24 * 3600
+SERVER_PROBE_TIMEOUT = 1.0
+SERVER_PROBE_ATTEMPTS = 3
+SERVER_PROBE_CONCURRENCY = 64
+
+# Result history: one append-only column file per metric ("d" timestamps, "f" values, NaN = not measured)
+SPEED_HISTORY_DIR = "speed_history"
+HISTORY_METRICS = ("download_mbps", "upload_mbps", "ping_ms", "jitter_ms", "loss_pct", "bufferbloat_ms")
+# Metrics where a lower value is better (regression = going up)
+LOWER_IS_BETTER = {"ping_ms", "jitter_ms", "loss_pct", "bufferbloat_ms"}
+DAY = 86400
+# Weeks start on Monday; 1970-01-05 was the first Monday after the epoch
+WEEK_ORIGIN = 4 * DAY
+REGRESSION_BASELINE_DAYS = 28
+REGRESSION_RECENT_DAYS = 7
+REGRESSION_THRESHOLD_PCT = 15.0
+
+# Loopback benchmark: stream counts to try and seconds per run
+BENCHMARK_STREAMS = (1, 2, 4, 8)
+BENCHMARK_DURATION = 3.0
 
 # Configure logging
 logging.basicConfig(
@@ -102,6 +167,10 @@ def network_speed_test():
         print(result.stdout)
         logging.info("Speed test successful.")
         logging.info(result.stdout)
+        # --simple prints "Ping: 12.3 ms", "Download: 95.1 Mbit/s" and "Upload: 20.4 Mbit/s"
+        values = dict(re.findall(r"^(\w+):\s*([\d.]+)", result.stdout, re.MULTILINE))
+        record_speed_result(ping_ms=values.get("Ping"), download_mbps=values.get("Download"),
+                            upload_mbps=values.get("Upload"))
     except subprocess.CalledProcessError as e:
         error_msg = "Speed test failed. Ensure you have an active internet connection."
         print(f"\033[1;31m{error_msg}\033[0m")
@@ -111,13 +180,787 @@ def network_speed_test():
         print(f"\033[1;31m{error_msg}\033[0m")
         logging.error(f"{error_msg}\n{e}")
 
+def _payload_file():
+    """A temp file holding one chunk of random bytes, sent with sendfile() so the payload is never copied into Python."""
+    payload = tempfile.TemporaryFile()
+    payload.write(os.urandom(STREAM_CHUNK))
+    payload.flush()
+    return payload
+
+def _recv_exactly(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed early")
+        data += chunk
+    return data
+
+def send_stream(sock, counters, index, deadline, stop, payload=None):
+    """Send data until the deadline; count bytes into counters[index].
+
+    Uses os.sendfile() from a payload file where the platform supports it
+    for sockets, and otherwise send() from one memoryview buffer.
+    """
+    use_sendfile = payload is not None and hasattr(os, "sendfile")
+    view = memoryview(bytes(STREAM_CHUNK))
+    while not stop.is_set() and time.perf_counter() < deadline:
+        try:
+            if use_sendfile:
+                sent = os.sendfile(sock.fileno(), payload.fileno(), 0, STREAM_CHUNK)
+            else:
+                sent = sock.send(view)
+        except OSError as e:
+            if use_sendfile and not counters[index]:
+                # sendfile() on sockets isn't supported everywhere; fall back to send()
+                use_sendfile = False
+                continue
+            raise
+        if not sent:
+            break
+        counters[index] += sent
+
+def receive_stream(sock, counters, index):
+    """Read until EOF into one reused buffer; count bytes into counters[index]."""
+    view = memoryview(bytearray(STREAM_CHUNK))
+    while True:
+        received = sock.recv_into(view)
+        if not received:
+            return
+        counters[index] += received
+
+def format_rate(byte_count, seconds):
+    """Transfer and bitrate columns in iperf style."""
+    rate = byte_count * 8 / seconds / 1e6 if seconds > 0 else 0.0
+    return f"{byte_count / 1048576:9.1f} MiB  {rate:9.1f} Mbit/s"
+
+def handle_stream(conn, peer, payload):
+    """Serve one test stream: receive (client upload) or send (client download)."""
+    with conn:
+        try:
+            magic, direction, duration = STREAM_HEADER.unpack(_recv_exactly(conn, STREAM_HEADER.size))
+            if magic != STREAM_MAGIC:
+                raise ConnectionError("Not a speed test client")
+            counters = [0]
+            start = time.perf_counter()
+            if direction == UPLOAD:
+                receive_stream(conn, counters, 0)
+                # Report what actually arrived; the client only knows what it queued
+                conn.sendall(struct.pack("!Q", counters[0]))
+            else:
+                send_stream(conn, counters, 0, start + duration, threading.Event(), payload)
+                conn.shutdown(socket.SHUT_WR)
+            kind = "received" if direction == UPLOAD else "sent"
+            logging.info(f"Stream from {peer[0]}:{peer[1]} {kind} {format_rate(counters[0], time.perf_counter() - start)}")
+        except (OSError, ConnectionError, struct.error) as e:
+            logging.warning(f"Stream from {peer[0]}:{peer[1]} failed: {e}")
+
+def _new_udp_stats():
+    return {"received": 0, "highest": -1, "reordered": 0, "duplicates": 0, "window": 0,
+            "transit": None, "jitter_ns": 0.0, "last_seen": time.monotonic()}
+
+def _update_udp_stats(stats, seq, sent_ns, arrival_ns):
+    """Count one datagram: loss/reorder bookkeeping and the RFC 3550 jitter estimate.
+
+    Duplicates are found with a bitmap of the UDP_DUP_WINDOW sequence numbers
+    below the highest one seen (bit i is highest - i), so memory stays fixed
+    however long the test runs. Datagrams older than the window are counted
+    as late arrivals.
+    """
+    stats["last_seen"] = time.monotonic()
+    if seq > stats["highest"]:
+        shift = seq - stats["highest"] if stats["highest"] >= 0 else UDP_DUP_WINDOW
+        stats["window"] = ((stats["window"] << shift) | 1) & ((1 << UDP_DUP_WINDOW) - 1)
+        stats["highest"] = seq
+    else:
+        offset = stats["highest"] - seq
+        if offset < UDP_DUP_WINDOW:
+            if stats["window"] >> offset & 1:
+                stats["duplicates"] += 1
+                return
+            stats["window"] |= 1 << offset
+        stats["reordered"] += 1
+    stats["received"] += 1
+    # Transit time includes the (constant) clock offset between hosts; only its changes matter
+    transit = arrival_ns - sent_ns
+    if stats["transit"] is not None:
+        stats["jitter_ns"] += (abs(transit - stats["transit"]) - stats["jitter_ns"]) / 16
+    stats["transit"] = transit
+
+def serve_udp(sock, stop=None):
+    """Answer UDP test traffic: count data datagrams per client, report on request, echo RTT probes."""
+    sessions = {}
+    sock.settimeout(0.5)
+    while stop is None or not stop.is_set():
+        try:
+            data, peer = sock.recvfrom(65535)
+        except socket.timeout:
+            # Forget clients that went away without asking for their report
+            now = time.monotonic()
+            for key in [key for key, stats in sessions.items() if now - stats["last_seen"] > UDP_SESSION_IDLE]:
+                del sessions[key]
+            continue
+        except OSError:
+            if sock.fileno() == -1:
+                break  # run_server closed the socket
+            continue
+        arrival_ns = time.perf_counter_ns()
+        if len(data) < UDP_HEADER.size:
+            continue
+        magic, kind, seq, sent_ns = UDP_HEADER.unpack_from(data)
+        if magic != STREAM_MAGIC:
+            continue
+        if kind == UDP_ECHO:
+            sock.sendto(data, peer)
+        elif kind == UDP_DATA:
+            _update_udp_stats(sessions.setdefault(peer, _new_udp_stats()), seq, sent_ns, arrival_ns)
+        elif kind == UDP_END:
+            # The client repeats END until a report arrives, so keep the session until it goes idle
+            stats = sessions.get(peer) or _new_udp_stats()
+            body = UDP_REPORT_BODY.pack(stats["received"], stats["reordered"], stats["duplicates"], stats["jitter_ns"] / 1e6)
+            sock.sendto(UDP_HEADER.pack(STREAM_MAGIC, UDP_REPORT, seq, 0) + body, peer)
+            logging.info(f"UDP test from {peer[0]}:{peer[1]}: {stats['received']}/{seq} received, "
+                         f"{stats['reordered']} reordered, jitter {stats['jitter_ns'] / 1e6:.3f} ms")
+
+def run_server(port=DEFAULT_SPEED_PORT, host="", ready=None, stop=None):
+    """Accept test streams until interrupted (or until `stop` is set), one thread per stream.
+
+    A UDP socket on the same port serves the jitter/loss test and RTT probes.
+    """
+    payload = _payload_file()
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    server = socket.socket(family, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind((host, port))
+    server.listen(64)
+    server.settimeout(0.5)
+    udp_server = socket.socket(family, socket.SOCK_DGRAM)
+    udp_server.bind((host, server.getsockname()[1]))
+    threading.Thread(target=serve_udp, args=(udp_server, stop), daemon=True).start()
+    if ready is not None:
+        ready.append(server.getsockname()[1])
+    else:
+        log_and_print(f"Speed test server listening on TCP and UDP port {server.getsockname()[1]} (Ctrl+C to stop).")
+    try:
+        while stop is None or not stop.is_set():
+            try:
+                conn, peer = server.accept()
+            except socket.timeout:
+                continue
+            conn.settimeout(None)
+            threading.Thread(target=handle_stream, args=(conn, peer, payload), daemon=True).start()
+    finally:
+        server.close()
+        payload.close()
+        if stop is not None:
+            stop.set()
+        udp_server.close()
+
+def _client_stream(host, port, direction, duration, counters, results, index, start, stop, payload):
+    try:
+        with socket.create_connection((host, port), timeout=5) as sock:
+            sock.settimeout(None)
+            # Connect first, but only send the header (which starts a download) on the shared start signal
+            start.wait()
+            sock.sendall(STREAM_HEADER.pack(STREAM_MAGIC, direction, duration))
+            if direction == UPLOAD:
+                send_stream(sock, counters, index, time.perf_counter() + duration, stop, payload)
+                sock.shutdown(socket.SHUT_WR)
+                results[index] = struct.unpack("!Q", _recv_exactly(sock, 8))[0]
+            else:
+                receive_stream(sock, counters, index)
+                results[index] = counters[index]
+    except (OSError, ConnectionError) as e:
+        logging.error(f"Stream {index + 1} failed: {e}")
+
+def run_client(host, port=DEFAULT_SPEED_PORT, streams=DEFAULT_STREAMS, duration=DEFAULT_DURATION,
+               direction=UPLOAD, interval=DEFAULT_REPORT_INTERVAL, quiet=False):
+    """Run N parallel TCP streams against a server, printing per-interval throughput.
+
+    Returns the total bytes delivered (as counted by the receiving side)
+    and the elapsed seconds.
+    """
+    counters = [0] * streams
+    results = [None] * streams
+    start, stop = threading.Event(), threading.Event()
+    payload = _payload_file()
+    threads = [threading.Thread(target=_client_stream, daemon=True,
+                                args=(host, port, direction, duration, counters, results, index, start, stop, payload))
+               for index in range(streams)]
+    for thread in threads:
+        thread.start()
+    # Let the connections come up before starting the clock
+    time.sleep(0.1)
+    began = last_time = time.perf_counter()
+    last = [0] * streams
+    start.set()
+    if not quiet:
+        label = "upload" if direction == UPLOAD else "download"
+        print(f"\033[1;34mTesting {label} to {host}:{port} with {streams} stream(s) for {duration:g}s...\033[0m")
+        print(f"[ ID] Interval          Transfer       Bitrate")
+    try:
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(max(0.0, last_time + interval - time.perf_counter()))
+            now = time.perf_counter()
+            # Report full intervals, plus the short last one once all streams are done
+            alive = any(thread.is_alive() for thread in threads)
+            if quiet or (alive and now - last_time < interval * 0.99) or now - last_time < 0.01:
+                continue
+            window = (last_time - began, now - began)
+            snapshot = list(counters)
+            for index in range(streams if streams > 1 else 1):
+                print(f"[{index + 1:>3}] {window[0]:5.2f}-{window[1]:5.2f} s  "
+                      f"{format_rate(snapshot[index] - last[index], now - last_time)}")
+            if streams > 1:
+                print(f"[SUM] {window[0]:5.2f}-{window[1]:5.2f} s  {format_rate(sum(snapshot) - sum(last), now - last_time)}")
+            last, last_time = snapshot, now
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in threads:
+            thread.join(2)
+    finally:
+        payload.close()
+    elapsed = time.perf_counter() - began
+    total = sum(result or 0 for result in results)
+    if not quiet:
+        failed = results.count(None)
+        print(f"\033[1;32m[SUM] 0.00-{elapsed:5.2f} s  {format_rate(total, elapsed)}  (receiver)\033[0m")
+        if failed:
+            print(f"\033[1;31m{failed} stream(s) failed; see data.log.\033[0m")
+        logging.info(f"{host}:{port} {streams} stream(s): {format_rate(total, elapsed)}")
+        if failed < streams and elapsed > 0:
+            metric = "upload_mbps" if direction == UPLOAD else "download_mbps"
+            record_speed_result(**{metric: total * 8 / elapsed / 1e6})
+    return total, elapsed
+
+def run_udp_client(host, port=DEFAULT_SPEED_PORT, bitrate_mbps=DEFAULT_UDP_BITRATE, duration=DEFAULT_DURATION,
+                   size=DEFAULT_UDP_SIZE, quiet=False, record=True):
+    """Send paced, sequence-numbered datagrams and fetch the server's loss/reorder/jitter report.
+
+    Returns a result dict, or None if the server never sent its report.
+    """
+    size = max(size, UDP_HEADER.size)
+    gap = size * 8 / (bitrate_mbps * 1e6)
+    packet = bytearray(size)
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    with socket.socket(family, socket.SOCK_DGRAM) as sock:
+        sock.connect((host, port))
+        if not quiet:
+            print(f"\033[1;34mSending {bitrate_mbps:g} Mbit/s of {size}-byte datagrams to {host}:{port} "
+                  f"for {duration:g}s...\033[0m")
+        start = time.perf_counter()
+        seq = 0
+        while True:
+            now = time.perf_counter()
+            if now - start >= duration:
+                break
+            # Send every datagram that is due, then sleep until the next one
+            due = int((now - start) / gap) + 1
+            while seq < due:
+                UDP_HEADER.pack_into(packet, 0, STREAM_MAGIC, UDP_DATA, seq, time.perf_counter_ns())
+                try:
+                    sock.send(packet)
+                except (BlockingIOError, ConnectionRefusedError):
+                    pass
+                seq += 1
+            time.sleep(max(0.0, start + seq * gap - time.perf_counter()))
+
+        # Ask for the report; END and REPORT can be lost too, so retry a few times
+        sock.settimeout(0.5)
+        report = None
+        for _ in range(6):
+            sock.send(UDP_HEADER.pack(STREAM_MAGIC, UDP_END, seq, 0))
+            try:
+                while True:
+                    data = sock.recv(65535)
+                    if len(data) == UDP_HEADER.size + UDP_REPORT_BODY.size and data[4] == UDP_REPORT:
+                        report = UDP_REPORT_BODY.unpack_from(data, UDP_HEADER.size)
+                        break
+            except (socket.timeout, ConnectionRefusedError):
+                continue
+            break
+    if report is None:
+        if not quiet:
+            log_and_print("No report from the server (is it running, and is UDP allowed through?).", level="ERROR")
+        return None
+    received, reordered, duplicates, jitter_ms = report
+    result = {"sent": seq, "received": received, "lost": max(0, seq - received),
+              "loss_pct": 100.0 * max(0, seq - received) / seq if seq else 0.0,
+              "reordered": reordered, "duplicates": duplicates, "jitter_ms": jitter_ms}
+    if not quiet:
+        print(f"\033[1;32mSent {seq}, received {received}, lost {result['lost']} ({result['loss_pct']:.2f}%), "
+              f"reordered {reordered}, jitter {jitter_ms:.3f} ms\033[0m")
+    logging.info(f"UDP test to {host}:{port}: {result}")
+    if record:
+        record_speed_result(jitter_ms=jitter_ms, loss_pct=result["loss_pct"])
+    return result
+
+def probe_rtts(host, port, duration, interval=LATENCY_PROBE_INTERVAL):
+    """Round-trip times (ms, None when lost) of UDP echo probes sent every `interval`."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    rtts = []
+    with socket.socket(family, socket.SOCK_DGRAM) as sock:
+        sock.connect((host, port))
+        end = time.perf_counter() + duration
+        seq = 0
+        while time.perf_counter() < end:
+            sent = time.perf_counter()
+            sock.send(UDP_HEADER.pack(STREAM_MAGIC, UDP_ECHO, seq, 0))
+            sock.settimeout(LATENCY_PROBE_TIMEOUT)
+            rtt = None
+            try:
+                while rtt is None:
+                    data = sock.recv(64)
+                    # Late echoes of earlier probes are skipped
+                    if len(data) >= UDP_HEADER.size and UDP_HEADER.unpack_from(data)[2] == seq:
+                        rtt = (time.perf_counter() - sent) * 1000
+            except (socket.timeout, ConnectionRefusedError):
+                pass
+            rtts.append(rtt)
+            seq += 1
+            time.sleep(max(0.0, sent + interval - time.perf_counter()))
+    return rtts
+
+def _rtt_summary(rtts):
+    answered = sorted(rtt for rtt in rtts if rtt is not None)
+    if not answered:
+        return {"median": None, "p95": None, "loss_pct": 100.0}
+    return {"median": answered[len(answered) // 2],
+            "p95": answered[min(len(answered) - 1, int(len(answered) * 0.95))],
+            "loss_pct": 100.0 * (len(rtts) - len(answered)) / len(rtts)}
+
+def latency_under_load(host, port=DEFAULT_SPEED_PORT, streams=DEFAULT_STREAMS, duration=DEFAULT_DURATION, record=True):
+    """Compare RTT idle vs. while TCP uploads saturate the link; the difference is bufferbloat."""
+    print(f"\033[1;34mMeasuring idle latency to {host}:{port}...\033[0m")
+    idle = _rtt_summary(probe_rtts(host, port, min(duration, 5.0)))
+    if idle["median"] is None:
+        log_and_print("No replies to RTT probes; is the server running?", level="ERROR")
+        return None
+    print(f"\033[1;34mMeasuring latency under load ({streams} upload stream(s))...\033[0m")
+    load = threading.Thread(target=run_client, args=(host, port, streams, duration), kwargs={"quiet": True}, daemon=True)
+    load.start()
+    # Skip the first second while TCP ramps up and queues fill
+    time.sleep(min(1.0, duration / 4))
+    loaded = _rtt_summary(probe_rtts(host, port, max(0.5, duration - 1.5)))
+    load.join()
+
+    def ms(value):
+        return f"{value:8.2f} ms" if value is not None else "       - "
+
+    print(f"{'':<8} {'median':>11} {'p95':>11} {'loss':>7}")
+    for label, summary in (("idle", idle), ("loaded", loaded)):
+        print(f"{label:<8} {ms(summary['median'])} {ms(summary['p95'])} {summary['loss_pct']:6.1f}%")
+    added = None
+    if loaded["median"] is not None:
+        added = loaded["median"] - idle["median"]
+        color = "\033[1;31m" if added > 30 else "\033[1;32m"
+        print(f"{color}Bufferbloat: {added:+.2f} ms median latency under load\033[0m")
+    logging.info(f"Latency to {host}:{port}: idle {idle}, loaded {loaded}")
+    if record:
+        record_speed_result(ping_ms=idle["median"], bufferbloat_ms=added)
+    return {"idle": idle, "loaded": loaded}
+
+def shape_loopback(delay_ms=0, jitter_ms=0, loss_pct=0.0, reorder_pct=0.0, device="lo"):
+    """Add a netem qdisc (needs root and tc); returns True if shaping is active."""
+    if not shutil.which("tc"):
+        log_and_print("tc not found; running without netem shaping.", level="WARNING")
+        return False
+    command = ["tc", "qdisc", "replace", "dev", device, "root", "netem", "delay", f"{delay_ms}ms", f"{jitter_ms}ms"]
+    if loss_pct:
+        command += ["loss", f"{loss_pct}%"]
+    if reorder_pct:
+        command += ["reorder", f"{reorder_pct}%"]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        log_and_print(f"Could not apply netem ({result.stderr.strip()}); running without shaping.", level="WARNING")
+        return False
+    log_and_print(f"netem on {device}: delay {delay_ms}ms ±{jitter_ms}ms, loss {loss_pct}%, reorder {reorder_pct}%")
+    return True
+
+def clear_loopback_shaping(device="lo"):
+    subprocess.run(["tc", "qdisc", "del", "dev", device, "root"], capture_output=True)
+
+def _start_local_server():
+    """Run a server on an ephemeral loopback port in this process; return (port, stop event, thread)."""
+    ready, stop = [], threading.Event()
+    server = threading.Thread(target=run_server, kwargs={"port": 0, "host": "127.0.0.1", "ready": ready, "stop": stop},
+                              daemon=True)
+    server.start()
+    while not ready:
+        time.sleep(0.01)
+    return ready[0], stop, server
+
+def loopback_quality_test(bitrate_mbps=DEFAULT_UDP_BITRATE, duration=5.0, shaping=None):
+    """End-to-end UDP quality and bufferbloat test over loopback, optionally shaped by netem."""
+    port, stop, server = _start_local_server()
+    shaped = shape_loopback(**shaping) if shaping else False
+    try:
+        run_udp_client("127.0.0.1", port, bitrate_mbps, duration, record=False)
+        latency_under_load("127.0.0.1", port, streams=2, duration=duration, record=False)
+    finally:
+        if shaped:
+            clear_loopback_shaping()
+        stop.set()
+        server.join()
+
+def loopback_benchmark(streams_list=BENCHMARK_STREAMS, duration=BENCHMARK_DURATION):
+    """Measure the tool's own ceiling: client and server over loopback on this machine."""
+    port, stop, server = _start_local_server()
+    print("\033[1;34mLoopback benchmark (client and server in this process):\033[0m")
+    print(f"{'Streams':>7}  {'Direction':<9}  {'Transfer':>13}  {'Bitrate':>16}")
+    try:
+        for streams in streams_list:
+            for direction in (UPLOAD, DOWNLOAD):
+                total, elapsed = run_client("127.0.0.1", port, streams, duration, direction, quiet=True)
+                label = "upload" if direction == UPLOAD else "download"
+                print(f"{streams:>7}  {label:<9}  {format_rate(total, elapsed)}")
+                logging.info(f"Loopback {streams} stream(s) {label}: {format_rate(total, elapsed)}")
+    finally:
+        stop.set()
+        server.join()
+
+def _column_path(directory, column):
+    return os.path.join(directory, f"{column}.{'d' if column == 'timestamp' else 'f'}")
+
+def _column_rows(directory, column):
+    path = _column_path(directory, column)
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    return size // array("d" if column == "timestamp" else "f").itemsize
+
+def record_speed_result(directory=SPEED_HISTORY_DIR, timestamp=None, **metrics):
+    """Append one run to the history; metrics that weren't measured are stored as NaN."""
+    os.makedirs(directory, exist_ok=True)
+    # The timestamp column defines the row count. A crash between column writes
+    # leaves metrics a row long (trim them) or short, and a deleted or newly
+    # added metric has no file at all (pad those with NaN)
+    rows = _column_rows(directory, "timestamp")
+    for metric in HISTORY_METRICS:
+        metric_rows = _column_rows(directory, metric)
+        if metric_rows > rows:
+            with open(_column_path(directory, metric), "r+b") as column_file:
+                column_file.truncate(rows * array("f").itemsize)
+        elif metric_rows < rows:
+            with open(_column_path(directory, metric), "ab") as column_file:
+                array("f", [math.nan] * (rows - metric_rows)).tofile(column_file)
+
+    timestamp = time.time() if timestamp is None else timestamp
+    if rows:
+        # Keep timestamps sorted for bisect, even if the clock stepped backwards
+        with open(_column_path(directory, "timestamp"), "rb") as column_file:
+            column_file.seek((rows - 1) * 8)
+            timestamp = max(timestamp, array("d", column_file.read(8))[0])
+    with open(_column_path(directory, "timestamp"), "ab") as column_file:
+        array("d", [timestamp]).tofile(column_file)
+    for metric in HISTORY_METRICS:
+        value = metrics.get(metric)
+        with open(_column_path(directory, metric), "ab") as column_file:
+            array("f", [math.nan if value is None else float(value)]).tofile(column_file)
+
+def load_history(start, end, metrics=HISTORY_METRICS, directory=SPEED_HISTORY_DIR):
+    """Rows with start <= timestamp < end, as {"timestamp": array, metric: array, ...}.
+
+    The timestamp column is memory-mapped and binary-searched, and only the
+    matching slice of each requested metric column is read from disk. Rows a
+    metric column doesn't reach (or a missing column) read as NaN.
+    """
+    rows = _column_rows(directory, "timestamp")
+    result = {"timestamp": array("d")}
+    result.update({metric: array("f") for metric in metrics})
+    if not rows:
+        return result
+    with open(_column_path(directory, "timestamp"), "rb") as column_file:
+        mapped = mmap.mmap(column_file.fileno(), rows * 8, access=mmap.ACCESS_READ)
+        timestamps = memoryview(mapped).cast("d")
+        try:
+            lo, hi = bisect_left(timestamps, start), bisect_left(timestamps, end)
+            result["timestamp"].frombytes(timestamps[lo:hi].tobytes())
+        finally:
+            timestamps.release()
+            mapped.close()
+    for metric in metrics:
+        available = max(0, min(hi, _column_rows(directory, metric)) - lo)
+        if available:
+            with open(_column_path(directory, metric), "rb") as column_file:
+                column_file.seek(lo * 4)
+                result[metric].fromfile(column_file, available)
+        result[metric].extend([math.nan] * (hi - lo - available))
+    return result
+
+def _percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def period_percentiles(metric, start, end, period=DAY, percentiles=(50, 90, 99), directory=SPEED_HISTORY_DIR):
+    """Per-day (or per-week, with period=7*DAY) percentiles of a metric: [(period start, runs, {pct: value})]."""
+    origin = WEEK_ORIGIN if period % (7 * DAY) == 0 else 0
+    history = load_history(start, end, (metric,), directory)
+    buckets = {}
+    for timestamp, value in zip(history["timestamp"], history[metric]):
+        if not math.isnan(value):
+            buckets.setdefault((timestamp - origin) // period * period + origin, []).append(value)
+    return [(bucket, len(values), {pct: _percentile(sorted(values), pct) for pct in percentiles})
+            for bucket, values in sorted(buckets.items())]
+
+def detect_regression(metric, now=None, baseline_days=REGRESSION_BASELINE_DAYS, recent_days=REGRESSION_RECENT_DAYS,
+                      threshold_pct=REGRESSION_THRESHOLD_PCT, directory=SPEED_HISTORY_DIR):
+    """Compare the recent median against the preceding baseline window.
+
+    A regression is a change in the bad direction of more than
+    `threshold_pct` percent that also falls outside the baseline's
+    interquartile range, so ordinary day-to-day noise isn't flagged.
+    """
+    now = time.time() if now is None else now
+    recent_start = now - recent_days * DAY
+    history = load_history(recent_start - baseline_days * DAY, now, (metric,), directory)
+    split = bisect_left(history["timestamp"], recent_start)
+    baseline = sorted(value for value in history[metric][:split] if not math.isnan(value))
+    recent = sorted(value for value in history[metric][split:] if not math.isnan(value))
+    if len(baseline) < 4 or not recent:
+        return None
+    base_median, recent_median = _percentile(baseline, 50), _percentile(recent, 50)
+    change_pct = (recent_median - base_median) / base_median * 100 if base_median else 0.0
+    worse = change_pct > 0 if metric in LOWER_IS_BETTER else change_pct < 0
+    outside = not (_percentile(baseline, 25) <= recent_median <= _percentile(baseline, 75))
+    return {"metric": metric, "baseline_median": base_median, "recent_median": recent_median,
+            "change_pct": change_pct, "baseline_runs": len(baseline), "recent_runs": len(recent),
+            "regression": worse and outside and abs(change_pct) > threshold_pct}
+
+def show_trends(metric, days=30, weekly=False, directory=SPEED_HISTORY_DIR):
+    """Print daily or weekly percentiles for the last `days` and a regression check."""
+    now = time.time()
+    period = 7 * DAY if weekly else DAY
+    rows = period_percentiles(metric, now - days * DAY, now, period, directory=directory)
+    if not rows:
+        log_and_print(f"No {metric} history in the last {days} day(s).", level="WARNING")
+        return
+    print(f"\033[1;34m{'Week of' if weekly else 'Day':<12} {'Runs':>5} {'p50':>10} {'p90':>10} {'p99':>10}  ({metric})\033[0m")
+    for bucket, runs, values in rows:
+        print(f"{time.strftime('%Y-%m-%d', time.gmtime(bucket)):<12} {runs:>5} "
+              f"{values[50]:>10.2f} {values[90]:>10.2f} {values[99]:>10.2f}")
+    verdict = detect_regression(metric, now, directory=directory)
+    if verdict is None:
+        print("Not enough history for a regression check.")
+    else:
+        color = "\033[1;31m" if verdict["regression"] else "\033[1;32m"
+        label = "REGRESSION" if verdict["regression"] else "no regression"
+        print(f"{color}{label}: last {REGRESSION_RECENT_DAYS} days median {verdict['recent_median']:.2f} vs "
+              f"{verdict['baseline_median']:.2f} before ({verdict['change_pct']:+.1f}%)\033[0m")
+
+def benchmark_history(months=6):
+    """Fill a scratch history with hourly runs for `months` and time typical queries on it."""
+    directory = tempfile.mkdtemp(prefix="speed_history_")
+    now = time.time()
+    runs = months * 30 * 24
+    start = time.perf_counter()
+    for hour in range(runs):
+        # Download degrades by 20% over the final week, to give the regression check something to find
+        slowdown = 0.8 if hour > runs - 7 * 24 else 1.0
+        record_speed_result(directory, now - (runs - hour) * 3600,
+                            download_mbps=random.gauss(100, 5) * slowdown, upload_mbps=random.gauss(20, 2),
+                            ping_ms=random.gauss(15, 2), jitter_ms=abs(random.gauss(1, 0.3)))
+    print(f"Wrote {runs} hourly runs in {time.perf_counter() - start:.2f}s "
+          f"({sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory)) / 1024:.0f} KiB).")
+    for label, query in (("1 day range", lambda: load_history(now - DAY, now, ("download_mbps",), directory)),
+                         ("30 daily percentiles", lambda: period_percentiles("download_mbps", now - 30 * DAY, now,
+                                                                              directory=directory)),
+                         ("regression check", lambda: detect_regression("download_mbps", now, directory=directory))):
+        start = time.perf_counter()
+        result = query()
+        print(f"{label:<22} {(time.perf_counter() - start) * 1000:8.2f} ms")
+    print(f"Regression check result: {result}")
+    shutil.rmtree(directory)
+
+def load_server_list(path=SPEED_SERVERS_FILE):
+    """Candidate servers from the config file, e.g. [{"name": "office", "host": "10.0.0.5", "port": 5201}]."""
+    with open(path) as servers_file:
+        servers = json.load(servers_file)
+    return [{"name": server.get("name") or server["host"], "host": server["host"],
+             "port": int(server.get("port", DEFAULT_SPEED_PORT))} for server in servers]
+
+def network_key():
+    """Identify the network we're on: default gateway MAC (Linux) plus our egress address."""
+    gateway_mac = "-"
+    try:
+        with open("/proc/net/route") as route_file:
+            next(route_file)  # header
+            # Columns: Iface, Destination, Gateway (little-endian hex), ...
+            gateway = next((fields[2] for fields in (line.split() for line in route_file)
+                            if len(fields) > 2 and fields[1] == "00000000"), None)
+        if gateway:
+            gateway_ip = socket.inet_ntoa(struct.pack("<I", int(gateway, 16)))
+            with open("/proc/net/arp") as arp_file:
+                next(arp_file)
+                gateway_mac = next((fields[3] for fields in (line.split() for line in arp_file)
+                                    if len(fields) >= 4 and fields[0] == gateway_ip), "-")
+    except (OSError, StopIteration, ValueError):
+        pass
+    egress = "-"
+    try:
+        # Connecting a UDP socket sends nothing but picks the outgoing address
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.connect(("192.0.2.1", 9))
+            egress = sock.getsockname()[0]
+    except OSError:
+        pass
+    return f"{gateway_mac}|{egress}"
+
+async def _connect_rtt(host, port, timeout=SERVER_PROBE_TIMEOUT, attempts=SERVER_PROBE_ATTEMPTS):
+    """Best TCP-connect time (ms) out of a few attempts, or None if none connected."""
+    best = None
+    for _ in range(attempts):
+        start = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        except (OSError, asyncio.TimeoutError):
+            continue
+        rtt = (time.perf_counter() - start) * 1000
+        writer.close()
+        best = rtt if best is None else min(best, rtt)
+    return best
+
+async def rank_servers(servers, timeout=SERVER_PROBE_TIMEOUT):
+    """Probe all servers at once; return the reachable ones sorted by connect RTT."""
+    semaphore = asyncio.Semaphore(SERVER_PROBE_CONCURRENCY)
+
+    async def probe(server):
+        async with semaphore:
+            return {**server, "rtt_ms": await _connect_rtt(server["host"], server["port"], timeout)}
+
+    results = await asyncio.gather(*(probe(server) for server in servers))
+    return sorted((result for result in results if result["rtt_ms"] is not None), key=lambda result: result["rtt_ms"])
+
+def load_server_cache(path=SERVER_CACHE_FILE, ttl=SERVER_CACHE_TTL):
+    """Load per-network server rankings that are still within `ttl` seconds."""
+    try:
+        with open(path) as cache_file:
+            cache = json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+    now = time.time()
+    return {key: entry for key, entry in cache.items() if now - entry["checked"] < ttl}
+
+def save_server_cache(cache, path=SERVER_CACHE_FILE):
+    """Write server rankings back to disk."""
+    try:
+        with open(path, "w") as cache_file:
+            json.dump(cache, cache_file, indent=2)
+    except OSError as e:
+        log_and_print(f"Could not save server cache: {e}", level="WARNING")
+
+def select_server(servers=None, refresh=False, cache_path=SERVER_CACHE_FILE):
+    """Pick the lowest-latency server, reusing this network's cached ranking when it is fresh.
+
+    A cached winner gets one quick connect check; if it doesn't answer, the
+    next cached entries are tried, and only then are all servers re-probed.
+    """
+    servers = load_server_list() if servers is None else servers
+    key = network_key()
+    cache = load_server_cache(cache_path)
+    known = {(server["host"], server["port"]) for server in servers}
+    if not refresh and key in cache:
+        for cached in cache[key]["ranking"][:3]:
+            if (cached["host"], cached["port"]) in known and asyncio.run(_connect_rtt(cached["host"], cached["port"], attempts=1)):
+                log_and_print(f"Using cached best server {cached['name']} ({cached['host']}:{cached['port']}, "
+                              f"{cached['rtt_ms']:.1f} ms when ranked).")
+                return cached
+    start = time.perf_counter()
+    ranking = asyncio.run(rank_servers(servers))
+    log_and_print(f"Probed {len(servers)} server(s) in {time.perf_counter() - start:.2f}s; {len(ranking)} reachable.")
+    for server in ranking[:5]:
+        print(f"  {server['rtt_ms']:8.2f} ms  {server['name']} ({server['host']}:{server['port']})")
+    if not ranking:
+        return None
+    cache[key] = {"checked": time.time(), "ranking": ranking[:10]}
+    save_server_cache(cache, cache_path)
+    return ranking[0]
+
+def _ask_server():
+    """Ask for a server; blank picks the best one from SPEED_SERVERS_FILE. Returns (host, port) or (None, None)."""
+    host = input(f"Server host (blank to pick the fastest from {SPEED_SERVERS_FILE}): ").strip()
+    if host:
+        return host, int(_ask_number("Port", DEFAULT_SPEED_PORT, int))
+    try:
+        server = select_server()
+    except (OSError, ValueError, KeyError) as e:
+        log_and_print(f"Could not read {SPEED_SERVERS_FILE}: {e}", level="ERROR")
+        return None, None
+    if server is None:
+        log_and_print("None of the configured servers answered.", level="ERROR")
+        return None, None
+    return server["host"], server["port"]
+
+def _ask_number(prompt, default, kind=float):
+    value = input(f"{prompt} [{default:g}]: ").strip()
+    return kind(value) if value else default
+
 if __name__ == "__main__":
     # Display a simple interface
     print("\033[1;36m" + "=" * 40 + "\033[0m")
     print("\033[1;36m     Network Speed Test Utility\033[0m")
     print("\033[1;36m" + "=" * 40 + "\033[0m")
 
-    # Check dependencies and run the test
-    detect_environment_and_install()
-    check_dependency()
-    network_speed_test()
+    print("1. Public speed test (speedtest-cli, needs internet)")
+    print("2. Run a throughput test server")
+    print("3. Run a throughput test client")
+    print("4. Loopback benchmark (the tester's own ceiling)")
+    print("5. UDP jitter and packet-loss test")
+    print("6. Latency under load (bufferbloat)")
+    print("7. Loopback quality test (optionally shaped with netem)")
+    print("8. Show result trends and check for regressions")
+    print("9. Benchmark the result history store")
+    choice = input("Select an option (1-9): ").strip()
+
+    try:
+        if choice == "1":
+            # Check dependencies and run the test
+            detect_environment_and_install()
+            check_dependency()
+            network_speed_test()
+        elif choice == "2":
+            run_server(int(_ask_number("Port", DEFAULT_SPEED_PORT, int)))
+        elif choice == "3":
+            host, port = _ask_server()
+            streams = int(_ask_number("Parallel streams", DEFAULT_STREAMS, int))
+            duration = _ask_number("Duration in seconds", DEFAULT_DURATION)
+            direction = DOWNLOAD if input("Direction (upload/download) [upload]: ").strip().lower() == "download" else UPLOAD
+            if not host or streams < 1 or duration <= 0:
+                log_and_print("A host, at least one stream and a positive duration are required.", level="ERROR")
+            else:
+                run_client(host, port, streams, duration, direction)
+        elif choice == "4":
+            loopback_benchmark()
+        elif choice in ("5", "6"):
+            host, port = _ask_server()
+            duration = _ask_number("Duration in seconds", DEFAULT_DURATION)
+            if not host or duration <= 0:
+                log_and_print("A host and a positive duration are required.", level="ERROR")
+            elif choice == "5":
+                bitrate = _ask_number("Bitrate in Mbit/s", DEFAULT_UDP_BITRATE)
+                size = int(_ask_number("Datagram size in bytes", DEFAULT_UDP_SIZE, int))
+                run_udp_client(host, port, bitrate, duration, size)
+            else:
+                latency_under_load(host, port, int(_ask_number("Upload streams for load", DEFAULT_STREAMS, int)), duration)
+        elif choice == "7":
+            shaping = None
+            if input("Shape loopback with netem (needs root and tc)? (y/n): ").strip().lower() == "y":
+                shaping = {"delay_ms": _ask_number("Delay in ms", 20), "jitter_ms": _ask_number("Jitter in ms", 5),
+                           "loss_pct": _ask_number("Loss %", 1), "reorder_pct": _ask_number("Reorder %", 0)}
+            loopback_quality_test(_ask_number("Bitrate in Mbit/s", DEFAULT_UDP_BITRATE), shaping=shaping)
+        elif choice == "8":
+            metric = input(f"Metric ({', '.join(HISTORY_METRICS)}) [download_mbps]: ").strip() or "download_mbps"
+            days = int(_ask_number("Days of history", 30, int))
+            weekly = input("Group by week instead of day? (y/n): ").strip().lower() == "y"
+            if metric not in HISTORY_METRICS:
+                log_and_print(f"Unknown metric: {metric}", level="ERROR")
+            else:
+                show_trends(metric, days, weekly)
+        elif choice == "9":
+            benchmark_history()
+        else:
+            log_and_print("Invalid choice. Exiting.", level="ERROR")
+    except ValueError as e:
+        log_and_print(f"Invalid input: {e}", level="ERROR")
+    except OSError as e:
+        log_and_print(f"Network error: {e}", level="ERROR")
+    except KeyboardInterrupt:
+        log_and_print("Stopped by user.")
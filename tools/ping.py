@@ -1,8 +1,43 @@
 import os
+import socket
+import struct
+import asyncio
 import subprocess
 import platform
 import logging
+import time
+import math
+import json
+import sys
+import ipaddress
+from array import array
 from colorama import Fore, Style
+from dns_resolver import get_resolver
+
+# In-process engine defaults
+DEFAULT_CONCURRENCY = 256
+DEFAULT_TIMEOUT = 1.0
+DEFAULT_INTERVAL = 0.5
+DEFAULT_TCP_PORT = 80
+DEFAULT_UDP_PORT = 33434
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+ICMP6_ECHO_REQUEST = 128
+ICMP6_ECHO_REPLY = 129
+
+# Probe outcomes that prove the host is up
+ALIVE_STATUSES = ("reply", "refused")
+
+# Monitor mode: log-spaced RTT buckets from 10 µs to 60 s, each ~2% wide
+HISTOGRAM_MIN_MS = 0.01
+HISTOGRAM_MAX_MS = 60000.0
+HISTOGRAM_GROWTH = 1.02
+HISTOGRAM_BUCKETS = int(math.log(HISTOGRAM_MAX_MS / HISTOGRAM_MIN_MS) / math.log(HISTOGRAM_GROWTH)) + 2
+MONITOR_PERCENTILES = (50, 95, 99)
+
+# Sweep mode defaults
+DEFAULT_SWEEP_PPS = 500
 
 # Set up logging configuration
 LOG_FILE = "data.log"
@@ -101,16 +136,584 @@ def ping_host(host, count=4):
     except Exception as e:
         log_and_print(f"An unexpected error occurred: {e}", level="ERROR")
 
+_icmp_permitted = {}
+
+def icmp_available(family=socket.AF_INET):
+    """Check whether unprivileged ICMP datagram sockets can be opened."""
+    if family not in _icmp_permitted:
+        proto = socket.IPPROTO_ICMP if family == socket.AF_INET else socket.IPPROTO_ICMPV6
+        try:
+            socket.socket(family, socket.SOCK_DGRAM, proto).close()
+            _icmp_permitted[family] = True
+        except OSError:
+            # Linux only allows this for groups listed in net.ipv4.ping_group_range
+            _icmp_permitted[family] = False
+    return _icmp_permitted[family]
+
+def _elapsed_ms(start):
+    """Milliseconds since a perf_counter_ns() reading."""
+    return (time.perf_counter_ns() - start) / 1e6
+
+async def _icmp_probe(address, family, seq, timeout):
+    """Send one ICMP echo over a datagram socket and wait for the matching reply."""
+    loop = asyncio.get_running_loop()
+    if family == socket.AF_INET:
+        proto, request_type, reply_type = socket.IPPROTO_ICMP, ICMP_ECHO_REQUEST, ICMP_ECHO_REPLY
+    else:
+        proto, request_type, reply_type = socket.IPPROTO_ICMPV6, ICMP6_ECHO_REQUEST, ICMP6_ECHO_REPLY
+
+    # The kernel fills in the identifier and checksum for ping sockets
+    payload = os.urandom(16)
+    packet = struct.pack("!BBHHH", request_type, 0, 0, 0, seq) + payload
+
+    sock = socket.socket(family, socket.SOCK_DGRAM, proto)
+    sock.setblocking(False)
+    try:
+        sock.connect((address, 0))
+        start = time.perf_counter_ns()
+        await loop.sock_sendall(sock, packet)
+        deadline = loop.time() + timeout
+        while True:
+            data = await asyncio.wait_for(loop.sock_recv(sock, 1024), deadline - loop.time())
+            rtt = _elapsed_ms(start)
+            if len(data) >= 8 and data[0] == reply_type and data[6:8] == packet[6:8] and data[8:] == payload:
+                return "reply", rtt
+    except asyncio.TimeoutError:
+        return "timeout", None
+    except OSError:
+        return "unreachable", None
+    finally:
+        sock.close()
+
+async def _tcp_probe(address, family, port, timeout):
+    """Time a TCP handshake; a refused connection still proves the host is up."""
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    start = time.perf_counter_ns()
+    try:
+        await asyncio.wait_for(loop.sock_connect(sock, (address, port)), timeout)
+        return "reply", _elapsed_ms(start)
+    except ConnectionRefusedError:
+        return "refused", _elapsed_ms(start)
+    except asyncio.TimeoutError:
+        return "timeout", None
+    except OSError:
+        return "unreachable", None
+    finally:
+        sock.close()
+
+async def _udp_probe(address, family, port, timeout):
+    """Send a datagram to a closed high port and wait for ICMP port-unreachable."""
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(family, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    try:
+        sock.connect((address, port))
+        start = time.perf_counter_ns()
+        await loop.sock_sendall(sock, b"\x00" * 8)
+        await asyncio.wait_for(loop.sock_recv(sock, 1024), timeout)
+        return "reply", _elapsed_ms(start)
+    except ConnectionRefusedError:
+        return "refused", _elapsed_ms(start)
+    except asyncio.TimeoutError:
+        return "timeout", None
+    except OSError:
+        return "unreachable", None
+    finally:
+        sock.close()
+
+def resolve_method(method, family):
+    """Pick the probe method, falling back to TCP when ICMP sockets are not permitted."""
+    if method == "auto":
+        return "icmp" if icmp_available(family) else "tcp"
+    return method
+
+async def send_probe(host, address, family, seq, method="auto", timeout=DEFAULT_TIMEOUT,
+                     tcp_port=DEFAULT_TCP_PORT, udp_port=DEFAULT_UDP_PORT):
+    """Send a single probe and return it as a structured record."""
+    method = resolve_method(method, family)
+    if method == "icmp":
+        status, rtt = await _icmp_probe(address, family, seq, timeout)
+    elif method == "tcp":
+        status, rtt = await _tcp_probe(address, family, tcp_port, timeout)
+    elif method == "udp":
+        status, rtt = await _udp_probe(address, family, udp_port, timeout)
+    else:
+        raise ValueError(f"Unknown probe method: {method}")
+    return {"host": host, "address": address, "seq": seq, "method": method,
+            "status": status, "rtt_ms": rtt, "time": time.time()}
+
+async def resolve_host(host):
+    """Resolve a host name to its first address and family (cached by the shared resolver)."""
+    return await get_resolver().resolve(host)
+
+def summarize_probes(host, address, probes):
+    """Build a per-host summary record from its probe records."""
+    rtts = [p["rtt_ms"] for p in probes if p["rtt_ms"] is not None]
+    received = sum(1 for p in probes if p["status"] in ALIVE_STATUSES)
+    sent = len(probes)
+    return {
+        "host": host,
+        "address": address,
+        "method": probes[0]["method"] if probes else None,
+        "alive": received > 0,
+        "sent": sent,
+        "received": received,
+        "loss_pct": 100.0 * (sent - received) / sent if sent else 100.0,
+        "min_ms": min(rtts) if rtts else None,
+        "avg_ms": sum(rtts) / len(rtts) if rtts else None,
+        "max_ms": max(rtts) if rtts else None,
+        "probes": probes,
+    }
+
+async def probe_host(host, count=4, method="auto", timeout=DEFAULT_TIMEOUT, interval=DEFAULT_INTERVAL,
+                     tcp_port=DEFAULT_TCP_PORT, udp_port=DEFAULT_UDP_PORT, limiter=None):
+    """Resolve a host, send `count` probes and return its summary record.
+
+    When a `limiter` is given, a token is taken from it before every probe.
+    """
+    try:
+        address, family = await resolve_host(host)
+    except OSError as e:
+        summary = summarize_probes(host, None, [])
+        summary["error"] = f"Could not resolve host: {e}"
+        return summary
+
+    probes = []
+    for seq in range(1, count + 1):
+        if limiter is not None:
+            await limiter.acquire()
+        probes.append(await send_probe(host, address, family, seq, method, timeout, tcp_port, udp_port))
+        if seq < count:
+            await asyncio.sleep(interval)
+    return summarize_probes(host, address, probes)
+
+async def ping_many(hosts, count=4, method="auto", timeout=DEFAULT_TIMEOUT, interval=DEFAULT_INTERVAL,
+                    concurrency=DEFAULT_CONCURRENCY, tcp_port=DEFAULT_TCP_PORT, udp_port=DEFAULT_UDP_PORT,
+                    limiter=None):
+    """Probe many hosts concurrently and yield each summary as soon as it completes.
+
+    At most `concurrency` hosts are in flight at once. `hosts` may be any
+    iterable, including a generator; it is consumed lazily by the workers.
+    An exception raised by the iterator or a probe is re-raised here.
+    """
+    targets = iter(hosts)
+    results = asyncio.Queue()
+    errors = []
+
+    async def worker():
+        try:
+            for host in targets:
+                await results.put(await probe_host(host, count, method, timeout, interval, tcp_port, udp_port, limiter))
+        except Exception as e:
+            # Re-raised from the consumer below, so a bad target spec isn't silently dropped
+            errors.append(e)
+        finally:
+            await results.put(None)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    remaining = len(workers)
+    try:
+        while remaining:
+            record = await results.get()
+            if record is None:
+                remaining -= 1
+                if errors:
+                    raise errors[0]
+            else:
+                yield record
+    finally:
+        for task in workers:
+            task.cancel()
+
+class TokenBucket:
+    """Asyncio token bucket shared by every probe to cap packets per second."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1.0, rate / 10.0))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available, then take it."""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+def _is_address(text):
+    """Whether text is a literal IPv4/IPv6 address."""
+    try:
+        ipaddress.ip_address(text.strip())
+        return True
+    except ValueError:
+        return False
+
+def _range_bounds(spec):
+    """(start, end) addresses of "10.0.0.1-10.0.0.50" or "10.0.0.1-50"."""
+    start_text, end_text = spec.split("-", 1)
+    start = ipaddress.ip_address(start_text.strip())
+    end_text = end_text.strip()
+    if end_text.isdigit() and start.version == 4:
+        # Short form: only the last octet is given
+        end = ipaddress.ip_address(start_text.strip().rsplit(".", 1)[0] + "." + end_text)
+    else:
+        end = ipaddress.ip_address(end_text)
+    if end.version != start.version or end < start:
+        raise ValueError(f"Invalid address range: {spec}")
+    return start, end
+
+def _expand_range(spec):
+    """Expand "10.0.0.1-10.0.0.50" or "10.0.0.1-50" one address at a time."""
+    start, end = _range_bounds(spec)
+    for value in range(int(start), int(end) + 1):
+        yield str(ipaddress.IPv4Address(value) if start.version == 4 else ipaddress.IPv6Address(value))
+
+def expand_targets(specs):
+    """Lazily expand CIDR blocks, address ranges, host files and host names.
+
+    A spec starting with "@" (or naming an existing file) is read line by
+    line, and each line may itself be any spec. Nothing is materialized,
+    so sweeping a /16 never builds a 65,536-entry list.
+    """
+    for spec in specs:
+        spec = spec.strip()
+        if not spec or spec.startswith("#"):
+            continue
+        if spec.startswith("@") or os.path.isfile(spec):
+            with open(spec.lstrip("@")) as host_file:
+                for line in host_file:
+                    yield from expand_targets([line.split("#", 1)[0]])
+        elif "/" in spec:
+            network = ipaddress.ip_network(spec, strict=False)
+            for address in (network.hosts() if network.num_addresses > 2 else network):
+                yield str(address)
+        elif "-" in spec and _is_address(spec.split("-", 1)[0]):
+            yield from _expand_range(spec)
+        else:
+            yield spec
+
+def validate_specs(specs):
+    """Raise ValueError/OSError for a malformed CIDR or range or an unreadable host file, before any probing.
+
+    Lines inside host files are still checked lazily as they are expanded.
+    """
+    for spec in specs:
+        spec = spec.strip()
+        if not spec or spec.startswith("#"):
+            continue
+        if spec.startswith("@") or os.path.isfile(spec):
+            with open(spec.lstrip("@")):
+                pass
+        elif "/" in spec:
+            ipaddress.ip_network(spec, strict=False)
+        elif "-" in spec and _is_address(spec.split("-", 1)[0]):
+            _range_bounds(spec)
+
+def sweep_record(summary):
+    """Compact JSONL record for a swept host."""
+    return {"host": summary["host"], "address": summary["address"], "alive": summary["alive"],
+            "method": summary["method"], "rtt_ms": summary["min_ms"], "loss_pct": summary["loss_pct"],
+            "time": time.time(), **({"error": summary["error"]} if summary.get("error") else {})}
+
+async def sweep(specs, out, pps=DEFAULT_SWEEP_PPS, count=1, method="auto", timeout=DEFAULT_TIMEOUT,
+                concurrency=DEFAULT_CONCURRENCY):
+    """Sweep expanded targets under a global packets-per-second limit.
+
+    One JSON line per host is written to `out` as soon as it resolves.
+    Returns (alive, total) counts.
+    """
+    validate_specs(specs)
+    limiter = TokenBucket(pps)
+    alive = total = 0
+    async for summary in ping_many(expand_targets(specs), count=count, method=method, timeout=timeout,
+                                   concurrency=concurrency, limiter=limiter):
+        out.write(json.dumps(sweep_record(summary)) + "\n")
+        out.flush()
+        total += 1
+        alive += summary["alive"]
+    return alive, total
+
+def run_sweep(specs, output_path=None, pps=DEFAULT_SWEEP_PPS, method="auto"):
+    """Run a sweep, streaming JSONL to a file or stdout."""
+    log_and_print(f"Sweeping {', '.join(specs)} at up to {pps} probes/s (method: {method})...", level="INFO")
+    out = open(output_path, "w") if output_path else sys.stdout
+    start = time.perf_counter()
+    try:
+        alive, total = asyncio.run(sweep(specs, out, pps=pps, method=method))
+        log_and_print(f"Sweep finished: {alive}/{total} host(s) alive in {time.perf_counter() - start:.2f}s.", level="INFO")
+    except KeyboardInterrupt:
+        log_and_print("Sweep stopped by user.", level="WARNING")
+    except (OSError, ValueError) as e:
+        log_and_print(f"Sweep failed: {e}", level="ERROR")
+    finally:
+        if output_path:
+            out.close()
+
+class LatencyHistogram:
+    """Fixed-size, log-bucketed RTT histogram (HDR-style).
+
+    Memory does not grow with the number of samples, and histograms merge
+    by adding bucket counts, so window totals can be folded into a running
+    total without keeping raw samples.
+    """
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * HISTOGRAM_BUCKETS))
+        self.count = 0
+        self.max_ms = 0.0
+
+    def record(self, rtt_ms):
+        """Add one RTT sample."""
+        if rtt_ms <= HISTOGRAM_MIN_MS:
+            index = 0
+        else:
+            index = min(int(math.log(rtt_ms / HISTOGRAM_MIN_MS) / math.log(HISTOGRAM_GROWTH)) + 1,
+                        HISTOGRAM_BUCKETS - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.max_ms = max(self.max_ms, rtt_ms)
+
+    def merge(self, other):
+        """Add another histogram's samples into this one."""
+        for index, value in enumerate(other.counts):
+            if value:
+                self.counts[index] += value
+        self.count += other.count
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, pct):
+        """Approximate the given percentile in milliseconds (None when empty)."""
+        if not self.count:
+            return None
+        rank = math.ceil(self.count * pct / 100.0)
+        seen = 0
+        for index, value in enumerate(self.counts):
+            seen += value
+            if seen >= rank:
+                # Report the bucket's upper bound, never above the observed max
+                return min(HISTOGRAM_MIN_MS * HISTOGRAM_GROWTH ** index, self.max_ms)
+        return self.max_ms
+
+    def reset(self):
+        """Clear all samples, keeping the allocated buckets."""
+        for index in range(HISTOGRAM_BUCKETS):
+            self.counts[index] = 0
+        self.count = 0
+        self.max_ms = 0.0
+
+def _new_monitor_stats():
+    """Create the bounded per-host state used by monitor mode."""
+    return {"window": LatencyHistogram(), "total": LatencyHistogram(),
+            "window_sent": 0, "window_received": 0, "sent": 0, "received": 0,
+            "jitter_ms": 0.0, "last_rtt_ms": None}
+
+def _update_monitor_stats(stats, record):
+    """Fold one probe record into a host's monitor state."""
+    stats["window_sent"] += 1
+    if record["status"] not in ALIVE_STATUSES or record["rtt_ms"] is None:
+        return
+    rtt = record["rtt_ms"]
+    stats["window_received"] += 1
+    stats["window"].record(rtt)
+    # RFC 3550 style smoothed jitter over consecutive RTTs
+    if stats["last_rtt_ms"] is not None:
+        stats["jitter_ms"] += (abs(rtt - stats["last_rtt_ms"]) - stats["jitter_ms"]) / 16.0
+    stats["last_rtt_ms"] = rtt
+
+def _histogram_summary(histogram, sent, received):
+    """Loss and latency percentiles for one histogram."""
+    summary = {"sent": sent, "received": received,
+               "loss_pct": 100.0 * (sent - received) / sent if sent else None}
+    for pct in MONITOR_PERCENTILES:
+        summary[f"p{pct}_ms"] = histogram.percentile(pct)
+    summary["max_ms"] = histogram.max_ms if histogram.count else None
+    return summary
+
+def close_monitor_window(host, stats, window_seconds):
+    """Summarize a host's current window, then fold it into the running total."""
+    window = _histogram_summary(stats["window"], stats["window_sent"], stats["window_received"])
+    stats["total"].merge(stats["window"])
+    stats["sent"] += stats["window_sent"]
+    stats["received"] += stats["window_received"]
+    stats["window"].reset()
+    stats["window_sent"] = stats["window_received"] = 0
+    return {"host": host, "time": time.time(), "window_s": window_seconds,
+            "jitter_ms": stats["jitter_ms"], "window": window,
+            "total": _histogram_summary(stats["total"], stats["sent"], stats["received"])}
+
+def _format_ms(value):
+    """Format an optional millisecond value for the monitor table."""
+    return f"{value:8.2f}" if value is not None else "       -"
+
+def print_monitor_summary(summary):
+    """Print one rolling-window line for a host."""
+    window = summary["window"]
+    loss = window["loss_pct"] if window["loss_pct"] is not None else 100.0
+    color = Fore.GREEN if loss == 0 else Fore.YELLOW if loss < 100 else Fore.RED
+    print(color + f"{summary['host']:<24} loss {loss:5.1f}%  "
+          f"p50 {_format_ms(window['p50_ms'])}  p95 {_format_ms(window['p95_ms'])}  "
+          f"p99 {_format_ms(window['p99_ms'])}  max {_format_ms(window['max_ms'])}  "
+          f"jitter {_format_ms(summary['jitter_ms'])} ms" + Style.RESET_ALL)
+    logging.info(f"Monitor {summary['host']}: window={window} total={summary['total']} "
+                 f"jitter_ms={summary['jitter_ms']:.3f}")
+
+async def monitor_hosts(hosts, interval=1.0, window=60.0, duration=None, method="auto",
+                        timeout=DEFAULT_TIMEOUT, concurrency=DEFAULT_CONCURRENCY, on_summary=print_monitor_summary):
+    """Continuously probe hosts and report rolling-window statistics.
+
+    Every host probes on its own schedule so a slow or dead host never
+    delays the others. Per-host state is a pair of fixed-size histograms
+    and a few counters, so memory stays flat for the life of the monitor.
+    Runs until `duration` seconds have elapsed, or forever when None.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    stats = {}
+
+    async def probe_loop(host, address, family):
+        seq = 0
+        while True:
+            started = loop.time()
+            seq = seq % 0xFFFF + 1
+            async with semaphore:
+                record = await send_probe(host, address, family, seq, method, timeout)
+            _update_monitor_stats(stats[host], record)
+            await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+
+    async def report_loop():
+        while True:
+            await asyncio.sleep(window)
+            for host, host_stats in stats.items():
+                on_summary(close_monitor_window(host, host_stats, window))
+
+    tasks = []
+    for host in hosts:
+        try:
+            address, family = await resolve_host(host)
+        except OSError as e:
+            log_and_print(f"Skipping {host}: could not resolve host: {e}", level="WARNING")
+            continue
+        stats[host] = _new_monitor_stats()
+        tasks.append(asyncio.create_task(probe_loop(host, address, family)))
+    if not tasks:
+        log_and_print("No resolvable hosts to monitor.", level="ERROR")
+        return
+    tasks.append(asyncio.create_task(report_loop()))
+
+    try:
+        await asyncio.wait_for(asyncio.gather(*tasks), duration)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def run_monitor(hosts, interval=1.0, window=60.0, method="auto"):
+    """Run monitor mode until interrupted."""
+    log_and_print(f"Monitoring {len(hosts)} host(s) every {interval}s, reporting every {window}s. "
+                  f"Press Ctrl+C to stop.", level="INFO")
+    try:
+        asyncio.run(monitor_hosts(hosts, interval=interval, window=window, method=method))
+    except KeyboardInterrupt:
+        log_and_print("Monitor stopped by user.", level="INFO")
+    except Exception as e:
+        log_and_print(f"An unexpected error occurred: {e}", level="ERROR")
+
+def print_ping_summary(summary):
+    """Print a one-line colored summary for a host."""
+    if summary.get("error"):
+        print(Fore.RED + f"{summary['host']}: {summary['error']}" + Style.RESET_ALL)
+    elif summary["alive"]:
+        print(Fore.GREEN + f"{summary['host']} ({summary['address']}) via {summary['method']}: "
+              f"{summary['received']}/{summary['sent']} replies, "
+              f"rtt min/avg/max = {summary['min_ms']:.2f}/{summary['avg_ms']:.2f}/{summary['max_ms']:.2f} ms"
+              + Style.RESET_ALL)
+    else:
+        print(Fore.RED + f"{summary['host']} ({summary['address']}) via {summary['method']}: "
+              f"no replies ({summary['sent']} sent)" + Style.RESET_ALL)
+
+def run_ping_engine(hosts, count=4, method="auto", timeout=DEFAULT_TIMEOUT, concurrency=DEFAULT_CONCURRENCY):
+    """Ping many hosts with the in-process engine and print results as they arrive."""
+    log_and_print(f"Pinging {len(hosts)} host(s) in-process (method: {method}, concurrency: {concurrency})...", level="INFO")
+
+    async def run():
+        alive = 0
+        async for summary in ping_many(hosts, count=count, method=method, timeout=timeout, concurrency=concurrency):
+            print_ping_summary(summary)
+            alive += summary["alive"]
+        return alive
+
+    start = time.perf_counter()
+    try:
+        alive = asyncio.run(run())
+        log_and_print(f"{alive}/{len(hosts)} host(s) alive, finished in {time.perf_counter() - start:.2f}s.", level="INFO")
+    except Exception as e:
+        log_and_print(f"An unexpected error occurred: {e}", level="ERROR")
+
 if __name__ == "__main__":
     log_and_print("Ping Utility started.", level="INFO")
-    
-    detect_environment_and_install()
-    
-    # Get user input for the host
-    target_host = input(Fore.CYAN + "Enter the host to ping (e.g., google.com): " + Style.RESET_ALL).strip()
-    if not target_host:
-        log_and_print("No host provided. Exiting.", level="ERROR")
+
+    print(Fore.CYAN + "1. Ping a host (system ping)" + Style.RESET_ALL)
+    print(Fore.CYAN + "2. Ping multiple hosts (in-process engine)" + Style.RESET_ALL)
+    print(Fore.CYAN + "3. Monitor hosts continuously" + Style.RESET_ALL)
+    print(Fore.CYAN + "4. Sweep CIDR blocks, ranges or host files" + Style.RESET_ALL)
+    choice = input(Fore.CYAN + "Select an option (1-4): " + Style.RESET_ALL).strip()
+
+    if choice == "2":
+        hosts = input(Fore.CYAN + "Enter hosts separated by commas: " + Style.RESET_ALL).split(",")
+        hosts = [host.strip() for host in hosts if host.strip()]
+        method = input(Fore.CYAN + "Probe method (auto/icmp/tcp/udp) [auto]: " + Style.RESET_ALL).strip() or "auto"
+        if not hosts:
+            log_and_print("No hosts provided. Exiting.", level="ERROR")
+        elif method not in ("auto", "icmp", "tcp", "udp"):
+            log_and_print(f"Unknown probe method: {method}", level="ERROR")
+        else:
+            run_ping_engine(hosts, method=method)
+    elif choice == "3":
+        hosts = input(Fore.CYAN + "Enter hosts separated by commas: " + Style.RESET_ALL).split(",")
+        hosts = [host.strip() for host in hosts if host.strip()]
+        try:
+            interval = float(input(Fore.CYAN + "Probe interval in seconds [1]: " + Style.RESET_ALL).strip() or 1)
+            window = float(input(Fore.CYAN + "Summary window in seconds [60]: " + Style.RESET_ALL).strip() or 60)
+        except ValueError:
+            interval = window = None
+        if not hosts:
+            log_and_print("No hosts provided. Exiting.", level="ERROR")
+        elif not interval or not window or interval <= 0 or window <= 0:
+            log_and_print("Interval and window must be positive numbers.", level="ERROR")
+        else:
+            run_monitor(hosts, interval=interval, window=window)
+    elif choice == "4":
+        specs = input(Fore.CYAN + "Enter CIDRs, ranges, hosts or @files separated by commas: " + Style.RESET_ALL).split(",")
+        specs = [spec.strip() for spec in specs if spec.strip()]
+        output_path = input(Fore.CYAN + "JSONL output file (blank for screen): " + Style.RESET_ALL).strip() or None
+        try:
+            pps = float(input(Fore.CYAN + f"Packets per second [{DEFAULT_SWEEP_PPS}]: " + Style.RESET_ALL).strip() or DEFAULT_SWEEP_PPS)
+        except ValueError:
+            pps = 0
+        if not specs:
+            log_and_print("No targets provided. Exiting.", level="ERROR")
+        elif pps <= 0:
+            log_and_print("Packets per second must be a positive number.", level="ERROR")
+        else:
+            run_sweep(specs, output_path, pps=pps)
     else:
-        ping_host(target_host)
+        detect_environment_and_install()
+
+        # Get user input for the host
+        target_host = input(Fore.CYAN + "Enter the host to ping (e.g., google.com): " + Style.RESET_ALL).strip()
+        if not target_host:
+            log_and_print("No host provided. Exiting.", level="ERROR")
+        else:
+            ping_host(target_host)
 
     log_and_print("Ping Utility finished.", level="INFO")
\ No newline at end of file
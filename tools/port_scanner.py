@@ -2,10 +2,78 @@ import subprocess
 import logging
 import sys
 import os
+import time
+import socket
+import json
+import signal
+import hashlib
+import random
+import ssl
+import sqlite3
+import tempfile
+import asyncio
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Full
+import threading
 import distro
 from colorama import Fore, Style
 import platform
 from shutil import which
+from ping import expand_targets, icmp_available, send_probe
+from asn_lookup import format_owner, open_asn_database
+from dns_resolver import get_resolver
+
+# Native connect-scan defaults
+DEFAULT_CONNECT_TIMEOUT = 1.0
+DEFAULT_GLOBAL_CONCURRENCY = 1000
+DEFAULT_HOST_CONCURRENCY = 100
+
+# Adaptive timing for the native scanner (RFC 6298 style estimator)
+ADAPTIVE_INITIAL_TIMEOUT = 1.0
+ADAPTIVE_MIN_TIMEOUT = 0.05
+ADAPTIVE_MAX_TIMEOUT = 5.0
+ADAPTIVE_INITIAL_WINDOW = 10
+ADAPTIVE_MAX_RETRIES = 1
+# Scanners can be bolder than TCP: back off by a quarter and regrow faster
+ADAPTIVE_DECREASE = 0.75
+ADAPTIVE_INCREASE = 4.0
+
+# Banner grabbing stage
+DEFAULT_BANNER_CONCURRENCY = 50
+DEFAULT_BANNER_TIMEOUT = 3.0
+DEFAULT_BANNER_BYTES = 1024
+HTTP_PORTS = {80, 81, 8000, 8008, 8080, 8888}
+HTTPS_PORTS = {443, 8443, 9443}
+TLS_PORTS = HTTPS_PORTS | {465, 636, 853, 993, 995}
+CERT_NAME_OIDS = {b"\x55\x04\x03": "CN", b"\x55\x04\x0a": "O", b"\x55\x04\x0b": "OU", b"\x55\x04\x06": "C"}
+
+# Host discovery pre-pass
+DISCOVERY_PORTS = (80, 443, 22, 445, 3389)
+DISCOVERY_TIMEOUT = 1.0
+DISCOVERY_CONCURRENCY = 256
+DISCOVERY_CACHE = "host_liveness.json"
+DISCOVERY_CACHE_TTL = 15 * 60
+
+# Persistent result store for incremental rescans
+SCAN_STORE = "scan_results.db"
+DEFAULT_STORE_TTL = 24 * 3600
+
+# Checkpoints for long native scans
+CHECKPOINT_FILE = "scan_checkpoint.bin"
+CHECKPOINT_INTERVAL = 5.0
+CHECKPOINT_MAGIC = b"TKSCANCP1\n"
+
+# Multi-target nmap defaults; workers hand records over through a queue of at most NMAP_QUEUE_SIZE
+DEFAULT_NMAP_WORKERS = 4
+DEFAULT_SHARD_SIZE = 64
+NMAP_QUEUE_SIZE = 1000
+
+# Benchmark listener farm on the loopback network
+BENCHMARK_HOSTS = 8
+BENCHMARK_PORT_BASE = 47000
+BENCHMARK_PORT_COUNT = 200
 
 # Set up logging configuration
 LOG_FILE = "data.log"
@@ -91,15 +159,24 @@ def port_scanner():
         # Execute nmap command with user-defined target and port range
         command = ["nmap", target, "-p", ports]
         log_and_print(f"Running command: {' '.join(command)}", level="INFO")
-        result = subprocess.run(command, check=True, capture_output=True, text=True)
+        with tempfile.TemporaryDirectory() as xml_dir:
+            # Also write XML so the results can be kept in the scan store
+            xml_path = os.path.join(xml_dir, "scan.xml")
+            result = subprocess.run(command + ["-oX", xml_path], check=True, capture_output=True, text=True)
 
-        # Check the result of the scan
-        if result.stdout:
-            print(Fore.GREEN + "\nScan Results:" + Style.RESET_ALL)
-            print(result.stdout)
-            log_and_print(f"Scan completed for {target} on ports {ports}.", level="INFO")
-        else:
-            log_and_print("No results found.", level="WARNING")
+            # Check the result of the scan
+            if result.stdout:
+                print(Fore.GREEN + "\nScan Results:" + Style.RESET_ALL)
+                print(result.stdout)
+                log_and_print(f"Scan completed for {target} on ports {ports}.", level="INFO")
+                try:
+                    scanned_ports = parse_ports(ports)
+                except ValueError:
+                    scanned_ports = None  # an nmap-only port syntax; only listed ports get recorded
+                with open(xml_path, "rb") as xml_file:
+                    record_scan_history(parse_nmap_xml(xml_file), scanned_ports)
+            else:
+                log_and_print("No results found.", level="WARNING")
 
     except subprocess.CalledProcessError as e:
         log_and_print(f"Port scan failed: {e}", level="ERROR")
@@ -107,11 +184,1146 @@ def port_scanner():
         log_and_print(f"An unexpected error occurred: {e}", level="ERROR")
         sys.exit(1)
 
+def parse_ports(spec):
+    """Parse a port spec such as "22-80, 443, 8080" into a sorted list of ports."""
+    ports = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = (int(value) for value in part.split("-", 1))
+        else:
+            start = end = int(part)
+        if not 0 < start <= end <= 65535:
+            raise ValueError(f"Invalid port range: {part}")
+        ports.update(range(start, end + 1))
+    if not ports:
+        raise ValueError("No ports given.")
+    return sorted(ports)
+
+async def resolve_target(target):
+    """Resolve a target to its first address and family (cached by the shared resolver)."""
+    return await get_resolver().resolve(target)
+
+async def connect_probe(address, family, port, timeout):
+    """Try a TCP connect and classify the port as open, closed or filtered."""
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    start = time.perf_counter_ns()
+    try:
+        await asyncio.wait_for(loop.sock_connect(sock, (address, port)), timeout)
+        return "open", (time.perf_counter_ns() - start) / 1e6
+    except ConnectionRefusedError:
+        return "closed", (time.perf_counter_ns() - start) / 1e6
+    except asyncio.TimeoutError:
+        return "filtered", None
+    except OSError:
+        # An ICMP error is still an answer, so it carries an RTT
+        return "filtered", (time.perf_counter_ns() - start) / 1e6
+    finally:
+        sock.close()
+
+class HostTiming:
+    """Per-host RTT estimator and congestion window for the native scanner.
+
+    The timeout follows TCP's SRTT/RTTVAR estimator (RFC 6298), capped at
+    `max_timeout`. The number of probes allowed in flight grows like TCP
+    slow start/congestion avoidance while the host answers, and shrinks
+    when probes are lost. A probe that simply times out is not counted as
+    loss, because firewalls drop probes to filtered ports routinely. Loss
+    is only inferred when a retransmitted probe gets an answer.
+    """
+
+    def __init__(self, max_window, initial_window=ADAPTIVE_INITIAL_WINDOW, max_timeout=ADAPTIVE_MAX_TIMEOUT):
+        self.srtt = None
+        self.rttvar = None
+        self.max_timeout = max_timeout
+        self.min_timeout = min(ADAPTIVE_MIN_TIMEOUT, max_timeout)
+        self.rto = min(ADAPTIVE_INITIAL_TIMEOUT, max_timeout)
+        self.max_window = max_window
+        self.window = float(min(initial_window, max_window))
+        self.ssthresh = float(max_window)
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.condition = asyncio.Condition()
+
+    async def acquire(self):
+        """Wait for room in the congestion window."""
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < int(self.window))
+            self.in_flight += 1
+
+    async def release(self):
+        """Free a slot in the congestion window."""
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def on_response(self, rtt):
+        """Fold an RTT sample (seconds) into the estimator and open the window."""
+        if self.srtt is None:
+            self.srtt, self.rttvar = rtt, rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        self.rto = min(max(self.srtt + 4 * self.rttvar, self.min_timeout), self.max_timeout)
+        if self.window < self.ssthresh:
+            self.window += 1
+        else:
+            self.window += ADAPTIVE_INCREASE / self.window
+        self.window = min(self.window, float(self.max_window))
+
+    def on_loss(self):
+        """Treat a lost probe as congestion and shrink the window, at most once per RTT."""
+        now = time.monotonic()
+        if now - self.last_decrease < (self.srtt or self.rto):
+            return
+        self.last_decrease = now
+        self.ssthresh = max(self.window * ADAPTIVE_DECREASE, 1.0)
+        self.window = self.ssthresh
+
+async def adaptive_probe(timing, probe, address, family, port, max_retries=ADAPTIVE_MAX_RETRIES):
+    """Probe a port using the host's current timeout and window, retrying lost probes."""
+    for attempt in range(max_retries + 1):
+        await timing.acquire()
+        try:
+            # Back off exponentially on retransmission
+            state, rtt = await probe(address, family, port, min(timing.rto * 2 ** attempt, timing.max_timeout))
+        finally:
+            await timing.release()
+        if rtt is not None:
+            timing.on_response(rtt / 1000)
+            if attempt:
+                # The port answers, so the earlier silence was a lost probe
+                timing.on_loss()
+            return state, rtt
+    return "filtered", None
+
+async def connect_scan(targets, ports, timeout=DEFAULT_CONNECT_TIMEOUT,
+                       host_concurrency=DEFAULT_HOST_CONCURRENCY, global_concurrency=DEFAULT_GLOBAL_CONCURRENCY,
+                       adaptive=True, probe=connect_probe, skip=None):
+    """Scan targets with plain TCP connects and yield a record per port as it completes.
+
+    At most `global_concurrency` connects are in flight overall and at most
+    `host_concurrency` against any single host. Each host has its own port
+    queue and hosts are served round-robin, so a slow host only holds its
+    own slots and never stalls the scan of the others.
+
+    With `adaptive` (the default) each host gets a HostTiming, which
+    derives the timeout from measured RTTs (never above `timeout`) and
+    shrinks or grows per-host parallelism as probes are lost or answered.
+    `probe` can be swapped out, e.g. for simulated_lossy_target().
+    Pairs for which `skip(host, port)` returns True are not probed.
+    """
+    # Resolve every target up front in one concurrent batch
+    hosts = await get_resolver().resolve_many(targets)
+    for target in [target for target, resolved in hosts.items() if resolved is None]:
+        log_and_print(f"Skipping {target}: could not resolve host.", level="WARNING")
+        del hosts[target]
+    if not hosts:
+        return
+
+    max_timeout = timeout if timeout is not None else ADAPTIVE_MAX_TIMEOUT
+    timings = {host: HostTiming(host_concurrency, max_timeout=max_timeout) for host in hosts}
+    ring = deque((host, iter(ports)) for host in hosts)
+    running = dict.fromkeys(hosts, 0)
+    in_flight = 0
+    wake = asyncio.Event()
+    results = asyncio.Queue()
+    tasks = set()
+    errors = []
+
+    def has_room(host):
+        return running[host] < (int(timings[host].window) if adaptive else host_concurrency)
+
+    async def run(host, port):
+        nonlocal in_flight
+        address, family = hosts[host]
+        try:
+            if adaptive:
+                state, rtt = await adaptive_probe(timings[host], probe, address, family, port)
+            else:
+                state, rtt = await probe(address, family, port, max_timeout)
+            await results.put({"host": host, "address": address, "port": port, "protocol": "tcp",
+                               "state": state, "rtt_ms": rtt})
+        except Exception as e:
+            errors.append(e)
+        finally:
+            running[host] -= 1
+            in_flight -= 1
+            wake.set()
+
+    async def dispatch():
+        nonlocal in_flight
+        try:
+            while (ring or in_flight) and not errors:
+                started = False
+                for _ in range(len(ring)):
+                    if in_flight >= global_concurrency or not ring:
+                        break
+                    host, host_ports = ring[0]
+                    ring.rotate(-1)
+                    if not has_room(host):
+                        continue
+                    port = next((port for port in host_ports if not (skip and skip(host, port))), None)
+                    if port is None:
+                        ring.pop()  # this host's queue is exhausted
+                        continue
+                    running[host] += 1
+                    in_flight += 1
+                    task = asyncio.create_task(run(host, port))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                    started = True
+                if not started and (ring or in_flight) and not errors:
+                    wake.clear()
+                    await wake.wait()
+            if errors:
+                raise errors[0]
+        finally:
+            await results.put(None)
+
+    dispatcher = asyncio.create_task(dispatch())
+    try:
+        while True:
+            record = await results.get()
+            if record is None:
+                break
+            yield record
+        await dispatcher
+    finally:
+        dispatcher.cancel()
+        for task in list(tasks):
+            task.cancel()
+
+def simulated_lossy_target(open_ports, latency=0.2, jitter=0.03, loss=0.02, capacity=40, seed=None):
+    """Return a probe function that emulates a remote host over a lossy link.
+
+    Every probe sees `latency` +/- `jitter` seconds of delay and a `loss`
+    chance of being dropped. Once more than `capacity` probes are in flight
+    the excess is dropped too, like a congested queue, so aggressive
+    parallelism is punished the way it would be on a real VPN link.
+    Plug it into connect_scan(probe=...) to test timing without a network.
+    """
+    rng = random.Random(seed)
+    in_flight = 0
+
+    async def probe(address, family, port, timeout):
+        nonlocal in_flight
+        in_flight += 1
+        try:
+            overload = max(0, in_flight - capacity) / in_flight
+            delay = max(0.001, rng.gauss(latency, jitter))
+            if rng.random() < loss + overload or delay > timeout:
+                await asyncio.sleep(timeout)
+                return "filtered", None
+            await asyncio.sleep(delay)
+            return ("open" if port in open_ports else "closed"), delay * 1000
+        finally:
+            in_flight -= 1
+
+    return probe
+
+def _der_element(data, offset):
+    """Read the DER element at `offset`; return (tag, value start, value end)."""
+    if offset + 2 > len(data):
+        raise ValueError(f"truncated DER element at offset {offset}")
+    tag, length = data[offset], data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        # Long form; DER has no indefinite (0x80) lengths
+        size = length & 0x7F
+        if not 0 < size <= 4 or offset + size > len(data):
+            raise ValueError(f"bad DER length at offset {offset - 2}")
+        length = int.from_bytes(data[offset:offset + size], "big")
+        offset += size
+    if offset + length > len(data):
+        raise ValueError(f"DER element at offset {offset} runs past the end of the data")
+    return tag, offset, offset + length
+
+def _der_children(data, start, end):
+    """Yield the DER elements between `start` and `end`."""
+    while start < end:
+        element = _der_element(data, start)
+        if element[2] > end:
+            raise ValueError(f"DER element at offset {start} overruns its parent")
+        yield element
+        start = element[2]
+
+def _der_name(data, start, end):
+    """Render an X.509 Name as "CN=..., O=..." using the attributes we care about."""
+    parts = []
+    for _, set_start, set_end in _der_children(data, start, end):
+        for _, seq_start, seq_end in _der_children(data, set_start, set_end):
+            (_, oid_start, oid_end), (value_tag, value_start, value_end) = list(_der_children(data, seq_start, seq_end))[:2]
+            label = CERT_NAME_OIDS.get(bytes(data[oid_start:oid_end]))
+            if label:
+                raw = bytes(data[value_start:value_end])
+                value = raw.decode("utf-16-be", "replace") if value_tag == 0x1E else raw.decode("utf-8", "replace")
+                parts.append(f"{label}={value}")
+    return ", ".join(parts)
+
+def certificate_names(der):
+    """Extract (subject, issuer) from a DER certificate without any third-party library.
+
+    Needed because the stdlib only decodes certificates it has verified,
+    and banner grabbing deliberately skips verification.
+    """
+    _, cert_start, cert_end = _der_element(der, 0)
+    _, tbs_start, tbs_end = _der_element(der, cert_start)
+    fields = list(_der_children(der, tbs_start, tbs_end))
+    if fields and fields[0][0] == 0xA0:
+        fields = fields[1:]  # explicit version tag
+    if len(fields) < 5:
+        raise ValueError("not an X.509 certificate")
+    # serialNumber, signature, issuer, validity, subject
+    issuer, subject = fields[2], fields[4]
+    return _der_name(der, subject[1], subject[2]), _der_name(der, issuer[1], issuer[2])
+
+def _http_head(host):
+    """A minimal HTTP HEAD request."""
+    return f"HEAD / HTTP/1.0\r\nHost: {host}\r\nUser-Agent: toolkit\r\n\r\n".encode()
+
+async def _read_banner(reader, read_bytes, wait):
+    """Read up to `read_bytes` or until the peer goes quiet for `wait` seconds."""
+    data = b""
+    try:
+        while len(data) < read_bytes:
+            chunk = await asyncio.wait_for(reader.read(read_bytes - len(data)), wait)
+            if not chunk:
+                break
+            data += chunk
+    except asyncio.TimeoutError:
+        pass
+    return data
+
+async def grab_banner(record, read_timeout=DEFAULT_BANNER_TIMEOUT, read_bytes=DEFAULT_BANNER_BYTES):
+    """Connect to an open port, send a protocol-appropriate probe and record the reply.
+
+    TLS ports get a handshake (the certificate subject and issuer are
+    recorded) followed by HEAD on HTTPS ports; HTTP ports get HEAD;
+    anything else is first given a chance to speak (SSH, SMTP, FTP, POP3,
+    IMAP all greet first) and is sent HEAD only if it stays silent.
+    """
+    host, address, port = record["host"], record["address"], record["port"]
+    result = {"host": host, "address": address, "port": port, "probe": None, "banner": None,
+              "tls_subject": None, "tls_issuer": None, "error": None}
+    writer = None
+    try:
+        if port in TLS_PORTS:
+            context = ssl.create_default_context()
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+            reader, writer = await asyncio.open_connection(
+                address, port, ssl=context, server_hostname=None if host == address else host)
+            der = writer.get_extra_info("ssl_object").getpeercert(binary_form=True)
+            if der:
+                result["tls_subject"], result["tls_issuer"] = certificate_names(der)
+            result["probe"] = "tls"
+            if port in HTTPS_PORTS:
+                writer.write(_http_head(host))
+                result["probe"] = "tls+http"
+        else:
+            reader, writer = await asyncio.open_connection(address, port)
+            if port in HTTP_PORTS:
+                writer.write(_http_head(host))
+                result["probe"] = "http"
+            else:
+                result["probe"] = "greeting"
+                data = await _read_banner(reader, read_bytes, read_timeout / 2)
+                if not data:
+                    writer.write(_http_head(host))
+                    result["probe"] = "http"
+                else:
+                    result["banner"] = data.decode("utf-8", "replace").strip()
+                    return result
+        data = await _read_banner(reader, read_bytes, read_timeout / 2)
+        result["banner"] = data.decode("utf-8", "replace").strip() or None
+    except (OSError, ssl.SSLError, IndexError, ValueError) as e:
+        result["error"] = str(e) or type(e).__name__
+    finally:
+        if writer is not None:
+            writer.close()
+    return result
+
+async def grab_banners(scan_records, concurrency=DEFAULT_BANNER_CONCURRENCY, read_timeout=DEFAULT_BANNER_TIMEOUT,
+                       read_bytes=DEFAULT_BANNER_BYTES):
+    """Second pipeline stage: grab banners from open ports while the scan is still running.
+
+    Consumes an async iterable of scan records and yields one banner record
+    per open port. At most `concurrency` grabs run at once and each one is
+    cut off after `read_timeout` seconds and `read_bytes` bytes.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    results = asyncio.Queue()
+    pending = set()
+
+    async def grab(record):
+        async with semaphore:
+            try:
+                banner = await asyncio.wait_for(grab_banner(record, read_timeout, read_bytes), read_timeout)
+            except asyncio.TimeoutError:
+                banner = {"host": record["host"], "address": record["address"], "port": record["port"],
+                          "probe": None, "banner": None, "tls_subject": None, "tls_issuer": None,
+                          "error": "timed out"}
+        await results.put(banner)
+
+    async def feed():
+        try:
+            async for record in scan_records:
+                if record["state"] == "open":
+                    task = asyncio.create_task(grab(record))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+            await asyncio.gather(*pending)
+        finally:
+            await results.put(None)
+
+    feeder = asyncio.create_task(feed())
+    try:
+        while True:
+            banner = await results.get()
+            if banner is None:
+                break
+            yield banner
+        await feeder
+    finally:
+        feeder.cancel()
+        for task in list(pending):
+            task.cancel()
+
+def print_banner(banner):
+    """Print one banner record."""
+    target = f"{banner['host']}:{banner['port']}"
+    if banner["error"]:
+        print(Fore.YELLOW + f"{target} banner: {banner['error']}" + Style.RESET_ALL)
+        return
+    first_line = (banner["banner"] or "").splitlines()[0] if banner["banner"] else "(no banner)"
+    tls = f" [TLS subject: {banner['tls_subject']}; issuer: {banner['tls_issuer']}]" if banner["probe"].startswith("tls") else ""
+    print(Fore.MAGENTA + f"{target} {banner['probe']}: {first_line}{tls}" + Style.RESET_ALL)
+    logging.info(f"Banner {target}: {banner}")
+
+def read_arp_cache():
+    """Return addresses with a complete entry in the kernel ARP cache (Linux only)."""
+    try:
+        with open("/proc/net/arp") as arp_file:
+            next(arp_file)  # header
+            # Columns: IP address, HW type, Flags, HW address, Mask, Device; flag 0x2 = complete
+            return {fields[0] for fields in (line.split() for line in arp_file)
+                    if len(fields) >= 4 and int(fields[2], 16) & 0x2}
+    except (OSError, StopIteration, ValueError):
+        return set()
+
+def load_liveness_cache(path=DISCOVERY_CACHE, ttl=DISCOVERY_CACHE_TTL):
+    """Load cached liveness results that are still within `ttl` seconds."""
+    try:
+        with open(path) as cache_file:
+            cache = json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+    now = time.time()
+    return {host: entry for host, entry in cache.items() if now - entry["checked"] < ttl}
+
+def save_liveness_cache(cache, path=DISCOVERY_CACHE):
+    """Write liveness results back to disk."""
+    try:
+        with open(path, "w") as cache_file:
+            json.dump(cache, cache_file)
+    except OSError as e:
+        log_and_print(f"Could not save liveness cache: {e}", level="WARNING")
+
+async def check_host_alive(address, family, timeout=DISCOVERY_TIMEOUT):
+    """Probe a host with ICMP (if permitted) and TCP connects to common ports at once.
+
+    Returns the method that got an answer, or None. A refused connect
+    counts: only a live host sends back a RST.
+    """
+    probes = [asyncio.create_task(connect_probe(address, family, port, timeout)) for port in DISCOVERY_PORTS]
+    if icmp_available(family):
+        probes.append(asyncio.create_task(send_probe(address, address, family, 1, "icmp", timeout)))
+    try:
+        # Stop at the first answer instead of waiting out the slowest probe
+        for next_result in asyncio.as_completed(probes):
+            result = await next_result
+            if isinstance(result, dict):
+                if result["status"] == "reply":
+                    return "icmp"
+            elif result[0] in ("open", "closed"):
+                return "tcp"
+        return None
+    finally:
+        for probe in probes:
+            probe.cancel()
+
+async def discover_live_hosts(targets, timeout=DISCOVERY_TIMEOUT, concurrency=DISCOVERY_CONCURRENCY,
+                              cache_path=DISCOVERY_CACHE, ttl=DISCOVERY_CACHE_TTL):
+    """Liveness pre-pass: return the targets that responded, in their original order.
+
+    Fresh cached results and complete ARP entries are used without probing;
+    everything else is probed concurrently and the cache is updated.
+    """
+    cache = load_liveness_cache(cache_path, ttl)
+    arp = read_arp_cache()
+    semaphore = asyncio.Semaphore(concurrency)
+    now = time.time()
+
+    async def check(target):
+        if target in cache:
+            return cache[target]["alive"]
+        try:
+            address, family = await resolve_target(target)
+        except OSError:
+            return False
+        if address in arp:
+            method = "arp"
+        else:
+            async with semaphore:
+                method = await check_host_alive(address, family, timeout)
+        cache[target] = {"alive": method is not None, "method": method, "checked": now}
+        return method is not None
+
+    alive = await asyncio.gather(*(check(target) for target in targets))
+    save_liveness_cache(cache, cache_path)
+    return [target for target, up in zip(targets, alive) if up]
+
+async def _print_connect_scan(targets, ports, timeout, records, banners=False):
+    """Stream open ports (and optionally their banners) to the terminal and return per-state counts."""
+    counts = {"open": 0, "closed": 0, "filtered": 0}
+
+    async def scanned():
+        async for record in connect_scan(targets, ports, timeout=timeout):
+            records.append(record)
+            counts[record["state"]] += 1
+            if record["state"] == "open":
+                print(Fore.GREEN + f"{record['host']}:{record['port']}/tcp open ({record['rtt_ms']:.2f} ms)" + Style.RESET_ALL)
+            yield record
+
+    if banners:
+        async for banner in grab_banners(scanned()):
+            print_banner(banner)
+    else:
+        async for _ in scanned():
+            pass
+    return counts
+
+def native_port_scanner():
+    """Port scanning with the built-in asyncio connect scanner (no nmap needed)."""
+    log_and_print("Starting native connect scan...", level="INFO")
+
+    specs = [t.strip() for t in input("Enter targets, CIDRs, ranges or @files separated by commas: ").split(",") if t.strip()]
+    try:
+        targets = list(expand_targets(specs))
+        ports = parse_ports(input("Enter port range (e.g., 22-80, 443, 8080): "))
+    except (OSError, ValueError) as e:
+        log_and_print(f"Invalid input: {e}", level="ERROR")
+        return
+    if not targets:
+        log_and_print("No targets provided.", level="ERROR")
+        return
+    discover = input("Skip hosts that fail a quick liveness check? (y/n): ").strip().lower() == "y"
+    banners = input("Grab service banners from open ports? (y/n): ").strip().lower() == "y"
+
+    start = time.perf_counter()
+    if discover:
+        alive = asyncio.run(discover_live_hosts(targets))
+        log_and_print(f"Host discovery: {len(alive)}/{len(targets)} host(s) alive "
+                      f"({time.perf_counter() - start:.2f}s).", level="INFO")
+        targets = alive
+    records = []
+    try:
+        counts = asyncio.run(_print_connect_scan(targets, ports, DEFAULT_CONNECT_TIMEOUT, records, banners))
+    except KeyboardInterrupt:
+        log_and_print("Scan stopped by user.", level="WARNING")
+        return
+    elapsed = time.perf_counter() - start
+    record_scan_history(records)
+    print_network_owners(record["address"] for record in records if record["state"] == "open")
+    total = sum(counts.values())
+    log_and_print(f"Scanned {total} port(s) in {elapsed:.2f}s: {counts['open']} open, "
+                  f"{counts['closed']} closed, {counts['filtered']} filtered.", level="INFO")
+
+def open_scan_store(path=SCAN_STORE):
+    """Open (creating if needed) the on-disk store of prior scan results."""
+    store = sqlite3.connect(path)
+    store.row_factory = sqlite3.Row
+    store.execute("""
+        CREATE TABLE IF NOT EXISTS port_results (
+            host TEXT NOT NULL,
+            port INTEGER NOT NULL,
+            protocol TEXT NOT NULL,
+            state TEXT NOT NULL,
+            service TEXT,
+            first_seen REAL NOT NULL,
+            last_checked REAL NOT NULL,
+            last_changed REAL NOT NULL,
+            PRIMARY KEY (host, port, protocol)
+        )""")
+    return store
+
+def load_scan_results(store, hosts, protocol="tcp"):
+    """Load stored results for the given hosts, keyed by (host, port)."""
+    results = {}
+    for host in hosts:
+        for row in store.execute("SELECT * FROM port_results WHERE host = ? AND protocol = ?", (host, protocol)):
+            results[(row["host"], row["port"])] = dict(row)
+    return results
+
+def is_stable(entry, ttl, now=None):
+    """Whether a stored port was re-confirmed unchanged within the last `ttl` seconds."""
+    now = now if now is not None else time.time()
+    return now - entry["last_checked"] < ttl and entry["last_changed"] < entry["last_checked"]
+
+def _store_port(store, record, diff, now):
+    """Upsert one port record and note it in `diff` if it opened or closed."""
+    key = (record["host"], record["port"], record["protocol"])
+    previous = store.execute("SELECT state FROM port_results WHERE host = ? AND port = ? AND protocol = ?",
+                             key).fetchone()
+    previous_state = previous["state"] if previous else None
+    if record["state"] == "open" and previous_state != "open":
+        diff["opened"].append(record)
+    elif record["state"] != "open" and previous_state == "open":
+        diff["closed"].append(record)
+
+    if previous is None:
+        store.execute("INSERT INTO port_results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                      (*key, record["state"], record.get("service"), now, now, now))
+    elif previous_state != record["state"]:
+        store.execute("UPDATE port_results SET state = ?, service = ?, last_checked = ?, last_changed = ? "
+                      "WHERE host = ? AND port = ? AND protocol = ?",
+                      (record["state"], record.get("service"), now, now, *key))
+    else:
+        store.execute("UPDATE port_results SET last_checked = ? WHERE host = ? AND port = ? AND protocol = ?",
+                      (now, *key))
+
+def _folded_records(store, summary, listed, scanned_ports):
+    """Stored TCP ports of the summary's host that nmap folded into <extraports>, as port records."""
+    rows = store.execute("SELECT port FROM port_results WHERE host = ? AND protocol = 'tcp'", (summary["host"],)).fetchall()
+    return [{"host": summary["host"], "address": summary["address"], "port": row["port"], "protocol": "tcp",
+             "state": summary["state"], "service": None}
+            for row in rows if row["port"] in scanned_ports and row["port"] not in listed]
+
+def store_scan_results(store, records, now=None, scanned_ports=None):
+    """Upsert port records into the store and return the opened/closed diff.
+
+    An extraports summary (port None) marks the host's stored TCP ports
+    that were in `scanned_ports` but not listed as being in its state, so
+    the diff sees ports that closed without the scan listing every one.
+    """
+    now = now if now is not None else time.time()
+    diff = {"opened": [], "closed": []}
+    scanned_ports = set(scanned_ports or ())
+    listed = {}
+    for record in records:
+        if record["port"] is None:
+            if scanned_ports:
+                for folded in _folded_records(store, record, listed.pop(record["host"], set()), scanned_ports):
+                    _store_port(store, folded, diff, now)
+            continue
+        if record["protocol"] == "tcp":
+            listed.setdefault(record["host"], set()).add(record["port"])
+        _store_port(store, record, diff, now)
+    store.commit()
+    return diff
+
+def print_scan_diff(diff):
+    """Print ports that opened or closed since the previous scan."""
+    for record in diff["opened"]:
+        print(Fore.GREEN + f"+ {record['host']}:{record['port']}/{record['protocol']} opened" + Style.RESET_ALL)
+    for record in diff["closed"]:
+        print(Fore.RED + f"- {record['host']}:{record['port']}/{record['protocol']} closed ({record['state']})"
+              + Style.RESET_ALL)
+    log_and_print(f"Changes since last scan: {len(diff['opened'])} opened, {len(diff['closed'])} closed.", level="INFO")
+
+def record_scan_history(records, scanned_ports=None):
+    """Save a finished scan to the store and print what changed since the last one."""
+    store = open_scan_store()
+    try:
+        print_scan_diff(store_scan_results(store, records, scanned_ports=scanned_ports))
+    except sqlite3.Error as e:
+        log_and_print(f"Could not update scan store: {e}", level="WARNING")
+    finally:
+        store.close()
+
+async def incremental_scan(targets, ports, store, ttl=DEFAULT_STORE_TTL):
+    """Rescan only stale or changed ports; return (records, diff, skipped count)."""
+    stored = load_scan_results(store, targets)
+    now = time.time()
+    stable = {key for key, entry in stored.items() if is_stable(entry, ttl, now)}
+    records = [record async for record in connect_scan(targets, ports, skip=lambda host, port: (host, port) in stable)]
+    diff = store_scan_results(store, records)
+    skipped = sum(1 for host in targets for port in ports if (host, port) in stable)
+    return records, diff, skipped
+
+def incremental_port_scanner():
+    """Native scan that skips ports confirmed stable within a TTL and reports changes."""
+    log_and_print("Starting incremental scan...", level="INFO")
+
+    targets = [t.strip() for t in input("Enter target IPs or hostnames separated by commas: ").split(",") if t.strip()]
+    try:
+        ports = parse_ports(input("Enter port range (e.g., 22-80, 443, 8080): "))
+        ttl_hours = float(input(f"Skip ports confirmed within the last N hours [{DEFAULT_STORE_TTL // 3600}]: ").strip()
+                          or DEFAULT_STORE_TTL / 3600)
+    except ValueError as e:
+        log_and_print(f"Invalid input: {e}", level="ERROR")
+        return
+    if not targets:
+        log_and_print("No targets provided.", level="ERROR")
+        return
+
+    start = time.perf_counter()
+    store = open_scan_store()
+    try:
+        records, diff, skipped = asyncio.run(incremental_scan(targets, ports, store, ttl_hours * 3600))
+    except KeyboardInterrupt:
+        log_and_print("Scan stopped by user.", level="WARNING")
+        return
+    finally:
+        store.close()
+    print_scan_diff(diff)
+    log_and_print(f"Rescanned {len(records)} port(s), skipped {skipped} stable port(s) "
+                  f"in {time.perf_counter() - start:.2f}s.", level="INFO")
+
+class ScanCheckpoint:
+    """Compact record of which host:port pairs a native scan has finished.
+
+    Completed work is one bit per pair in a bitmap over the target x port
+    space, so even millions of pairs checkpoint in a few hundred KB. The
+    target specs and port spec are stored alongside, so a resume only
+    needs the checkpoint file.
+    """
+
+    def __init__(self, specs, port_spec, targets, ports):
+        self.specs = specs
+        self.port_spec = port_spec
+        # Overlapping specs can list a target twice; each one gets a single column
+        self.target_index = {target: i for i, target in enumerate(dict.fromkeys(targets))}
+        self.port_index = {port: i for i, port in enumerate(ports)}
+        self.size = len(self.target_index) * len(self.port_index)
+        self.bitmap = bytearray((self.size + 7) // 8)
+        self.completed = 0
+        self.open_ports = []
+
+    def digest(self):
+        """Fingerprint of the scan space, used to reject mismatched checkpoints."""
+        return hashlib.sha256(json.dumps([self.specs, self.port_spec, self.size]).encode()).hexdigest()
+
+    def _bit(self, host, port):
+        index = self.port_index[port] * len(self.target_index) + self.target_index[host]
+        return index >> 3, 1 << (index & 7)
+
+    def is_done(self, host, port):
+        """Whether this pair was completed before the checkpoint was taken."""
+        byte, mask = self._bit(host, port)
+        return bool(self.bitmap[byte] & mask)
+
+    def mark(self, record):
+        """Mark a finished probe as done, remembering it if the port is open."""
+        byte, mask = self._bit(record["host"], record["port"])
+        if not self.bitmap[byte] & mask:
+            self.bitmap[byte] |= mask
+            self.completed += 1
+            if record["state"] == "open":
+                self.open_ports.append([record["host"], record["port"]])
+
+    def save(self, path=CHECKPOINT_FILE):
+        """Atomically write the checkpoint so a crash mid-write never corrupts it."""
+        header = {"specs": self.specs, "ports": self.port_spec, "size": self.size, "digest": self.digest(),
+                  "completed": self.completed, "open": self.open_ports, "saved": time.time()}
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as checkpoint_file:
+            checkpoint_file.write(CHECKPOINT_MAGIC + json.dumps(header).encode() + b"\n" + self.bitmap)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path=CHECKPOINT_FILE):
+        """Rebuild a checkpoint, re-expanding its targets; raises ValueError if invalid."""
+        with open(path, "rb") as checkpoint_file:
+            if checkpoint_file.readline() != CHECKPOINT_MAGIC:
+                raise ValueError(f"{path} is not a scan checkpoint.")
+            header = json.loads(checkpoint_file.readline())
+            bitmap = checkpoint_file.read()
+        checkpoint = cls(header["specs"], header["ports"], list(expand_targets(header["specs"])),
+                         parse_ports(header["ports"]))
+        if checkpoint.digest() != header["digest"] or len(bitmap) != len(checkpoint.bitmap):
+            raise ValueError("Checkpoint does not match its target or port list.")
+        checkpoint.bitmap[:] = bitmap
+        checkpoint.completed = header["completed"]
+        checkpoint.open_ports = header["open"]
+        return checkpoint
+
+async def checkpointed_scan(checkpoint, records, path=CHECKPOINT_FILE, interval=CHECKPOINT_INTERVAL):
+    """Run a native scan over the checkpoint's space, saving progress every `interval` seconds.
+
+    Pairs already marked done are skipped. Progress is also saved when the
+    scan is cancelled by Ctrl+C, SIGTERM or a hang-up (e.g. an SSH drop).
+    """
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+    for name in ("SIGTERM", "SIGHUP"):
+        if hasattr(signal, name):
+            try:
+                loop.add_signal_handler(getattr(signal, name), task.cancel)
+            except NotImplementedError:
+                pass
+
+    targets = list(checkpoint.target_index)
+    ports = list(checkpoint.port_index)
+    last_save = time.monotonic()
+    try:
+        async for record in connect_scan(targets, ports, skip=checkpoint.is_done):
+            checkpoint.mark(record)
+            records.append(record)
+            if record["state"] == "open":
+                print(Fore.GREEN + f"{record['host']}:{record['port']}/tcp open" + Style.RESET_ALL)
+            if time.monotonic() - last_save >= interval:
+                checkpoint.save(path)
+                last_save = time.monotonic()
+                print(Fore.CYAN + f"Checkpoint: {checkpoint.completed}/{checkpoint.size} done" + Style.RESET_ALL)
+    finally:
+        checkpoint.save(path)
+
+def resumable_port_scanner():
+    """Native scan of a large target x port space with periodic checkpoints and resume."""
+    log_and_print("Starting resumable scan...", level="INFO")
+
+    checkpoint = None
+    if os.path.exists(CHECKPOINT_FILE):
+        if input(f"Resume from {CHECKPOINT_FILE}? (y/n): ").strip().lower() == "y":
+            try:
+                checkpoint = ScanCheckpoint.load()
+            except (OSError, ValueError, KeyError) as e:
+                log_and_print(f"Could not load checkpoint: {e}", level="ERROR")
+                return
+            log_and_print(f"Resuming: {checkpoint.completed}/{checkpoint.size} pairs already done.", level="INFO")
+
+    if checkpoint is None:
+        specs = [t.strip() for t in input("Enter targets, CIDRs, ranges or @files separated by commas: ").split(",") if t.strip()]
+        port_spec = input("Enter port range (e.g., 22-80, 443, 8080): ").strip()
+        try:
+            targets = list(expand_targets(specs))
+            checkpoint = ScanCheckpoint(specs, port_spec, targets, parse_ports(port_spec))
+        except (OSError, ValueError) as e:
+            log_and_print(f"Invalid input: {e}", level="ERROR")
+            return
+        if not targets:
+            log_and_print("No targets provided.", level="ERROR")
+            return
+
+    records = []
+    start = time.perf_counter()
+    try:
+        asyncio.run(checkpointed_scan(checkpoint, records))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        log_and_print(f"Scan interrupted; progress saved to {CHECKPOINT_FILE} "
+                      f"({checkpoint.completed}/{checkpoint.size} done). Choose resume to continue.", level="WARNING")
+        record_scan_history(records)
+        return
+
+    os.remove(CHECKPOINT_FILE)
+    record_scan_history(records)
+    log_and_print(f"Scan complete: {len(checkpoint.open_ports)} open port(s) across {checkpoint.size} pairs, "
+                  f"{len(records)} scanned this session in {time.perf_counter() - start:.2f}s.", level="INFO")
+
+def iter_shards(targets, shard_size=DEFAULT_SHARD_SIZE):
+    """Group an iterable of targets into lists of at most `shard_size`."""
+    shard = []
+    for target in targets:
+        shard.append(target)
+        if len(shard) >= shard_size:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
+
+def parse_nmap_xml(stream):
+    """Incrementally parse nmap `-oX` output and yield one record per port.
+
+    Each <host> element is discarded as soon as it has been read, so memory
+    stays flat no matter how many hosts the scan covers. Ports nmap folds
+    into <extraports> stay folded: each up host with any gets one summary
+    record, with port None, their state and how many there were.
+    """
+    root = None
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if root is None:
+            root = elem
+        if event != "end" or elem.tag != "host":
+            continue
+
+        address = None
+        for addr in elem.findall("address"):
+            if addr.get("addrtype") in ("ipv4", "ipv6"):
+                address = addr.get("addr")
+                break
+        # Key hosts by the name they were given on the command line, else by address
+        host = address
+        for hostname in elem.iterfind("hostnames/hostname"):
+            if hostname.get("type") == "user":
+                host = hostname.get("name")
+        for port in elem.iterfind("ports/port"):
+            state = port.find("state")
+            service = port.find("service")
+            yield {"host": host, "address": address, "port": int(port.get("portid")),
+                   "protocol": port.get("protocol"),
+                   "state": state.get("state") if state is not None else None,
+                   "service": service.get("name") if service is not None else None}
+        status = elem.find("status")
+        extra = {}
+        for extraports in elem.iterfind("ports/extraports"):
+            extra[extraports.get("state")] = extra.get(extraports.get("state"), 0) + int(extraports.get("count", 0))
+        if extra and (status is None or status.get("state") == "up"):
+            # With mixed extraports we can't tell which port was which; anything but open is enough for the diff
+            yield {"host": host, "address": address, "port": None, "protocol": "tcp",
+                   "state": next(iter(extra)) if len(extra) == 1 else "closed", "service": None,
+                   "count": sum(extra.values())}
+        root.clear()
+
+def run_nmap_shard(shard, ports, emit, extra_args=()):
+    """Run one nmap worker over a shard of targets, passing each port record to `emit` as it is parsed."""
+    command = ["nmap", "-oX", "-", "-p", ports.replace(" ", ""), *extra_args, *shard]
+    # stderr goes to a file: an undrained pipe would block nmap while we read stdout
+    with tempfile.TemporaryFile() as errors:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=errors)
+        try:
+            for record in parse_nmap_xml(process.stdout):
+                emit(record)
+        except BaseException:
+            process.kill()
+            raise
+        finally:
+            process.stdout.close()
+            process.wait()
+        if process.returncode != 0:
+            errors.seek(0)
+            raise subprocess.CalledProcessError(process.returncode, command, stderr=errors.read())
+
+def nmap_scan_many(targets, ports, workers=DEFAULT_NMAP_WORKERS, shard_size=DEFAULT_SHARD_SIZE, extra_args=()):
+    """Shard targets across a bounded pool of nmap workers and yield port records as they are parsed.
+
+    Only `workers` shards are in flight at a time; further shards are
+    pulled from the (possibly lazy) target iterable as earlier ones finish.
+    Workers stream records through a bounded queue, so neither a shard's
+    output nor the whole scan is held in memory.
+    """
+    shards = iter_shards(targets, shard_size)
+    records = Queue(NMAP_QUEUE_SIZE)
+    stopped = threading.Event()
+
+    def emit(item):
+        while not stopped.is_set():
+            try:
+                records.put(item, timeout=0.1)
+                return
+            except Full:
+                continue
+        raise RuntimeError("scan stopped")
+
+    def work(shard):
+        try:
+            run_nmap_shard(shard, ports, emit, extra_args)
+            error = None
+        except Exception as e:
+            error = e
+        if not stopped.is_set():
+            emit((shard, error))  # tuples mark a finished shard; records are dicts
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        running = 0
+        for shard in shards:
+            pool.submit(work, shard)
+            running += 1
+            if running >= workers:
+                break
+        try:
+            while running:
+                item = records.get()
+                if isinstance(item, dict):
+                    yield item
+                    continue
+                shard, error = item
+                running -= 1
+                label = shard[0] if len(shard) == 1 else f"{shard[0]} .. {shard[-1]} ({len(shard)} targets)"
+                if isinstance(error, subprocess.CalledProcessError):
+                    log_and_print(f"nmap worker failed on shard {label}: {error}", level="ERROR")
+                elif isinstance(error, ET.ParseError):
+                    log_and_print(f"nmap worker failed on shard {label}: unreadable XML output ({error})", level="ERROR")
+                elif error is not None:
+                    raise error
+                shard = next(shards, None)
+                if shard is not None:
+                    pool.submit(work, shard)
+                    running += 1
+        finally:
+            # Let blocked workers give up if the caller stopped early
+            stopped.set()
+
+def merge_scan_results(records):
+    """Merge port records from any scan engine into one result set keyed by host.
+
+    Extraports summaries stay folded, as the host's "extraports" entry.
+    """
+    merged = {}
+    for record in records:
+        entry = merged.setdefault(record["host"], {"address": record.get("address"), "ports": []})
+        if record["port"] is None:
+            entry["extraports"] = {"state": record["state"], "count": record["count"]}
+            continue
+        entry["ports"].append({key: value for key, value in record.items() if key not in ("host", "address")})
+    for entry in merged.values():
+        entry["ports"].sort(key=lambda port: (port["protocol"], port["port"]))
+    return merged
+
+def iter_merged_records(results):
+    """The port and extraports records behind merged results, for the scan store."""
+    for host, entry in results.items():
+        for port in entry["ports"]:
+            yield dict(port, host=host, address=entry["address"])
+        if "extraports" in entry:
+            yield dict(entry["extraports"], host=host, address=entry["address"], port=None, protocol="tcp", service=None)
+
+def annotate_scan_results(results):
+    """Attach prefix/ASN/org ("network") to merged results when an ASN database is available."""
+    database = open_asn_database()
+    if database is None:
+        return results
+    owners = database.annotate(entry["address"] for entry in results.values())
+    for entry in results.values():
+        entry["network"] = owners.get(entry["address"])
+    database.close()
+    return results
+
+def print_network_owners(addresses):
+    """Print which prefix and AS each address belongs to (needs an ASN database)."""
+    database = open_asn_database()
+    if database is None:
+        return
+    owners = database.annotate(addresses)
+    if owners:
+        print(Fore.GREEN + "\nNetwork owners:" + Style.RESET_ALL)
+    for address, info in sorted(owners.items()):
+        print(f"{address:<39} " + (f"{info['prefix']:<20} {format_owner(info)}" if info else "unknown"))
+    database.close()
+
+def multi_target_port_scanner():
+    """Scan many targets by sharding them across parallel nmap workers."""
+    log_and_print("Starting multi-target nmap scan...", level="INFO")
+
+    specs = [t.strip() for t in input("Enter targets, CIDRs, ranges or @files separated by commas: ").split(",") if t.strip()]
+    ports = input("Enter port range (e.g., 22-80, 443, 8080): ").strip()
+    output_path = input("Save merged results as JSON to (blank to skip): ").strip()
+    try:
+        workers = int(input(f"Number of parallel nmap workers [{DEFAULT_NMAP_WORKERS}]: ").strip() or DEFAULT_NMAP_WORKERS)
+        parse_ports(ports)
+    except ValueError as e:
+        log_and_print(f"Invalid input: {e}", level="ERROR")
+        return
+    if not specs or workers < 1:
+        log_and_print("Targets and a positive worker count are required.", level="ERROR")
+        return
+
+    start = time.perf_counter()
+    try:
+        results = merge_scan_results(nmap_scan_many(expand_targets(specs), ports, workers=workers))
+    except KeyboardInterrupt:
+        log_and_print("Scan stopped by user.", level="WARNING")
+        return
+
+    annotate_scan_results(results)
+    print(Fore.GREEN + "\nScan Results:" + Style.RESET_ALL)
+    for host, entry in results.items():
+        opened = [f"{p['port']}/{p['protocol']} ({p['service'] or 'unknown'})" for p in entry["ports"] if p["state"] == "open"]
+        owner = f" [{format_owner(entry['network'])}]" if entry.get("network") else ""
+        print(f"{host} ({entry['address']}){owner}: " + (", ".join(opened) if opened else "no open ports"))
+    record_scan_history(iter_merged_records(results), parse_ports(ports))
+    if output_path:
+        with open(output_path, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+        log_and_print(f"Merged results saved to {output_path}.", level="INFO")
+    log_and_print(f"Scanned {len(results)} host(s) in {time.perf_counter() - start:.2f}s.", level="INFO")
+
+async def _start_listener_farm(hosts, ports):
+    """Listen on every other port of each loopback host; return the servers."""
+    async def close_immediately(reader, writer):
+        writer.close()
+
+    servers = []
+    for host in hosts:
+        for port in ports[::2]:
+            try:
+                servers.append(await asyncio.start_server(close_immediately, host, port))
+            except OSError:
+                # Port already taken; it will simply show up as open or closed
+                pass
+    return servers
+
+async def _benchmark(hosts, ports):
+    """Time the native scanner and, when available, nmap against the listener farm."""
+    servers = await _start_listener_farm(hosts, ports)
+    results = {}
+    try:
+        start = time.perf_counter()
+        opened = 0
+        async for record in connect_scan(hosts, ports):
+            opened += record["state"] == "open"
+        results["native"] = (time.perf_counter() - start, opened)
+
+        if which("nmap"):
+            command = ["nmap", "-sT", "-n", "-Pn", "-p", f"{ports[0]}-{ports[-1]}", *hosts]
+            start = time.perf_counter()
+            process = await asyncio.create_subprocess_exec(*command, stdout=asyncio.subprocess.PIPE,
+                                                           stderr=asyncio.subprocess.DEVNULL)
+            output, _ = await process.communicate()
+            results["nmap"] = (time.perf_counter() - start, output.decode(errors="replace").count("/tcp open"))
+    finally:
+        for server in servers:
+            server.close()
+    return results
+
+def benchmark_port_scanner():
+    """Compare native connect-scan throughput with nmap on a local listener farm."""
+    # Linux routes all of 127.0.0.0/8 to loopback; elsewhere only 127.0.0.1 is safe
+    if platform.system().lower() == "linux":
+        hosts = [f"127.0.0.{i}" for i in range(1, BENCHMARK_HOSTS + 1)]
+    else:
+        hosts = ["127.0.0.1"]
+    ports = list(range(BENCHMARK_PORT_BASE, BENCHMARK_PORT_BASE + BENCHMARK_PORT_COUNT))
+    total = len(hosts) * len(ports)
+    log_and_print(f"Benchmarking against {len(hosts)} loopback host(s) x {len(ports)} ports...", level="INFO")
+
+    results = asyncio.run(_benchmark(hosts, ports))
+    for engine, (elapsed, opened) in results.items():
+        log_and_print(f"{engine}: {total} ports in {elapsed:.2f}s ({total / elapsed:,.0f} ports/sec), "
+                      f"{opened} open", level="INFO")
+    if "nmap" not in results:
+        log_and_print("nmap not found; skipped the nmap comparison.", level="WARNING")
+
 if __name__ == "__main__":
-    # Step 1: Detect environment and install nmap if necessary
-    detect_environment_and_install()
+    print(Fore.CYAN + "1. Scan with nmap" + Style.RESET_ALL)
+    print(Fore.CYAN + "2. Native connect scan (no nmap needed)" + Style.RESET_ALL)
+    print(Fore.CYAN + "3. Benchmark native scanner against nmap" + Style.RESET_ALL)
+    print(Fore.CYAN + "4. Scan many targets with parallel nmap workers" + Style.RESET_ALL)
+    print(Fore.CYAN + "5. Incremental rescan (skip recently confirmed ports)" + Style.RESET_ALL)
+    print(Fore.CYAN + "6. Large scan with checkpoints (resumable)" + Style.RESET_ALL)
+    choice = input(Fore.CYAN + "Select an option (1-7): " + Style.RESET_ALL).strip()
+
+    if choice == "2":
+        native_port_scanner()
+    elif choice == "3":
+        benchmark_port_scanner()
+    elif choice == "4":
+        detect_environment_and_install()
+        multi_target_port_scanner()
+    elif choice == "5":
+        incremental_port_scanner()
+    elif choice == "6":
+        resumable_port_scanner()
+    else:
+        # Step 1: Detect environment and install nmap if necessary
+        detect_environment_and_install()
 
-    # Step 2: Run Port Scanner
-    port_scanner()
+        # Step 2: Run Port Scanner
+        port_scanner()
 
     log_and_print("Port scanning script finished.", level="INFO")
@@ -4,9 +4,57 @@ import os
 import platform
 import psutil
 import logging
+import socket
+import struct
+import math
+import mmap
+import tempfile
+from array import array
+import threading
+import time
 from shutil import which
 from colorama import Fore, Style
 
+# CPU sampler: counters file, delay between the two reads of a first sample
+# (long enough for a few scheduler ticks per core), background sampling period
+PROC_STAT = "/proc/stat"
+PROC_LOADAVG = "/proc/loadavg"
+PROC_MEMINFO = "/proc/meminfo"
+PROC_NET_DEV = "/proc/net/dev"
+# pread chunk size; ProcReader keeps reading until EOF for files larger than a chunk
+PROC_READ_SIZE = 4096
+# Interface rate monitor: sampling period, screen refresh, interfaces shown
+RATE_INTERVAL = 0.1
+RATE_REFRESH = 1.0
+RATE_TOP = 20
+# Counters tracked per interface, with their token offsets in a /proc/net/dev row
+# (the interface name is token 0)
+RATE_FIELDS = ("rx_bytes", "rx_packets", "rx_errors", "rx_drops", "tx_bytes", "tx_packets", "tx_errors", "tx_drops")
+NET_DEV_COLUMNS = (1, 2, 3, 4, 9, 10, 11, 12)
+NET_DEV_TOKENS = 17
+# Metric history ring: a header, a table of (base timestamp, record count) per
+# block of RING_BLOCK slots, then `capacity` fixed 6-byte records. Records carry
+# no timestamp: slot j of a block was sampled at base + j * interval, and a gap
+# in sampling starts a new block. cpu/mem/disk percent are stored in 0.5% steps
+# and load1, rx/tx MiB/s on a log scale (RING_LOG_STEPS codes per doubling above
+# RING_LOG_UNIT, about 5% apart), so a week of 1-second samples is about 3.6 MB.
+METRICS_RING_FILE = "system_metrics.ring"
+RING_MAGIC = b"SYSRING2"
+RING_HEADER = struct.Struct("<8sIIQI")
+RING_HEAD_OFFSET = 16
+RING_HEADER_SIZE = 64
+RING_BLOCK = 256
+RING_BLOCK_ENTRY = struct.Struct("<II")
+RING_RECORD = struct.Struct("<6B")
+RING_CAPACITY = 28 * 24 * 3600
+RING_FLUSH_EVERY = 60
+RING_FIELDS = ("cpu_pct", "mem_pct", "disk_pct", "load1", "rx_mib_s", "tx_mib_s")
+RING_LOG_UNIT = 0.01
+RING_LOG_STEPS = 15
+RING_LOG_VALUES = tuple(RING_LOG_UNIT * (2 ** (code / RING_LOG_STEPS) - 1) for code in range(256))
+CPU_PRIME_DELAY = 0.05
+CPU_SAMPLE_INTERVAL = 1.0
+
 # Set up logging configuration
 LOG_FILE = "data.log"
 logging.basicConfig(
@@ -87,30 +135,234 @@ def detect_environment_and_install():
         log_and_print(f"Failed to install necessary tools: {e}", level="ERROR")
         sys.exit(1)
 
+class ProcReader:
+    """A /proc file kept open and re-read with os.pread.
+
+    /proc files regenerate their contents on every read from offset 0, so a
+    persistent descriptor avoids an open/close (and any fork) per sample.
+    """
+
+    def __init__(self, path, size=PROC_READ_SIZE):
+        self.path = path
+        self.size = size
+        self.fd = os.open(path, os.O_RDONLY)
+
+    def read(self):
+        # seq_file-backed files hand out about a page per read whatever the
+        # buffer size, so keep reading at later offsets until one returns nothing
+        chunk = os.pread(self.fd, self.size, 0)
+        chunks, offset = [chunk], len(chunk)
+        while chunk:
+            chunk = os.pread(self.fd, self.size, offset)
+            chunks.append(chunk)
+            offset += len(chunk)
+        return chunks[0] if len(chunks) == 2 else b"".join(chunks)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+class SystemCollector:
+    """Structured system readings from persistent /proc descriptors.
+
+    Readers are opened on first use. Files that don't exist (non-Linux,
+    restricted containers) fall back to the equivalent psutil call.
+    """
+
+    def __init__(self):
+        self.readers = {}
+
+    def _reader(self, path):
+        if path not in self.readers:
+            try:
+                self.readers[path] = ProcReader(path)
+            except OSError:
+                self.readers[path] = None
+        return self.readers[path]
+
+    def loadavg(self):
+        """{"load1", "load5", "load15"} plus running/total tasks where /proc has them."""
+        reader = self._reader(PROC_LOADAVG)
+        if reader is None:
+            load1, load5, load15 = psutil.getloadavg()
+            return {"load1": load1, "load5": load5, "load15": load15}
+        fields = reader.read().split()
+        running, total = fields[3].split(b"/")
+        return {"load1": float(fields[0]), "load5": float(fields[1]), "load15": float(fields[2]),
+                "running": int(running), "tasks": int(total)}
+
+    def meminfo(self):
+        """Memory figures in bytes: total, available, used, percent, swap_total, swap_free."""
+        reader = self._reader(PROC_MEMINFO)
+        if reader is None:
+            memory, swap = psutil.virtual_memory(), psutil.swap_memory()
+            return {"total": memory.total, "available": memory.available, "used": memory.total - memory.available,
+                    "percent": memory.percent, "swap_total": swap.total, "swap_free": swap.free}
+        values = {}
+        for line in reader.read().splitlines():
+            key, _, rest = line.partition(b":")
+            values[key] = int(rest.split()[0]) * 1024
+        total = values[b"MemTotal"]
+        available = values.get(b"MemAvailable", values[b"MemFree"] + values.get(b"Buffers", 0) + values.get(b"Cached", 0))
+        return {"total": total, "available": available, "used": total - available,
+                "percent": round(100.0 * (total - available) / total, 1) if total else 0.0,
+                "swap_total": values.get(b"SwapTotal", 0), "swap_free": values.get(b"SwapFree", 0)}
+
+    def net_counters(self):
+        """Per-interface counters: {name: {"rx_bytes", "rx_packets", "rx_errors", "rx_drops", "tx_..."}}."""
+        reader = self._reader(PROC_NET_DEV)
+        if reader is None:
+            return {name: {"rx_bytes": c.bytes_recv, "rx_packets": c.packets_recv, "rx_errors": c.errin, "rx_drops": c.dropin,
+                           "tx_bytes": c.bytes_sent, "tx_packets": c.packets_sent, "tx_errors": c.errout, "tx_drops": c.dropout}
+                    for name, c in psutil.net_io_counters(pernic=True).items()}
+        counters = {}
+        for line in reader.read().splitlines()[2:]:
+            name, _, rest = line.partition(b":")
+            fields = rest.split()
+            counters[name.strip().decode()] = {"rx_bytes": int(fields[0]), "rx_packets": int(fields[1]),
+                                               "rx_errors": int(fields[2]), "rx_drops": int(fields[3]),
+                                               "tx_bytes": int(fields[8]), "tx_packets": int(fields[9]),
+                                               "tx_errors": int(fields[10]), "tx_drops": int(fields[11])}
+        return counters
+
+    def interfaces(self):
+        """Interfaces with state, MTU, link speed, MAC and addresses (psutil uses netlink/getifaddrs)."""
+        stats = psutil.net_if_stats()
+        counters = self.net_counters()
+        interfaces = []
+        for name, addresses in sorted(psutil.net_if_addrs().items()):
+            interface = {"name": name, "up": None, "mtu": None, "speed_mbps": None, "mac": None, "addresses": [],
+                         "counters": counters.get(name)}
+            if name in stats:
+                interface.update(up=stats[name].isup, mtu=stats[name].mtu, speed_mbps=stats[name].speed or None)
+            for address in addresses:
+                if address.family == psutil.AF_LINK:
+                    interface["mac"] = address.address
+                elif address.family in (socket.AF_INET, socket.AF_INET6):
+                    interface["addresses"].append({"family": "IPv4" if address.family == socket.AF_INET else "IPv6",
+                                                   "address": address.address, "netmask": address.netmask})
+            interfaces.append(interface)
+        return interfaces
+
+    def close(self):
+        for reader in self.readers.values():
+            if reader is not None:
+                reader.close()
+        self.readers.clear()
+
+# Shared collector, so descriptors stay open across calls
+collector = SystemCollector()
+
 def get_cpu_load():
-    """Fetch CPU load using shell commands as a fallback."""
+    """Show the load average, as a fallback when CPU usage isn't available."""
     try:
-        result = subprocess.run(["cat", "/proc/loadavg"], capture_output=True, text=True, check=True)
-        load_avg = result.stdout.split()[0]  # Get the 1-minute load average
+        load_avg = collector.loadavg()["load1"]  # Get the 1-minute load average
         log_and_print(f"CPU Load Average (1 min): {load_avg}", level="INFO")
         print(Fore.GREEN + f"CPU Load Average (1 min): {load_avg}" + Style.RESET_ALL)
-    except subprocess.CalledProcessError as e:
+    except (OSError, AttributeError, psutil.Error) as e:
         log_and_print(f"Failed to fetch CPU load average: {e}", level="ERROR")
 
+class CpuSampler:
+    """CPU usage from counter deltas between calls, without blocking for an interval.
+
+    Keeps the previous /proc/stat counters (psutil.cpu_times() where there is
+    no /proc/stat) and computes total and per-core usage since the last call.
+    Only the first call waits, for CPU_PRIME_DELAY. start() runs the sampler
+    on a background thread so latest() always has a fresh reading.
+    """
+
+    def __init__(self, path=PROC_STAT):
+        self.path = path
+        self.reader = None
+        self.previous = None
+        self.latest_usage = None
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def read_counters(self):
+        """(busy, total) jiffies for "cpu" and each "cpuN"."""
+        counters = {}
+        if self.reader is None and os.access(self.path, os.R_OK):
+            self.reader = ProcReader(self.path)
+        if self.reader is not None:
+            for line in self.reader.read().splitlines():
+                if not line.startswith(b"cpu"):
+                    break
+                fields = line.split()
+                # user nice system idle iowait irq softirq steal; guest time is already in user/nice
+                values = [int(value) for value in fields[1:9]]
+                total = sum(values)
+                counters[fields[0].decode()] = (total - values[3] - values[4], total)
+            return counters
+        for name, times in [("cpu", psutil.cpu_times())] + [(f"cpu{index}", t) for index, t in enumerate(psutil.cpu_times(percpu=True))]:
+            total = sum(times) - getattr(times, "guest", 0) - getattr(times, "guest_nice", 0)
+            idle = times.idle + getattr(times, "iowait", 0)
+            counters[name] = (total - idle, total)
+        return counters
+
+    def sample(self):
+        """Usage since the previous call as {"total": percent, "cores": [percent, ...]}."""
+        with self.lock:
+            counters = self.read_counters()
+            if self.previous is None:
+                self.previous = counters
+                time.sleep(CPU_PRIME_DELAY)
+                counters = self.read_counters()
+            usage = {}
+            for name, (busy, total) in counters.items():
+                old_busy, old_total = self.previous.get(name, (busy, total))
+                elapsed = total - old_total
+                usage[name] = 100.0 * (busy - old_busy) / elapsed if elapsed > 0 else 0.0
+            self.previous = counters
+            self.latest_usage = {"total": usage.pop("cpu", 0.0),
+                                 "cores": [usage[name] for name in sorted(usage, key=lambda name: int(name[3:]))]}
+            return self.latest_usage
+
+    def latest(self):
+        """The background thread's last reading, or a fresh sample when it isn't running."""
+        if self.thread is not None and self.latest_usage is not None:
+            return self.latest_usage
+        return self.sample()
+
+    def _run(self, interval):
+        while not self.stop_event.wait(interval):
+            self.sample()
+
+    def start(self, interval=CPU_SAMPLE_INTERVAL):
+        """Sample every `interval` seconds on a daemon thread."""
+        if self.thread is None:
+            self.sample()
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, args=(interval,), daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+# Shared sampler, so repeated calls measure from the previous one
+cpu_sampler = CpuSampler()
+
 def cpu_memory_usage():
     """Display real-time CPU and memory statistics."""
     log_and_print("Fetching CPU and memory usage...", level="INFO")
     try:
-        if os.access('/proc/stat', os.R_OK):
-            cpu_usage = psutil.cpu_percent(interval=1)
-            log_and_print(f"CPU Usage: {cpu_usage}%", level="INFO")
-            print(Fore.GREEN + f"CPU Usage: {cpu_usage}%" + Style.RESET_ALL)
-        else:
+        try:
+            cpu_usage = cpu_sampler.latest()
+            cores = ", ".join(f"{core:.1f}%" for core in cpu_usage["cores"])
+            log_and_print(f"CPU Usage: {cpu_usage['total']:.1f}% (per core: {cores})", level="INFO")
+            print(Fore.GREEN + f"CPU Usage: {cpu_usage['total']:.1f}%" + Style.RESET_ALL)
+        except (OSError, psutil.Error):
             get_cpu_load()  # Use fallback method
 
-        memory = psutil.virtual_memory()
-        log_and_print(f"Memory Usage: {memory.percent}%", level="INFO")
-        print(Fore.GREEN + f"Memory Usage: {memory.percent}%" + Style.RESET_ALL)
+        memory = collector.meminfo()
+        log_and_print(f"Memory Usage: {memory['percent']}%", level="INFO")
+        print(Fore.GREEN + f"Memory Usage: {memory['percent']}%" + Style.RESET_ALL)
     except Exception as e:
         log_and_print(f"Error fetching CPU/Memory usage: {e}", level="ERROR")
 
@@ -125,15 +377,460 @@ def network_info():
     """Display network information."""
     log_and_print("Fetching network details...", level="INFO")
     try:
-        if platform.system().lower() == "windows":
-            command = ["ipconfig"]
-        else:
-            command = ["ifconfig"]
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        log_and_print(result.stdout, level="INFO")
-        print(Fore.GREEN + result.stdout + Style.RESET_ALL)
-    except subprocess.CalledProcessError as e:
+        interfaces = collector.interfaces()
+    except (OSError, psutil.Error) as e:
         log_and_print(f"Failed to fetch network details: {e}", level="ERROR")
+        return []
+    for interface in interfaces:
+        state = "up" if interface["up"] else "down" if interface["up"] is not None else "unknown"
+        speed = f", {interface['speed_mbps']} Mbit/s" if interface["speed_mbps"] else ""
+        print(Fore.GREEN + f"{interface['name']}: {state}, MTU {interface['mtu']}{speed}, MAC {interface['mac'] or '-'}" + Style.RESET_ALL)
+        for address in interface["addresses"]:
+            print(f"    {address['family']} {address['address']}" + (f" netmask {address['netmask']}" if address["netmask"] else ""))
+        counters = interface["counters"]
+        if counters:
+            print(f"    RX {counters['rx_bytes']} bytes, {counters['rx_packets']} packets, {counters['rx_errors']} errors, {counters['rx_drops']} dropped")
+            print(f"    TX {counters['tx_bytes']} bytes, {counters['tx_packets']} packets, {counters['tx_errors']} errors, {counters['tx_drops']} dropped")
+        logging.info(f"Interface {interface}")
+    return interfaces
+
+def benchmark_collectors(rounds=10000):
+    """Show the per-sample cost of each collector, next to spawning `cat`."""
+    log_and_print(f"Timing {rounds} samples per collector...", level="INFO")
+    sampler = CpuSampler()
+    checks = [("loadavg (pread)", collector.loadavg), ("meminfo (pread)", collector.meminfo),
+              ("net counters (pread)", collector.net_counters), ("cpu counters (pread)", sampler.read_counters),
+              ("interfaces (psutil)", collector.interfaces)]
+    for name, function in checks:
+        function()  # open descriptors outside the timing
+        count = rounds if "psutil" not in name else max(1, rounds // 10)
+        start = time.perf_counter()
+        for _ in range(count):
+            function()
+        elapsed = (time.perf_counter() - start) / count
+        log_and_print(f"{name:<22} {elapsed * 1e6:9.1f} µs/sample", level="INFO")
+    if os.path.exists(PROC_LOADAVG) and which("cat"):
+        count = max(1, rounds // 200)
+        start = time.perf_counter()
+        for _ in range(count):
+            subprocess.run(["cat", PROC_LOADAVG], capture_output=True, check=True)
+        elapsed = (time.perf_counter() - start) / count
+        log_and_print(f"{'loadavg (cat)':<22} {elapsed * 1e6:9.1f} µs/sample", level="INFO")
+
+class InterfaceRateMonitor:
+    """Per-interface rates from /proc/net/dev counter deltas.
+
+    The file is preadv()'d into a reused buffer and counters land in
+    preallocated arrays (one row of RATE_FIELDS per interface), which are
+    only reallocated when the set of interfaces changes. Parsing still
+    allocates: each sample splits a copy of the buffer into 17 tokens per
+    interface and int()s the tracked ones, which in CPython is about twice as
+    fast as walking the rows by offset in place.
+    """
+
+    def __init__(self, path=PROC_NET_DEV):
+        self.fd = None
+        if os.path.exists(path) and hasattr(os, "preadv"):
+            self.fd = os.open(path, os.O_RDONLY)
+        self.buffer = bytearray(64 * 1024)
+        self.view = memoryview(self.buffer)
+        self.names = []
+        self.raw_names = []
+        self.previous = self.current = self.rates = array("Q")
+        self.peaks = array("d")
+        self.last_time = None
+
+    def _layout(self, names):
+        width = len(names) * len(RATE_FIELDS)
+        self.raw_names = [bytes(name) if isinstance(name, bytearray) else name for name in names]
+        self.names = [name.decode() if isinstance(name, bytes) else name for name in self.raw_names]
+        self.previous = array("Q", bytes(8 * width))
+        self.current = array("Q", bytes(8 * width))
+        self.rates = array("d", bytes(8 * width))
+        self.peaks = array("d", bytes(8 * width))
+        self.last_time = None
+
+    def _read(self):
+        """Fill self.current; returns False when the interface set changed."""
+        fields = len(RATE_FIELDS)
+        stable = True
+        if self.fd is None:
+            counters = psutil.net_io_counters(pernic=True)
+            if list(counters) != self.raw_names:
+                self._layout(list(counters))
+                stable = False
+            for row, name in enumerate(self.names):
+                c = counters[name]
+                base = row * fields
+                self.current[base:base + fields] = array("Q", (c.bytes_recv, c.packets_recv, c.errin, c.dropin,
+                                                                c.bytes_sent, c.packets_sent, c.errout, c.dropout))
+            return stable
+        # Like every seq_file, /proc/net/dev hands out about a page per read,
+        # so read on at later offsets (growing the buffer if needed) until EOF
+        size = 0
+        while True:
+            if size == len(self.buffer):
+                grown = bytearray(2 * size)
+                grown[:size] = self.view
+                self.buffer, self.view = grown, memoryview(grown)
+            read = os.preadv(self.fd, [self.view[size:]], size)
+            if not read:
+                break
+            size += read
+        # Skip the two header lines; wide counters can touch the "name:" colon
+        start = self.buffer.index(b"\n", self.buffer.index(b"\n") + 1) + 1
+        tokens = self.buffer[start:size].replace(b":", b" ").split()
+        count = len(tokens) // NET_DEV_TOKENS
+        if count != len(self.raw_names) or any(tokens[row * NET_DEV_TOKENS] != self.raw_names[row] for row in range(count)):
+            self._layout([tokens[row * NET_DEV_TOKENS] for row in range(count)])
+            stable = False
+        current = self.current
+        for row in range(count):
+            base, out = row * NET_DEV_TOKENS, row * fields
+            for index in range(fields):
+                current[out + index] = int(tokens[base + NET_DEV_COLUMNS[index]])
+        return stable
+
+    def sample(self, now=None):
+        """Take a sample; returns True once rates are available."""
+        now = time.monotonic() if now is None else now
+        stable = self._read()
+        ready = stable and self.last_time is not None and now > self.last_time
+        if ready:
+            elapsed = now - self.last_time
+            previous, current, rates, peaks = self.previous, self.current, self.rates, self.peaks
+            for index in range(len(current)):
+                delta = current[index] - previous[index]
+                # a counter that went backwards means the interface was reset
+                rates[index] = delta / elapsed if delta > 0 else 0.0
+                if rates[index] > peaks[index]:
+                    peaks[index] = rates[index]
+        self.previous, self.current = self.current, self.previous
+        self.last_time = now
+        return ready
+
+    def totals(self, skip=("lo",)):
+        """Summed (rx, tx) bytes per second over all interfaces but `skip`."""
+        fields = len(RATE_FIELDS)
+        rx = tx = 0.0
+        for row, name in enumerate(self.names):
+            if name not in skip:
+                rx += self.rates[row * fields]
+                tx += self.rates[row * fields + 4]
+        return rx, tx
+
+    def interface_rates(self, name):
+        """{field: per-second rate} for one interface."""
+        base = self.names.index(name) * len(RATE_FIELDS)
+        return dict(zip(RATE_FIELDS, self.rates[base:base + len(RATE_FIELDS)]))
+
+    def print_rates(self, limit=RATE_TOP):
+        """Print the busiest interfaces."""
+        fields = len(RATE_FIELDS)
+        rows = sorted(range(len(self.names)), key=lambda row: self.rates[row * fields] + self.rates[row * fields + 4], reverse=True)
+        print(Fore.GREEN + f"{'Interface':<16} {'RX':>12} {'TX':>12} {'RX pkt/s':>9} {'TX pkt/s':>9} {'Err/s':>7} {'Drop/s':>7} {'Peak RX':>12} {'Peak TX':>12}" + Style.RESET_ALL)
+        for row in rows[:limit]:
+            rx_bytes, rx_packets, rx_errors, rx_drops, tx_bytes, tx_packets, tx_errors, tx_drops = self.rates[row * fields:(row + 1) * fields]
+            print(f"{self.names[row][:16]:<16} {format_bytes_rate(rx_bytes):>12} {format_bytes_rate(tx_bytes):>12} {rx_packets:9.0f} {tx_packets:9.0f} "
+                  f"{rx_errors + tx_errors:7.1f} {rx_drops + tx_drops:7.1f} "
+                  f"{format_bytes_rate(self.peaks[row * fields]):>12} {format_bytes_rate(self.peaks[row * fields + 4]):>12}")
+        if len(rows) > limit:
+            print(f"... and {len(rows) - limit} more interface(s)")
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+def format_bytes_rate(rate):
+    """Human-readable bytes per second."""
+    for unit in ("B/s", "KiB/s", "MiB/s", "GiB/s"):
+        if rate < 1024 or unit == "GiB/s":
+            return f"{rate:.1f} {unit}"
+        rate /= 1024
+
+def monitor_interfaces(interval=RATE_INTERVAL, refresh=RATE_REFRESH, duration=None):
+    """Sample interface counters every `interval` seconds and redraw every `refresh` seconds."""
+    monitor = InterfaceRateMonitor()
+    log_and_print(f"Sampling interface counters every {interval:g}s (Ctrl+C to stop)...", level="INFO")
+    started = next_sample = next_draw = time.monotonic()
+    try:
+        while duration is None or time.monotonic() - started < duration:
+            if monitor.sample() and time.monotonic() >= next_draw:
+                print(f"\n{time.strftime('%H:%M:%S')}")
+                monitor.print_rates()
+                next_draw += refresh
+            next_sample += interval
+            time.sleep(max(0.0, next_sample - time.monotonic()))
+    except KeyboardInterrupt:
+        print()
+    finally:
+        monitor.close()
+
+def benchmark_rate_monitor(samples=2000):
+    """Per-sample cost of the rate monitor, and the CPU it needs at 10 Hz."""
+    monitor = InterfaceRateMonitor()
+    monitor.sample()
+    monitor.sample()
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    for _ in range(samples):
+        monitor.sample()
+    elapsed = (time.perf_counter() - start) / samples
+    cpu = (time.process_time() - cpu_start) / samples
+    log_and_print(f"{len(monitor.names)} interface(s): {elapsed * 1e6:.1f} µs/sample, "
+                  f"{cpu / RATE_INTERVAL * 100:.3f}% of one core at {1 / RATE_INTERVAL:g} Hz", level="INFO")
+    monitor.close()
+
+class MetricRing:
+    """Fixed-size, memory-mapped ring file of RING_RECORD samples.
+
+    The header holds the capacity, the sampling interval and the number of
+    slots ever used. Once the ring is full the oldest block is overwritten,
+    so the file never grows. Block base timestamps are kept non-decreasing,
+    which lets readers binary-search a time range straight out of the
+    mapping: positions below count blocks from the oldest live one, so
+    position i * RING_BLOCK + j is slot j of the i-th oldest block.
+    """
+
+    def __init__(self, path=METRICS_RING_FILE, capacity=RING_CAPACITY, writable=False, interval=1):
+        self.path = path
+        self.writable = writable
+        if writable and not os.path.exists(path):
+            capacity = -(-capacity // RING_BLOCK) * RING_BLOCK
+            with open(path, "wb") as ring_file:
+                ring_file.write(RING_HEADER.pack(RING_MAGIC, RING_RECORD.size, capacity, 0, max(1, int(interval)))
+                                .ljust(RING_HEADER_SIZE, b"\0"))
+                ring_file.truncate(RING_HEADER_SIZE + capacity // RING_BLOCK * RING_BLOCK_ENTRY.size
+                                   + capacity * RING_RECORD.size)
+        with open(path, "r+b" if writable else "rb") as ring_file:
+            self.mapped = mmap.mmap(ring_file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        magic, record_size, self.capacity, _, self.interval = RING_HEADER.unpack_from(self.mapped)
+        self.blocks = self.capacity // RING_BLOCK
+        self.records_start = RING_HEADER_SIZE + self.blocks * RING_BLOCK_ENTRY.size
+        if magic != RING_MAGIC or record_size != RING_RECORD.size or self.capacity % RING_BLOCK or not self.interval \
+                or len(self.mapped) < self.records_start + self.capacity * RING_RECORD.size:
+            self.mapped.close()
+            raise ValueError(f"{path} is not a metrics ring file")
+        self.unflushed = 0
+
+    @property
+    def head(self):
+        return struct.unpack_from("<Q", self.mapped, RING_HEAD_OFFSET)[0]
+
+    def _live_blocks(self):
+        """(physical index of the oldest live block, number of live blocks)."""
+        head = self.head
+        if not head:
+            return 0, 0
+        current = (head - 1) % self.capacity // RING_BLOCK
+        if head <= self.capacity:
+            return 0, current + 1
+        return (current + 1) % self.blocks, self.blocks
+
+    def _entry(self, block):
+        return RING_BLOCK_ENTRY.unpack_from(self.mapped, RING_HEADER_SIZE + block * RING_BLOCK_ENTRY.size)
+
+    def _block(self, index):
+        """(base timestamp, record count) of the index-th oldest live block."""
+        first, _ = self._live_blocks()
+        return self._entry((first + index) % self.blocks)
+
+    def __len__(self):
+        first, live = self._live_blocks()
+        return sum(self._entry((first + index) % self.blocks)[1] for index in range(live))
+
+    def _offset(self, position):
+        """Byte offset of the record at a position (i-th oldest block * RING_BLOCK + slot)."""
+        first, _ = self._live_blocks()
+        block = (first + position // RING_BLOCK) % self.blocks
+        return self.records_start + (block * RING_BLOCK + position % RING_BLOCK) * RING_RECORD.size
+
+    def append(self, timestamp, cpu_pct, mem_pct, disk_pct, load1, rx_mib_s, tx_mib_s):
+        head = self.head
+        timestamp = int(timestamp)
+        base = count = None
+        if head:
+            base, count = self._entry((head - 1) % self.capacity // RING_BLOCK)
+            expected = base + count * self.interval
+        # Stay in the block unless it is full or at least a whole sample was missed; a
+        # sample up to one interval late or early is filed at the slot it was due in
+        if count is None or count >= RING_BLOCK or timestamp > expected + self.interval:
+            if head % RING_BLOCK:
+                head += RING_BLOCK - head % RING_BLOCK  # leave the rest of the old block empty
+            base = timestamp if count is None else max(timestamp, expected)
+            count = 0
+        block = head % self.capacity // RING_BLOCK
+        entry = RING_HEADER_SIZE + block * RING_BLOCK_ENTRY.size
+        if not count:
+            # Retire the block being reused before head makes it the newest one
+            RING_BLOCK_ENTRY.pack_into(self.mapped, entry, base, 0)
+        struct.pack_into("<Q", self.mapped, RING_HEAD_OFFSET, head + 1)
+        RING_RECORD.pack_into(self.mapped, self.records_start + (head % self.capacity) * RING_RECORD.size,
+                              _percent_code(cpu_pct), _percent_code(mem_pct), _percent_code(disk_pct),
+                              _log_code(load1), _log_code(rx_mib_s), _log_code(tx_mib_s))
+        # Counts are bumped after the record is complete, so readers never see a torn one
+        RING_BLOCK_ENTRY.pack_into(self.mapped, entry, base, count + 1)
+        self.unflushed += 1
+        if self.unflushed >= RING_FLUSH_EVERY:
+            self.mapped.flush()
+            self.unflushed = 0
+
+    def _bisect(self, timestamp):
+        """Position of the first record at or after `timestamp`."""
+        _, live = self._live_blocks()
+        lo, hi = 0, live
+        while lo < hi:
+            mid = (lo + hi) // 2
+            base, count = self._block(mid)
+            # An empty block is one being retired (oldest) or just started (newest)
+            if (base + (count - 1) * self.interval < timestamp) if count else mid == 0:
+                lo = mid + 1
+            else:
+                hi = mid
+        if not live:
+            return 0
+        lo = min(lo, live - 1)  # past the newest record: the end of the newest block
+        base, count = self._block(lo)
+        return lo * RING_BLOCK + min(count, max(0, -(-(timestamp - base) // self.interval)))
+
+    def query(self, start, end):
+        """Records with start <= timestamp < end, as {"timestamp": array, field: array, ...}."""
+        result = {"timestamp": array("I")}
+        result.update({field: array("f") for field in RING_FIELDS})
+        lo, hi = self._bisect(start), self._bisect(end)
+        timestamps = result["timestamp"]
+        columns = [result[field] for field in RING_FIELDS]
+        # Records are contiguous within a block; blocks wrap around the end of the file
+        while lo < hi:
+            block, slot = divmod(lo, RING_BLOCK)
+            base, count = self._block(block)
+            last = min(count, hi - block * RING_BLOCK)
+            if slot < last:
+                offset = self._offset(lo)
+                records = RING_RECORD.iter_unpack(self.mapped[offset:offset + (last - slot) * RING_RECORD.size])
+                for index, (cpu, mem, disk, load, rx, tx) in enumerate(records, start=slot):
+                    timestamps.append(base + index * self.interval)
+                    for column, value in zip(columns, (cpu / 2, mem / 2, disk / 2, RING_LOG_VALUES[load],
+                                                       RING_LOG_VALUES[rx], RING_LOG_VALUES[tx])):
+                        column.append(value)
+            lo = (block + 1) * RING_BLOCK
+        return result
+
+    def downsample(self, start, end, bucket):
+        """Per-bucket averages and maxima: [{"timestamp", "samples", field: (avg, max), ...}]."""
+        if bucket <= 0:
+            raise ValueError(f"bucket must be a positive number of seconds, not {bucket}")
+        history = self.query(start, end)
+        buckets = []
+        current = None
+        for index, timestamp in enumerate(history["timestamp"]):
+            key = timestamp - timestamp % bucket
+            if current is None or current["timestamp"] != key:
+                current = {"timestamp": key, "samples": 0}
+                current.update({field: [0.0, float("-inf")] for field in RING_FIELDS})
+                buckets.append(current)
+            current["samples"] += 1
+            for field in RING_FIELDS:
+                value = history[field][index]
+                totals = current[field]
+                totals[0] += value
+                if value > totals[1]:
+                    totals[1] = value
+        for entry in buckets:
+            for field in RING_FIELDS:
+                entry[field] = (entry[field][0] / entry["samples"], entry[field][1])
+        return buckets
+
+    def close(self):
+        if self.writable:
+            self.mapped.flush()
+        self.mapped.close()
+
+def _percent_code(value):
+    """Store a percentage in 0.5% steps in one byte."""
+    return max(0, min(200, round(value * 2)))
+
+def _log_code(value):
+    """Store a non-negative load or rate in one byte on the RING_LOG_VALUES scale."""
+    if value <= 0:
+        return 0
+    return min(255, round(RING_LOG_STEPS * math.log2(1 + value / RING_LOG_UNIT)))
+
+def record_metrics(path=METRICS_RING_FILE, interval=1, duration=None, capacity=RING_CAPACITY):
+    """Append a CPU/memory/disk/load/network sample to the ring every `interval` seconds.
+
+    An existing ring keeps the whole-second interval it was created with.
+    """
+    ring = MetricRing(path, capacity, writable=True, interval=interval)
+    interval = ring.interval
+    sampler = CpuSampler()
+    monitor = InterfaceRateMonitor()
+    sampler.sample()
+    monitor.sample()
+    log_and_print(f"Recording to {path} every {interval:g}s, {ring.capacity} records "
+                  f"({ring.capacity * interval / 86400:.1f} days) before wrapping (Ctrl+C to stop)...", level="INFO")
+    started = next_sample = time.monotonic()
+    recorded = 0
+    try:
+        while duration is None or time.monotonic() - started < duration:
+            next_sample += interval
+            delay = next_sample - time.monotonic()
+            if delay < -interval:
+                next_sample -= delay  # fell behind (suspend, stall): skip the missed samples, the ring records a gap
+            time.sleep(max(0.0, delay))
+            monitor.sample()
+            rx, tx = monitor.totals()
+            ring.append(time.time(), sampler.sample()["total"], collector.meminfo()["percent"],
+                        psutil.disk_usage("/").percent, collector.loadavg()["load1"], rx / 2 ** 20, tx / 2 ** 20)
+            recorded += 1
+    except KeyboardInterrupt:
+        print()
+    finally:
+        ring.close()
+        monitor.close()
+    log_and_print(f"Recorded {recorded} sample(s).", level="INFO")
+
+def show_metric_history(path=METRICS_RING_FILE, hours=1.0, bucket=60):
+    """Print bucketed averages (and maxima) for the last `hours` of the ring."""
+    ring = MetricRing(path)
+    try:
+        now = time.time()
+        rows = ring.downsample(now - hours * 3600, now + 1, bucket)
+    finally:
+        ring.close()
+    if not rows:
+        log_and_print(f"No samples in the last {hours:g} hour(s).", level="WARNING")
+        return rows
+    print(Fore.GREEN + f"{'Time':<20} {'N':>5} {'CPU%':>11} {'Mem%':>6} {'Disk%':>6} {'Load':>11} {'RX MiB/s':>15} {'TX MiB/s':>15}" + Style.RESET_ALL)
+    for row in rows:
+        print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(row['timestamp'])):<20} {row['samples']:>5} "
+              f"{row['cpu_pct'][0]:5.1f}/{row['cpu_pct'][1]:5.1f} {row['mem_pct'][0]:6.1f} {row['disk_pct'][0]:6.1f} "
+              f"{row['load1'][0]:5.2f}/{row['load1'][1]:5.2f} {row['rx_mib_s'][0]:7.2f}/{row['rx_mib_s'][1]:7.2f} "
+              f"{row['tx_mib_s'][0]:7.2f}/{row['tx_mib_s'][1]:7.2f}")
+    return rows
+
+def benchmark_metric_ring(days=7):
+    """Fill a scratch ring with `days` of 1-second samples (plus an hour, to wrap) and time queries on it."""
+    path = os.path.join(tempfile.mkdtemp(prefix="metrics_ring_"), METRICS_RING_FILE)
+    capacity = days * 86400
+    ring = MetricRing(path, capacity, writable=True)
+    now = int(time.time())
+    first = now - capacity - 3600
+    start = time.perf_counter()
+    for second in range(capacity + 3600):
+        ring.append(first + second, 20 + second % 60, 45.0, 61.5, 0.5 + (second % 600) / 600, 1.5, 0.25)
+    log_and_print(f"Wrote {capacity + 3600} records in {time.perf_counter() - start:.2f}s, "
+                  f"file size {os.path.getsize(path) / 2 ** 20:.1f} MiB", level="INFO")
+    for label, query in (("1 hour range", lambda: ring.query(now - 3600, now)),
+                         ("1 day at 1 min", lambda: ring.downsample(now - 86400, now, 60)),
+                         (f"{days} days at 1 hour", lambda: ring.downsample(now - capacity, now, 3600))):
+        start = time.perf_counter()
+        query()
+        log_and_print(f"{label:<16} {(time.perf_counter() - start) * 1000:9.2f} ms", level="INFO")
+    ring.close()
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
 
 def os_details():
     """Display OS version, kernel version, and architecture."""
@@ -158,11 +855,55 @@ def battery_status():
 
 if __name__ == "__main__":
     log_and_print("System Info script started.", level="INFO")
-    install_psutil()  # Ensure psutil is installed
-    detect_environment_and_install()
-    cpu_memory_usage()
-    disk_usage()
-    network_info()
-    os_details()
-    battery_status()
+    print(Fore.CYAN + "1. Show system information" + Style.RESET_ALL)
+    print(Fore.CYAN + "2. Benchmark the system collectors" + Style.RESET_ALL)
+    print(Fore.CYAN + "3. Monitor per-interface network rates" + Style.RESET_ALL)
+    print(Fore.CYAN + "4. Benchmark the interface rate monitor" + Style.RESET_ALL)
+    print(Fore.CYAN + "5. Record metrics to the history ring" + Style.RESET_ALL)
+    print(Fore.CYAN + "6. Show recorded metric history" + Style.RESET_ALL)
+    print(Fore.CYAN + "7. Benchmark the history ring" + Style.RESET_ALL)
+    choice = input(Fore.CYAN + "Select an option (1-7): " + Style.RESET_ALL).strip()
+
+    if choice == "2":
+        benchmark_collectors()
+    elif choice == "3":
+        monitor_interfaces()
+    elif choice == "4":
+        benchmark_rate_monitor()
+    elif choice == "5":
+        path = input(Fore.CYAN + f"Ring file [{METRICS_RING_FILE}]: " + Style.RESET_ALL).strip() or METRICS_RING_FILE
+        days = input(Fore.CYAN + f"Days of history for a new ring [{RING_CAPACITY // 86400}]: " + Style.RESET_ALL).strip()
+        try:
+            days = float(days) if days else RING_CAPACITY / 86400
+            if days <= 0:
+                raise ValueError("days of history must be positive")
+            record_metrics(path, capacity=max(1, round(days * 86400)))
+        except (OSError, ValueError) as e:
+            log_and_print(f"Could not record to {path}: {e}", level="ERROR")
+    elif choice == "6":
+        path = input(Fore.CYAN + f"Ring file [{METRICS_RING_FILE}]: " + Style.RESET_ALL).strip() or METRICS_RING_FILE
+        hours = input(Fore.CYAN + "Hours to show [1]: " + Style.RESET_ALL).strip()
+        bucket = input(Fore.CYAN + "Bucket size in seconds [60]: " + Style.RESET_ALL).strip()
+        try:
+            hours, bucket = float(hours) if hours else 1.0, int(bucket) if bucket else 60
+        except ValueError as e:
+            log_and_print(f"Invalid input: {e}", level="ERROR")
+        else:
+            if bucket <= 0:
+                log_and_print("Bucket size must be a positive number of seconds.", level="ERROR")
+            else:
+                try:
+                    show_metric_history(path, hours, bucket)
+                except (OSError, ValueError) as e:
+                    log_and_print(f"Could not read {path}: {e}", level="ERROR")
+    elif choice == "7":
+        benchmark_metric_ring()
+    else:
+        install_psutil()  # Ensure psutil is installed
+        detect_environment_and_install()
+        cpu_memory_usage()
+        disk_usage()
+        network_info()
+        os_details()
+        battery_status()
     log_and_print("System Info script finished.", level="INFO")
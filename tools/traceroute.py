@@ -3,7 +3,42 @@ import subprocess
 import sys
 import platform
 import logging
+import socket
+import struct
+import select
+import time
+import math
+import asyncio
+from collections import deque
 from colorama import Fore, Style
+from ping import expand_targets
+from asn_lookup import format_owner, open_asn_database
+from dns_resolver import get_resolver, resolve_sync, reverse_many_sync
+
+# In-process trace engine (Linux: unprivileged UDP probes + IP_RECVERR)
+DEFAULT_MAX_HOPS = 30
+DEFAULT_PROBES = 3
+DEFAULT_TRACE_TIMEOUT = 2.0
+TRACE_BASE_PORT = 33434
+
+# Continuous (MTR-style) mode: probe interval per hop, stats window, table refresh
+MTR_INTERVAL = 1.0
+MTR_WINDOW = 100
+MTR_REFRESH = 1.0
+MTR_PORTS_PER_HOP = 64
+
+# Multi-destination traces: fully re-probe a cached path prefix every Nth use
+HOP_CACHE_REFRESH = 10
+
+IP_RECVERR = getattr(socket, "IP_RECVERR", 11)
+IPV6_RECVERR = getattr(socket, "IPV6_RECVERR", 25)
+MSG_ERRQUEUE = getattr(socket, "MSG_ERRQUEUE", 0x2000)
+SO_EE_ORIGIN_ICMP = 2
+SO_EE_ORIGIN_ICMP6 = 3
+# (origin, type) pairs meaning "TTL expired in transit"
+TIME_EXCEEDED = {(SO_EE_ORIGIN_ICMP, 11), (SO_EE_ORIGIN_ICMP6, 3)}
+# (origin, type, code) pairs meaning the probe reached the destination's closed port
+PORT_UNREACHABLE = {(SO_EE_ORIGIN_ICMP, 3, 3), (SO_EE_ORIGIN_ICMP6, 1, 4)}
 
 # Set up logging configuration
 LOG_FILE = "data.log"
@@ -103,16 +138,522 @@ def traceroute(host):
     except Exception as e:
         log_and_print(f"An unexpected error occurred: {e}", level="ERROR")
 
+def trace_engine_available():
+    """The in-process engine needs Linux's IP_RECVERR error queue."""
+    return platform.system().lower() == "linux" and hasattr(socket.socket, "recvmsg")
+
+def open_probe_socket(family, ttl):
+    """Open a non-blocking UDP socket that sends with `ttl` and queues ICMP errors."""
+    sock = socket.socket(family, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    if family == socket.AF_INET:
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
+        sock.setsockopt(socket.IPPROTO_IP, IP_RECVERR, 1)
+    else:
+        sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_UNICAST_HOPS, ttl)
+        sock.setsockopt(socket.IPPROTO_IPV6, IPV6_RECVERR, 1)
+    return sock
+
+def read_probe_errors(sock, family):
+    """Drain a socket's error queue; yield (probe port, responder, origin, type, code)."""
+    while True:
+        try:
+            _, ancdata, _, destination = sock.recvmsg(512, 512, MSG_ERRQUEUE)
+        except (BlockingIOError, InterruptedError):
+            return
+        for level, kind, data in ancdata:
+            if (level, kind) not in ((socket.IPPROTO_IP, IP_RECVERR), (socket.IPPROTO_IPV6, IPV6_RECVERR)):
+                continue
+            # struct sock_extended_err, then the offender's sockaddr (SO_EE_OFFENDER)
+            _, origin, icmp_type, icmp_code, _, _, _ = struct.unpack_from("=IBBBBII", data)
+            offender = data[16:]
+            if family == socket.AF_INET:
+                responder = socket.inet_ntop(socket.AF_INET, offender[4:8]) if len(offender) >= 8 else None
+            else:
+                responder = socket.inet_ntop(socket.AF_INET6, offender[8:24]) if len(offender) >= 24 else None
+            yield destination[1], responder, origin, icmp_type, icmp_code
+
+def _new_hop(ttl):
+    """Empty hop record; "reached" marks the hop where the path ends."""
+    return {"ttl": ttl, "address": None, "rtts_ms": [], "reached": False, "error": None}
+
+def trace_parallel(host, max_hops=DEFAULT_MAX_HOPS, probes=DEFAULT_PROBES, timeout=DEFAULT_TRACE_TIMEOUT,
+                   ttls=None):
+    """Trace the path to a host by probing every TTL at once; yield hops as they resolve.
+
+    One UDP socket per TTL sends `probes` datagrams to distinct closed
+    ports, and the kernel reports the ICMP time-exceeded or port-unreachable
+    replies on the socket's error queue, so no root is needed. The whole
+    trace takes about one `timeout`, instead of one round trip per hop.
+    Hops may arrive out of order; every yielded hop carries its "ttl".
+    Pass `ttls` to probe only some hops (default: 1 to `max_hops`).
+    """
+    address, family = resolve_sync(host)
+
+    sockets = {}
+    sent = {}
+    expected = {}
+    hops = {ttl: _new_hop(ttl) for ttl in sorted(ttls or range(1, max_hops + 1))}
+    poller = select.poll()
+    try:
+        for ttl in hops:
+            sock = open_probe_socket(family, ttl)
+            sockets[sock.fileno()] = (sock, ttl)
+            poller.register(sock, select.POLLERR | select.POLLIN)
+            expected[ttl] = 0
+            for probe in range(probes):
+                port = TRACE_BASE_PORT + (ttl - 1) * probes + probe
+                for _ in range(2):
+                    try:
+                        sock.sendto(b"\x00" * 32, (address, port))
+                    except ConnectionRefusedError:
+                        # An earlier probe's ICMP error surfaced on this send; it is
+                        # still in the error queue, so just send again
+                        continue
+                    except OSError as e:
+                        hops[ttl]["error"] = str(e)
+                    else:
+                        sent[port] = time.perf_counter()
+                        expected[ttl] += 1
+                    break
+
+        destination_ttl = None
+        emitted = set()
+        deadline = time.perf_counter() + timeout
+        while True:
+            # Destination hops wait until every lower TTL is settled, so
+            # duplicate "reached" replies from longer TTLs can be dropped
+            for ttl, hop in hops.items():
+                if ttl in emitted or (destination_ttl is not None and ttl > destination_ttl):
+                    continue
+                if len(hop["rtts_ms"]) == expected[ttl] and not hop["reached"]:
+                    emitted.add(ttl)
+                    yield hop
+                elif hop["reached"] and ttl == destination_ttl and len(hop["rtts_ms"]) == expected[ttl] and all(
+                        t in emitted for t in hops if t < ttl):
+                    emitted.add(ttl)
+                    yield hop
+            if destination_ttl is not None and destination_ttl in emitted:
+                return
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            for fd, _ in poller.poll(remaining * 1000):
+                sock, ttl = sockets[fd]
+                for port, responder, origin, icmp_type, icmp_code in read_probe_errors(sock, family):
+                    if port not in sent:
+                        continue
+                    rtt = (time.perf_counter() - sent.pop(port)) * 1000
+                    hop = hops[ttl]
+                    hop["address"] = hop["address"] or responder
+                    hop["rtts_ms"].append(rtt)
+                    if (origin, icmp_type) in TIME_EXCEEDED:
+                        continue
+                    # Port unreachable from the target, or a router refusing to
+                    # forward (e.g. network unreachable): the path ends here
+                    hop["reached"] = True
+                    if (origin, icmp_type, icmp_code) not in PORT_UNREACHABLE:
+                        hop["error"] = f"ICMP type {icmp_type} code {icmp_code}"
+                    if destination_ttl is None or ttl < destination_ttl:
+                        destination_ttl = ttl
+
+        # Deadline passed: flush whatever is left, up to the destination
+        for ttl, hop in hops.items():
+            if ttl not in emitted and (destination_ttl is None or ttl <= destination_ttl):
+                yield hop
+    finally:
+        for sock, _ in sockets.values():
+            sock.close()
+
+def egress_address(address, family):
+    """Local source address the kernel would use to reach `address`."""
+    with socket.socket(family, socket.SOCK_DGRAM) as sock:
+        sock.connect((address, TRACE_BASE_PORT))
+        return sock.getsockname()[0]
+
+def trace_with_cache(host, cache, max_hops=DEFAULT_MAX_HOPS, probes=DEFAULT_PROBES, timeout=DEFAULT_TRACE_TIMEOUT):
+    """Trace a host, reusing path prefixes already learned through the same egress.
+
+    `cache` maps (egress address, first hop) to the hops seen at each TTL,
+    each with the path prefix that led to it, plus the deepest TTL at which
+    two traces have been seen to share a prefix. Once that depth k is known,
+    only TTL 1 and TTLs k and up are probed. If the hop at TTL k was seen
+    before behind the same first hop, hops 2..k-1 are filled in from the
+    cache (marked "cached"); otherwise they are probed after all. The depth
+    comes from the entry for the egress's most recently used first hop, and
+    is only trusted if TTL 1 answers from that same first hop. Every
+    HOP_CACHE_REFRESH uses a cached path is fully re-probed.
+    Returns (hops sorted by TTL, number of probes sent, egress address).
+    """
+    address, family = resolve_sync(host)
+    egress = egress_address(address, family)
+
+    # Predict the first hop from the last trace through this egress
+    predicted = max((key for key in cache if key[0] == egress), key=lambda key: cache[key]["last_used"], default=None)
+    entry = cache[predicted] if predicted else None
+    depth = entry["depth"] if entry else 0
+    skip = depth > 2 and entry["uses"] % HOP_CACHE_REFRESH != 0
+    ttls = [1, *range(depth, max_hops + 1)] if skip else list(range(1, max_hops + 1))
+
+    hops = {hop["ttl"]: hop for hop in trace_parallel(address, max_hops, probes, timeout, ttls)}
+    sent = len(ttls) * probes
+    if skip:
+        first, anchor = hops.get(1, {}).get("address"), hops.get(depth, {}).get("address")
+        prefix = None
+        if (egress, first) == predicted and anchor:
+            prefix, _ = entry["known"].get(depth, {}).get(anchor, (None, None))
+        if prefix:
+            for ttl in range(2, depth):
+                hops[ttl] = {**_new_hop(ttl), "address": prefix[ttl - 1], "cached": True}
+        else:
+            missing = list(range(2, depth))
+            hops.update({hop["ttl"]: hop for hop in trace_parallel(address, max_hops, probes, timeout, missing)})
+            sent += len(missing) * probes
+
+    # Keep hops up to where the path ends, then drop trailing silence
+    path = [hops[ttl] for ttl in sorted(hops)]
+    end = next((index for index, hop in enumerate(path) if hop["reached"]), None)
+    if end is not None:
+        path = path[:end + 1]
+    while path and not path[-1]["address"]:
+        path.pop()
+
+    addresses = [hop["address"] for hop in path]
+    if addresses and addresses[0]:
+        entry = cache.setdefault((egress, addresses[0]), {"known": {}, "depth": 0, "uses": 0, "last_used": 0.0})
+        entry["uses"] += 1
+        entry["last_used"] = time.monotonic()
+        for ttl, hop_address in enumerate(addresses, start=1):
+            if hop_address is None or path[ttl - 1]["reached"]:
+                break
+            seen = entry["known"].setdefault(ttl, {})
+            prefix, via = seen.setdefault(hop_address, (addresses[:ttl], address))
+            if prefix == addresses[:ttl] and via != address and not path[ttl - 1].get("cached"):
+                entry["depth"] = max(entry["depth"], ttl)
+    return path, sent, egress
+
+def add_path_to_topology(topology, source, path):
+    """Add a traced path to an adjacency map of (from, to) -> number of unknown hops between."""
+    previous, gap = source, 0
+    for hop in path:
+        if not hop["address"]:
+            gap += 1
+            continue
+        if hop["address"] != previous:
+            edge = (previous, hop["address"])
+            topology[edge] = min(topology.get(edge, gap), gap)
+        previous, gap = hop["address"], 0
+
+def topology_adjacency(topology):
+    """Adjacency lists (node -> sorted next hops) for a topology map."""
+    adjacency = {}
+    for (start, end) in topology:
+        adjacency.setdefault(start, []).append(end)
+        adjacency.setdefault(end, [])
+    return {node: sorted(nexts) for node, nexts in adjacency.items()}
+
+def _dot_escape(text):
+    """Escape text for use inside a double-quoted DOT string."""
+    return str(text).replace("\\", "\\\\").replace('"', '\\"')
+
+def topology_to_dot(topology, destinations=(), owners=None):
+    """Render a topology map as Graphviz DOT; edges across unanswered hops are dashed."""
+    lines = ["digraph topology {", "    rankdir=LR;"]
+    for destination in sorted(destinations):
+        lines.append(f'    "{_dot_escape(destination)}" [shape=box];')
+    for node, info in sorted((owners or {}).items()):
+        if info:
+            lines.append(f'    "{_dot_escape(node)}" [label="{_dot_escape(node)}\\n{_dot_escape(format_owner(info))}"];')
+    for (start, end), gap in sorted(topology.items()):
+        style = f' [style=dashed, label="{gap} hidden"]' if gap else ""
+        lines.append(f'    "{_dot_escape(start)}" -> "{_dot_escape(end)}"{style};')
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+def trace_many(targets, max_hops=DEFAULT_MAX_HOPS, output_path=None):
+    """Trace many destinations with a shared hop cache and build a merged topology."""
+    targets = list(targets)
+    cache = {}
+    topology = {}
+    destinations = set()
+    sent = full = 0
+    start = time.perf_counter()
+    for target in targets:
+        try:
+            path, probes_sent, source = trace_with_cache(target, cache, max_hops=max_hops)
+        except OSError as e:
+            log_and_print(f"Could not trace {target}: {e}", level="ERROR")
+            continue
+        sent += probes_sent
+        full += max_hops * DEFAULT_PROBES
+        if path and path[-1]["reached"] and not path[-1]["error"]:
+            destinations.add(path[-1]["address"])
+        add_path_to_topology(topology, source, path)
+        cached = sum(1 for hop in path if hop.get("cached"))
+        log_and_print(f"{target}: {len(path)} hop(s), {cached} from cache, {probes_sent} probe(s).", level="INFO")
+
+    # Annotate every router and destination with its origin AS in one pass
+    adjacency = topology_adjacency(topology)
+    database = open_asn_database()
+    owners = {}
+    if database:
+        owners = database.annotate(adjacency)
+        database.close()
+    names = reverse_many_sync(adjacency)
+
+    print(Fore.GREEN + "\nTopology (adjacency lists):" + Style.RESET_ALL)
+    for node, nexts in adjacency.items():
+        if nexts:
+            name = f" ({names[node]})" if names.get(node) else ""
+            owner = f" [{format_owner(owners[node])}]" if owners.get(node) else ""
+            print(f"{node}{name}{owner} -> {', '.join(nexts)}")
+    if output_path:
+        with open(output_path, "w") as dot_file:
+            dot_file.write(topology_to_dot(topology, destinations, owners))
+        log_and_print(f"Topology written to {output_path} (Graphviz DOT).", level="INFO")
+    log_and_print(f"Reached {len(destinations)}/{len(targets)} destination(s) in {time.perf_counter() - start:.2f}s "
+                  f"with {sent} probe(s) (full traces would send up to {full}).", level="INFO")
+
+def print_hop(hop, database=None, name=None):
+    """Print one hop line in traceroute style, with its name and origin AS when known."""
+    rtts = "  ".join(f"{rtt:.3f} ms" for rtt in hop["rtts_ms"]) or "*"
+    address = f"{name} ({hop['address']})" if name else hop["address"] or "*"
+    color = Fore.GREEN if hop["address"] else Fore.YELLOW
+    suffix = f"  !{hop['error']}" if hop["error"] else ""
+    owner = format_owner(database.lookup(hop["address"])) if database and hop["address"] else ""
+    if owner:
+        suffix = f"  [{owner}]{suffix}"
+    print(color + f"{hop['ttl']:>2}  {address:<39} {rtts}{suffix}" + Style.RESET_ALL)
+    logging.info(f"Hop {hop['ttl']}: {address} {rtts}{suffix}")
+
+def fast_traceroute(host, max_hops=DEFAULT_MAX_HOPS):
+    """Trace a host with the in-process parallel engine, streaming hops as they resolve.
+
+    Hop names are looked up in one batch once the trace is done, so name
+    lookups never hold back the hop lines.
+    """
+    log_and_print(f"Starting in-process traceroute to {host} (max {max_hops} hops)...", level="INFO")
+    start = time.perf_counter()
+    database = open_asn_database()
+    try:
+        hops = []
+        for hop in trace_parallel(host, max_hops=max_hops):
+            print_hop(hop, database)
+            hops.append(hop)
+        names = reverse_many_sync(hop["address"] for hop in hops if hop["address"])
+        named = [hop for hop in sorted(hops, key=lambda hop: hop["ttl"]) if names.get(hop["address"])]
+        if named:
+            print(Fore.GREEN + "\nHop names:" + Style.RESET_ALL)
+            for hop in named:
+                print(f"{hop['ttl']:>2}  {names[hop['address']]} ({hop['address']})")
+                logging.info(f"Hop {hop['ttl']} name: {names[hop['address']]} ({hop['address']})")
+        log_and_print(f"Traceroute finished: {len(hops)} hop(s) in {time.perf_counter() - start:.2f}s.", level="INFO")
+    except socket.gaierror as e:
+        log_and_print(f"Could not resolve {host}: {e}", level="ERROR")
+    except OSError as e:
+        log_and_print(f"Traceroute failed: {e}", level="ERROR")
+    finally:
+        if database:
+            database.close()
+
+class HopStats:
+    """Rolling per-hop stats over the last `window` answered or timed-out probes (None marks a loss)."""
+
+    def __init__(self, ttl, window=MTR_WINDOW):
+        self.ttl = ttl
+        self.address = None
+        self.samples = deque(maxlen=window)
+        self.sent = 0
+        self.last = None
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def record(self, rtt_ms):
+        """Add one probe result, evicting the oldest sample from the running sums."""
+        if len(self.samples) == self.samples.maxlen and self.samples[0] is not None:
+            self.total -= self.samples[0]
+            self.total_sq -= self.samples[0] ** 2
+        self.samples.append(rtt_ms)
+        if rtt_ms is not None:
+            self.last = rtt_ms
+            self.total += rtt_ms
+            self.total_sq += rtt_ms ** 2
+
+    def summary(self):
+        """Loss %, last/avg/best/worst and stddev (ms) over the current window."""
+        rtts = [rtt for rtt in self.samples if rtt is not None]
+        received = len(rtts)
+        summary = {"ttl": self.ttl, "address": self.address, "sent": self.sent,
+                   "loss": 100.0 * (1 - received / len(self.samples)) if self.samples else 0.0,
+                   "last": self.last, "avg": None, "best": None, "worst": None, "stddev": None}
+        if received:
+            mean = self.total / received
+            summary.update(avg=mean, best=min(rtts), worst=max(rtts),
+                           stddev=math.sqrt(max(self.total_sq / received - mean * mean, 0.0)))
+        return summary
+
+async def probe_hop(address, family, stats, state, interval=MTR_INTERVAL, timeout=DEFAULT_TRACE_TIMEOUT):
+    """Send one probe to a hop every `interval`; replies and timeouts update `stats`.
+
+    Replies are read from the socket's error queue by a loop reader, and each
+    probe has its own timeout timer, so a slow or silent hop never delays
+    the probes of any other hop.
+    """
+    loop = asyncio.get_running_loop()
+    ttl = stats.ttl
+    sock = open_probe_socket(family, ttl)
+    pending = {}
+
+    def on_errors():
+        for port, responder, origin, icmp_type, _ in read_probe_errors(sock, family):
+            sent_at = pending.pop(port, None)
+            if sent_at is None:
+                continue
+            stats.address = responder or stats.address
+            stats.record((time.perf_counter() - sent_at) * 1000)
+            if (origin, icmp_type) not in TIME_EXCEEDED:
+                state["destination_ttl"] = min(state.get("destination_ttl") or ttl, ttl)
+
+    def expire(port):
+        if pending.pop(port, None) is not None:
+            stats.record(None)
+
+    loop.add_reader(sock.fileno(), on_errors)
+    try:
+        seq = 0
+        while state.get("destination_ttl") is None or ttl <= state["destination_ttl"]:
+            port = TRACE_BASE_PORT + seq % MTR_PORTS_PER_HOP
+            seq += 1
+            # A probe still outstanding on this port is treated as lost
+            expire(port)
+            try:
+                sock.sendto(b"\x00" * 32, (address, port))
+            except ConnectionRefusedError:
+                on_errors()
+                continue
+            except OSError:
+                stats.sent += 1
+                stats.record(None)
+            else:
+                stats.sent += 1
+                pending[port] = time.perf_counter()
+                loop.call_later(timeout, expire, port)
+            await asyncio.sleep(interval)
+    finally:
+        loop.remove_reader(sock.fileno())
+        sock.close()
+
+def format_hop_table(host, rows):
+    """Render the continuous-mode table as a list of lines."""
+    def ms(value):
+        return f"{value:7.1f}" if value is not None else f"{'-':>7}"
+
+    lines = [f"Continuous trace to {host} (Ctrl+C to stop)",
+             f"{'Hop':>3}  {'Host':<39} {'Loss%':>6} {'Snt':>5} {'Last':>7} {'Avg':>7} {'Best':>7} {'Wrst':>7} {'StDev':>7}"]
+    for row in rows:
+        lines.append(f"{row['ttl']:>3}. {row.get('name') or row['address'] or '???':<39.39} {row['loss']:>5.1f}% {row['sent']:>5} "
+                     f"{ms(row['last'])} {ms(row['avg'])} {ms(row['best'])} {ms(row['worst'])} {ms(row['stddev'])}")
+    return lines
+
+async def _reverse_into(resolver, address, names):
+    names[address] = await resolver.reverse(address)
+
+def _visible_hops(hops, state):
+    """Summaries up to the destination, or one past the last hop that answered."""
+    last = state["destination_ttl"] or max((stats.ttl for stats in hops if stats.address), default=0) + 1
+    return [{**stats.summary(), "name": state["names"].get(stats.address)} for stats in hops[:last]]
+
+async def continuous_trace(host, max_hops=DEFAULT_MAX_HOPS, interval=MTR_INTERVAL, duration=None,
+                           refresh=MTR_REFRESH, window=MTR_WINDOW, state=None):
+    """Probe every hop concurrently and redraw the stats table in place until stopped.
+
+    Pass a `state` dict to keep the per-hop stats ("hops") reachable after
+    the trace is interrupted.
+    """
+    resolver = get_resolver()
+    address, family = await resolver.resolve(host)
+    hops = [HopStats(ttl, window) for ttl in range(1, max_hops + 1)]
+    state = state if state is not None else {}
+    state.update(destination_ttl=None, names={}, hops=hops)
+    tasks = [asyncio.create_task(probe_hop(address, family, stats, state, interval)) for stats in hops]
+
+    drawn = 0
+    start = time.perf_counter()
+    try:
+        while duration is None or time.perf_counter() - start < duration:
+            await asyncio.sleep(refresh)
+            # Reverse-resolve newly seen hops in the background; names show up once known
+            for stats in hops:
+                if stats.address and stats.address not in state["names"]:
+                    state["names"][stats.address] = None
+                    tasks.append(asyncio.create_task(_reverse_into(resolver, stats.address, state["names"])))
+            lines = format_hop_table(host, _visible_hops(hops, state))
+            # Move back over the previous table and clear it before redrawing
+            if drawn:
+                sys.stdout.write(f"\x1b[{drawn}F\x1b[J")
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+            drawn = len(lines)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return _visible_hops(hops, state)
+
+def run_continuous_trace(host, duration=None):
+    """Run the continuous trace and log the final per-hop statistics, also when stopped with Ctrl+C."""
+    log_and_print(f"Starting continuous trace to {host}...", level="INFO")
+    state = {}
+    try:
+        asyncio.run(continuous_trace(host, duration=duration, state=state))
+    except KeyboardInterrupt:
+        log_and_print("Continuous trace stopped.", level="INFO")
+    except socket.gaierror as e:
+        log_and_print(f"Could not resolve {host}: {e}", level="ERROR")
+    except OSError as e:
+        log_and_print(f"Continuous trace failed: {e}", level="ERROR")
+    if state.get("hops"):
+        for line in format_hop_table(host, _visible_hops(state["hops"], state))[2:]:
+            logging.info(line)
+
 if __name__ == "__main__":
     log_and_print("Traceroute Utility started.", level="INFO")
-    detect_environment_and_install()
-    
-    # Get user input for the host
-    target_host = input(Fore.CYAN + "Enter the host to trace (e.g., google.com): " + Style.RESET_ALL).strip()
-    
-    if not target_host:
-        log_and_print("No host provided. Exiting.", level="ERROR")
+
+    choice = "1"
+    if trace_engine_available():
+        print(Fore.CYAN + "1. Trace with the system traceroute" + Style.RESET_ALL)
+        print(Fore.CYAN + "2. Fast in-process trace (all hops probed at once, no root needed)" + Style.RESET_ALL)
+        print(Fore.CYAN + "3. Trace many destinations and build a topology map" + Style.RESET_ALL)
+        print(Fore.CYAN + "4. Continuous trace with per-hop loss and latency (MTR-style)" + Style.RESET_ALL)
+        choice = input(Fore.CYAN + "Select an option (1-4): " + Style.RESET_ALL).strip()
+
+    if choice == "3":
+        specs = input(Fore.CYAN + "Enter hosts, CIDRs or @files separated by commas: " + Style.RESET_ALL).split(",")
+        output_path = input(Fore.CYAN + "Save topology as DOT to (blank to skip): " + Style.RESET_ALL).strip() or None
+        try:
+            targets = list(expand_targets(specs))
+        except (OSError, ValueError) as e:
+            targets = []
+            log_and_print(f"Invalid targets: {e}", level="ERROR")
+        if targets:
+            trace_many(targets, output_path=output_path)
+        else:
+            log_and_print("No hosts provided. Exiting.", level="ERROR")
     else:
-        traceroute(target_host)
+        if choice not in ("2", "4"):
+            detect_environment_and_install()
+
+        # Get user input for the host
+        target_host = input(Fore.CYAN + "Enter the host to trace (e.g., google.com): " + Style.RESET_ALL).strip()
+
+        if not target_host:
+            log_and_print("No host provided. Exiting.", level="ERROR")
+        elif choice == "2":
+            fast_traceroute(target_host)
+        elif choice == "4":
+            run_continuous_trace(target_host)
+        else:
+            traceroute(target_host)
 
-    log_and_print("Traceroute Utility finished.", level="INFO")
+    log_and_print("Traceroute Utility finished.", level="INFO")
\ No newline at end of file
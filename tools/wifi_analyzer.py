@@ -3,10 +3,39 @@ import sys
 import os
 import platform
 import logging
+import json
+import math
+import random
+import re
+import time
+from collections import deque
 import distro
 from shutil import which
 from colorama import Fore, Style
 
+try:
+    import numpy
+except ImportError:
+    numpy = None  # channel analytics fall back to plain Python
+
+# Record fields every backend parser fills in (None when the backend doesn't report it)
+RECORD_FIELDS = ("ssid", "bssid", "channel", "frequency_mhz", "signal_dbm", "security", "last_seen")
+# Fixture benchmark: BSSIDs per generated scan, and the recorded scans it also scales up to that size
+BENCHMARK_BSSIDS = 500
+RECORDED_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests", "fixtures", "wifi")
+# Survey mode: seconds between scans, EWMA weight of the newest RSSI sample,
+# samples kept per BSSID, missed scans before a BSSID counts as gone, and
+# missed scans before it is forgotten altogether
+SURVEY_INTERVAL = 5.0
+SURVEY_ALPHA = 0.3
+SURVEY_HISTORY = 120
+SURVEY_MISSES = 3
+SURVEY_FORGET = 60
+# Consecutive failed scans (adapter busy, tool missing) before the survey gives up
+SURVEY_MAX_FAILURES = 5
+# Channels the survey always rates, even when no AP uses them
+CANDIDATE_CHANNELS = (1, 6, 11, 36, 40, 44, 48, 149, 153, 157, 161, 165)
+
 # Set up logging configuration
 LOG_FILE = "data.log"
 logging.basicConfig(
@@ -79,20 +108,573 @@ def detect_environment_and_install():
         log_and_print(f"Failed to install Wi-Fi tools: {e}", level="ERROR")
         sys.exit(1)
 
+def new_bssid_record(**fields):
+    """A per-BSSID scan record with every field present."""
+    record = dict.fromkeys(RECORD_FIELDS)
+    record.update(fields)
+    return record
+
+def channel_to_frequency(channel, band=None):
+    """Centre frequency in MHz for a channel number (6 GHz only when `band` says so)."""
+    if channel is None:
+        return None
+    if band == 6:
+        return 5950 + channel * 5
+    if channel == 14:
+        return 2484
+    return 2407 + channel * 5 if channel < 14 else 5000 + channel * 5
+
+def frequency_to_channel(frequency_mhz):
+    """Channel number for a centre frequency in MHz."""
+    if frequency_mhz is None:
+        return None
+    if frequency_mhz == 2484:
+        return 14
+    if frequency_mhz < 2500:
+        return (frequency_mhz - 2407) // 5
+    if frequency_mhz < 5950:
+        return (frequency_mhz - 5000) // 5
+    return (frequency_mhz - 5950) // 5
+
+def percent_to_dbm(percent):
+    """Map a 0-100% signal quality (as netsh reports it) onto dBm, the way Windows does."""
+    return percent / 2 - 100
+
+def _number(text, kind=int):
+    """`kind(text)`, or None for a malformed field so one bad line doesn't discard the scan."""
+    try:
+        return kind(text)
+    except (TypeError, ValueError):
+        return None
+
+def _iwlist_security(record, ies):
+    if record.pop("_encrypted", None) is False:
+        return "open"
+    if any("SAE" in ie for ie in ies):
+        return "WPA3"
+    kinds = [kind for kind, marker in (("WPA", "WPA Version"), ("WPA2", "WPA2")) if any(marker in ie for ie in ies)]
+    return "/".join(kinds) or "WEP"
+
+def parse_iwlist(lines, now=None):
+    """Stream records out of `iwlist scanning` output, one per "Cell NN - Address:" block."""
+    now = time.time() if now is None else now
+    record, ies = None, []
+    for line in lines:
+        line = line.strip()
+        if line.startswith("Cell "):
+            if record is not None:
+                record["security"] = _iwlist_security(record, ies)
+                yield record
+            record, ies = new_bssid_record(bssid=line.rsplit("Address:", 1)[-1].strip().lower(), last_seen=now), []
+        elif record is None:
+            continue
+        elif line.startswith("ESSID:"):
+            record["ssid"] = line[6:].strip().strip('"')
+        elif line.startswith("Channel:"):
+            record["channel"] = _number(line[8:])
+        elif line.startswith("Frequency:"):
+            match = re.match(r"Frequency:([\d.]+) GHz(?: \(Channel (\d+)\))?", line)
+            if match:
+                frequency = _number(match.group(1), float)
+                record["frequency_mhz"] = round(frequency * 1000) if frequency is not None else None
+                record["channel"] = _number(match.group(2)) if match.group(2) else frequency_to_channel(record["frequency_mhz"])
+        elif "Signal level=" in line:
+            value = (line.split("Signal level=", 1)[1].split() or [""])[0]
+            if "/" in value:
+                numerator, _, denominator = value.partition("/")
+                numerator, denominator = _number(numerator), _number(denominator)
+                if numerator is not None and denominator:
+                    record["signal_dbm"] = percent_to_dbm(100 * numerator / denominator)
+            else:
+                record["signal_dbm"] = _number(value, float)
+        elif line.startswith("Encryption key:"):
+            record["_encrypted"] = line.endswith("on")
+        elif line.startswith("IE:") or line.startswith("Authentication Suites"):
+            ies.append(line)
+        elif line.startswith("Extra: Last beacon:"):
+            match = re.search(r"(\d+)ms ago", line)
+            if match:
+                record["last_seen"] = now - int(match.group(1)) / 1000
+    if record is not None:
+        record["security"] = _iwlist_security(record, ies)
+        yield record
+
+def parse_netsh(lines, now=None):
+    """Stream records out of `netsh wlan show networks mode=bssid` (English output).
+
+    SSID-level fields (name, authentication) are carried into each of the
+    BSSID blocks listed under that SSID.
+    """
+    now = time.time() if now is None else now
+    ssid, security, record, band = None, None, None, None
+    for line in lines:
+        key, _, value = line.partition(":")
+        key, value = key.strip(), value.strip()
+        if key.startswith("SSID "):
+            if record is not None:
+                yield record
+                record = None
+            ssid, security = value, None
+        elif key == "Authentication":
+            security = "open" if value == "Open" else value.replace("-Personal", "").replace("-Enterprise", " Enterprise")
+        elif key.startswith("BSSID "):
+            if record is not None:
+                yield record
+            record, band = new_bssid_record(ssid=ssid, bssid=value.lower(), security=security, last_seen=now), None
+        elif record is None:
+            continue
+        elif key == "Signal":
+            percent = _number(value.rstrip("%"))
+            record["signal_dbm"] = percent_to_dbm(percent) if percent is not None else None
+        elif key == "Band":
+            band = 6 if value.startswith("6") else None
+        elif key == "Channel":
+            record["channel"] = _number(value)
+            record["frequency_mhz"] = channel_to_frequency(record["channel"], band)
+    if record is not None:
+        yield record
+
+def parse_termux(lines, now=None):
+    """Stream records out of `termux-wifi-scaninfo` JSON, decoding one array element at a time."""
+    now = time.time() if now is None else now
+    decoder = json.JSONDecoder()
+    buffer = ""
+    for line in lines:
+        buffer += line
+        if "}" not in line:
+            continue  # no element can have closed on this line
+        while True:
+            buffer = buffer.lstrip(" \t\r\n[,]")
+            if not buffer:
+                break
+            try:
+                entry, end = decoder.raw_decode(buffer)
+            except ValueError:
+                break  # element not complete yet
+            buffer = buffer[end:]
+            if not isinstance(entry, dict):
+                continue
+            frequency = entry.get("frequency_mhz")
+            frequency = frequency if isinstance(frequency, int) else None
+            rssi = entry.get("rssi")
+            rssi = rssi if isinstance(rssi, (int, float)) else None
+            capabilities = entry.get("capabilities", "")
+            security = None
+            if capabilities:
+                security = ("WPA3" if "SAE" in capabilities else "WPA2" if "RSN" in capabilities or "WPA2" in capabilities
+                            else "WPA" if "WPA" in capabilities else "WEP" if "WEP" in capabilities else "open")
+            yield new_bssid_record(ssid=entry.get("ssid"), bssid=(entry.get("bssid") or "").lower() or None,
+                                   channel=frequency_to_channel(frequency), frequency_mhz=frequency,
+                                   signal_dbm=rssi, security=security, last_seen=now)
+
+PARSERS = {"iwlist": parse_iwlist, "netsh": parse_netsh, "termux": parse_termux}
+
+def detect_backend(text):
+    """Guess which tool produced a saved scan from its first lines."""
+    head = text.lstrip()[:2000]
+    if head.startswith("[") or head.startswith("{"):
+        return "termux"
+    if "Cell " in head and "Address:" in head:
+        return "iwlist"
+    return "netsh"
+
+def parse_scan_file(path, backend=None):
+    """Parse a recorded scan output file (no Wi-Fi hardware needed)."""
+    with open(path, encoding="utf-8", errors="replace") as scan_file:
+        backend = backend or detect_backend(scan_file.read(2000))
+        scan_file.seek(0)
+        return list(PARSERS[backend](scan_file))
+
+def scan_command():
+    """The scan command and parser name for this platform."""
+    system = platform.system().lower()
+    if system == "windows":
+        return ["netsh", "wlan", "show", "networks", "mode=bssid"], "netsh"
+    if "com.termux" in os.environ.get("PREFIX", ""):
+        return ["termux-wifi-scaninfo"], "termux"
+    return ["iwlist", "scanning"], "iwlist"
+
+def _tee_lines(lines, handle):
+    for line in lines:
+        handle.write(line)
+        yield line
+
+def stream_scan(command, backend, record_path=None):
+    """Run a scan command and yield records as its output streams in.
+
+    With `record_path` the raw output is saved too, so the scan can be
+    replayed later as a fixture.
+    """
+    with subprocess.Popen(command, stdout=subprocess.PIPE, text=True, errors="replace") as process:
+        if record_path:
+            with open(record_path, "w", encoding="utf-8") as handle:
+                yield from PARSERS[backend](_tee_lines(process.stdout, handle))
+        else:
+            yield from PARSERS[backend](process.stdout)
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, command)
+
+def print_scan_records(records):
+    """Print records as a table, strongest signal first."""
+    records = sorted(records, key=lambda record: record["signal_dbm"] if record["signal_dbm"] is not None else -999, reverse=True)
+    print(Fore.GREEN + f"{'SSID':<32} {'BSSID':<17} {'Ch':>3} {'MHz':>5} {'dBm':>6}  Security" + Style.RESET_ALL)
+    for record in records:
+        signal = f"{record['signal_dbm']:6.1f}" if record["signal_dbm"] is not None else f"{'-':>6}"
+        print(f"{(record['ssid'] or '<hidden>')[:32]:<32} {record['bssid'] or '-':<17} {record['channel'] or '-':>3} "
+              f"{record['frequency_mhz'] or '-':>5} {signal}  {record['security'] or '-'}")
+    return records
+
+def _random_networks(rng, count):
+    channels = [1, 6, 11, 36, 40, 44, 48, 149, 153, 157, 161]
+    networks = []
+    for index in range(count):
+        channel = rng.choice(channels)
+        networks.append({"ssid": f"Office-{index // 4:03d}", "bssid": ":".join(f"{rng.randrange(256):02x}" for _ in range(6)),
+                         "channel": channel, "frequency_mhz": channel_to_frequency(channel),
+                         "signal_dbm": rng.randint(-92, -30), "security": rng.choice(["WPA2", "WPA3", "open"])})
+    return networks
+
+def generate_fixture(backend, count, seed=0):
+    """Synthetic scan output in a backend's format, for tests and benchmarks without hardware."""
+    return format_fixture(backend, _random_networks(random.Random(seed), count))
+
+def generate_survey_fixture(backend, scans, count, seed=0):
+    """A list of synthetic scans in which signals drift and some APs come and go."""
+    rng = random.Random(seed)
+    networks = _random_networks(rng, count)
+    # A tenth of the APs leave halfway through and another tenth arrive
+    leaving = set(rng.sample(range(count), count // 10))
+    arriving = set(rng.sample(sorted(set(range(count)) - leaving), count // 10))
+    outputs = []
+    for scan in range(scans):
+        visible = []
+        for index, network in enumerate(networks):
+            network["signal_dbm"] = max(-95, min(-25, network["signal_dbm"] + rng.randint(-3, 3)))
+            if (index in leaving and scan >= scans // 2) or (index in arriving and scan < scans // 2):
+                continue
+            if rng.random() < 0.05:
+                continue  # an occasional missed beacon
+            visible.append(network)
+        outputs.append(format_fixture(backend, visible))
+    return outputs
+
+def format_fixture(backend, networks):
+    """Render network dicts as `backend` scan output."""
+    if backend == "termux":
+        capabilities = {"WPA2": "[WPA2-PSK-CCMP][ESS]", "WPA3": "[RSN-SAE-CCMP][ESS]", "open": "[ESS]"}
+        return json.dumps([{"bssid": n["bssid"], "frequency_mhz": n["frequency_mhz"], "rssi": n["signal_dbm"],
+                            "ssid": n["ssid"], "timestamp": 123456789, "channel_bandwidth_mhz": "20",
+                            "capabilities": capabilities[n["security"]]} for n in networks], indent=2)
+    lines = []
+    if backend == "iwlist":
+        lines.append("wlan0     Scan completed :")
+        for index, n in enumerate(networks, start=1):
+            lines += [f"          Cell {index:02d} - Address: {n['bssid'].upper()}",
+                      f"                    Channel:{n['channel']}",
+                      f"                    Frequency:{n['frequency_mhz'] / 1000:.3f} GHz (Channel {n['channel']})",
+                      f"                    Quality=50/70  Signal level={n['signal_dbm']} dBm",
+                      f"                    Encryption key:{'off' if n['security'] == 'open' else 'on'}",
+                      f"                    ESSID:\"{n['ssid']}\""]
+            if n["security"] != "open":
+                lines += ["                    IE: IEEE 802.11i/WPA2 Version 1",
+                          f"                        Authentication Suites (1) : {'SAE' if n['security'] == 'WPA3' else 'PSK'}"]
+            lines.append("                    Extra: Last beacon: 120ms ago")
+        return "\n".join(lines) + "\n"
+    by_ssid = {}
+    for n in networks:
+        by_ssid.setdefault(n["ssid"], []).append(n)
+    lines.append(f"There are {len(by_ssid)} networks currently visible.")
+    for index, (ssid, group) in enumerate(by_ssid.items(), start=1):
+        security = group[0]["security"]
+        lines += ["", f"SSID {index} : {ssid}", "    Network type            : Infrastructure",
+                  f"    Authentication          : {'Open' if security == 'open' else security + '-Personal'}",
+                  f"    Encryption              : {'None' if security == 'open' else 'CCMP'}"]
+        for number, n in enumerate(group, start=1):
+            lines += [f"    BSSID {number}                 : {n['bssid']}",
+                      f"         Signal             : {int((n['signal_dbm'] + 100) * 2)}%",
+                      "         Radio type         : 802.11ac",
+                      f"         Channel            : {n['channel']}"]
+    return "\n".join(lines) + "\n"
+
+def scale_recorded_fixture(backend, count, directory=RECORDED_FIXTURES):
+    """A recorded scan of `backend` repeated until it lists at least `count` BSSIDs (None if not recorded)."""
+    path = os.path.join(directory, f"{backend}.json" if backend == "termux" else f"{backend}.txt")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as fixture:
+        text = fixture.read()
+    if backend == "termux":
+        entries = json.loads(text)
+        return json.dumps([entries[index % len(entries)] for index in range(count)], indent=2)
+    starts = "Cell " if backend == "iwlist" else "SSID "
+    header, blocks = [], []
+    for line in text.splitlines(keepends=True):
+        if line.strip().startswith(starts):
+            blocks.append([line])
+        elif blocks:
+            blocks[-1].append(line)
+        else:
+            header.append(line)
+    sizes = [1 if backend == "iwlist" else sum(line.strip().startswith("BSSID ") for line in block) for block in blocks]
+    lines, total, index = list(header), 0, 0
+    while total < count and blocks:
+        lines += blocks[index % len(blocks)]
+        total += sizes[index % len(blocks)]
+        index += 1
+    return "".join(lines)
+
+def benchmark_parsers(count=BENCHMARK_BSSIDS, rounds=20):
+    """Time each parser on a generated scan and on a recorded scan scaled to `count` BSSIDs."""
+    print(Fore.GREEN + f"Parsing {count}-BSSID fixtures ({rounds} rounds each):" + Style.RESET_ALL)
+    for backend, parser in PARSERS.items():
+        for source, text in (("generated", generate_fixture(backend, count)),
+                             ("recorded", scale_recorded_fixture(backend, count))):
+            if text is None:
+                continue
+            lines = text.splitlines(keepends=True)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                records = list(parser(lines))
+            elapsed = (time.perf_counter() - start) / rounds
+            log_and_print(f"{backend:<7} {source:<9} {len(records)} record(s) in {elapsed * 1000:.2f} ms "
+                          f"({len(records) / elapsed:,.0f} records/s, {sum(map(len, lines)) / 1024:.0f} KiB)", level="INFO")
+
+class WifiSurvey:
+    """Tracks every BSSID across repeated scans.
+
+    Each BSSID keeps its latest record, an EWMA of its RSSI and a bounded
+    ring of (timestamp, dBm) samples. update() returns the appear/disappear
+    events caused by a scan.
+    """
+
+    def __init__(self, alpha=SURVEY_ALPHA, history=SURVEY_HISTORY, misses=SURVEY_MISSES, forget=SURVEY_FORGET):
+        self.alpha = alpha
+        self.history = history
+        self.misses = misses
+        self.forget = forget
+        self.bssids = {}
+        self.scans = 0
+
+    def update(self, records, now=None):
+        now = time.time() if now is None else now
+        self.scans += 1
+        events = []
+        seen = set()
+        for record in records:
+            bssid = record["bssid"]
+            if not bssid or bssid in seen:
+                continue
+            seen.add(bssid)
+            entry = self.bssids.get(bssid)
+            if entry is None:
+                entry = self.bssids[bssid] = {"record": record, "ewma": record["signal_dbm"],
+                                              "samples": deque(maxlen=self.history), "first_seen": now,
+                                              "missed": 0, "present": False}
+            signal = record["signal_dbm"]
+            if signal is not None:
+                entry["ewma"] = signal if entry["ewma"] is None else entry["ewma"] + self.alpha * (signal - entry["ewma"])
+                entry["samples"].append((now, signal))
+            entry["record"] = record
+            entry["last_seen"] = now
+            entry["missed"] = 0
+            if not entry["present"]:
+                entry["present"] = True
+                events.append(("appeared", entry))
+        for bssid in list(self.bssids):
+            if bssid in seen:
+                continue
+            entry = self.bssids[bssid]
+            entry["missed"] += 1
+            if entry["present"] and entry["missed"] >= self.misses:
+                entry["present"] = False
+                events.append(("disappeared", entry))
+            elif entry["missed"] >= self.forget:
+                del self.bssids[bssid]
+        return events
+
+    def present(self):
+        return [entry for entry in self.bssids.values() if entry["present"]]
+
+def frequency_band(frequency_mhz):
+    """Band label for a centre frequency."""
+    return "2.4 GHz" if frequency_mhz < 3000 else "5 GHz" if frequency_mhz < 5950 else "6 GHz"
+
+def _overlap(frequency_a, frequency_b):
+    """Spectral overlap of two 20 MHz channels, 1.0 for co-channel and 0.0 for none.
+
+    2.4 GHz channels use the 22 MHz DSSS mask, so 1, 6 and 11 stay clear of
+    each other while neighbouring channels overlap heavily.
+    """
+    width = 22 if frequency_a < 3000 else 20
+    return max(0.0, 1 - abs(frequency_a - frequency_b) / width)
+
+def _mean_power_mw(entries):
+    """Mean linear power of each BSSID's sample ring, in milliwatts."""
+    if numpy is not None:
+        samples = numpy.full((len(entries), max((len(e["samples"]) for e in entries), default=1)), numpy.nan)
+        for row, entry in enumerate(entries):
+            samples[row, :len(entry["samples"])] = [signal for _, signal in entry["samples"]]
+        return numpy.nanmean(10 ** (samples / 10), axis=1)
+    return [sum(10 ** (signal / 10) for _, signal in entry["samples"]) / len(entry["samples"]) for entry in entries]
+
+def channel_congestion(entries):
+    """Rate every candidate channel by the AP power that overlaps it.
+
+    Returns (channels, bands): one dict per channel with co-channel and
+    overlapping AP counts and the overlap-weighted interference in dBm, and
+    one overlap score per band, the mean pairwise overlap between its APs
+    (0 when every AP sits on a clean channel, 1 when they all share one).
+    """
+    entries = [entry for entry in entries if entry["record"]["frequency_mhz"] and entry["samples"]]
+    ap_frequencies = [entry["record"]["frequency_mhz"] for entry in entries]
+    frequencies = sorted(set(ap_frequencies) | {channel_to_frequency(channel) for channel in CANDIDATE_CHANNELS})
+    power = _mean_power_mw(entries)
+    if numpy is not None:
+        candidate = numpy.array(frequencies, dtype=float)[:, None]
+        aps = numpy.array(ap_frequencies, dtype=float)[None, :]
+        width = numpy.where(candidate < 3000, 22.0, 20.0)
+        weights = numpy.clip(1 - numpy.abs(candidate - aps) / width, 0, None)
+        interference = (weights @ power).tolist() if entries else [0.0] * len(frequencies)
+        co_channel = (weights == 1).sum(axis=1).tolist()
+        overlapping = ((weights > 0) & (weights < 1)).sum(axis=1).tolist()
+    else:
+        weights = [[_overlap(frequency, ap) for ap in ap_frequencies] for frequency in frequencies]
+        interference = [sum(w * p for w, p in zip(row, power)) for row in weights]
+        co_channel = [sum(1 for w in row if w == 1) for row in weights]
+        overlapping = [sum(1 for w in row if 0 < w < 1) for row in weights]
+    channels = []
+    for index, frequency in enumerate(frequencies):
+        channels.append({"channel": frequency_to_channel(frequency), "frequency_mhz": frequency,
+                         "band": frequency_band(frequency),
+                         "co_channel": int(co_channel[index]), "overlapping": int(overlapping[index]),
+                         "interference_dbm": 10 * math.log10(interference[index]) if interference[index] > 0 else None})
+    bands = {}
+    for band in ("2.4 GHz", "5 GHz", "6 GHz"):
+        members = [frequency for frequency in ap_frequencies if frequency_band(frequency) == band]
+        if len(members) < 2:
+            continue
+        if numpy is not None:
+            column = numpy.array(members, dtype=float)
+            matrix = numpy.clip(1 - numpy.abs(column[:, None] - column[None, :]) / (22.0 if band == "2.4 GHz" else 20.0), 0, None)
+            total = float(matrix.sum())
+        else:
+            total = sum(_overlap(a, b) for a in members for b in members)
+        bands[band] = (total - len(members)) / (len(members) * (len(members) - 1))
+    return channels, bands
+
+def print_survey(survey, limit=20):
+    """Print the strongest tracked BSSIDs and the channel ratings."""
+    entries = sorted(survey.present(), key=lambda entry: entry["ewma"] if entry["ewma"] is not None else -999, reverse=True)
+    print(Fore.GREEN + f"{'SSID':<24} {'BSSID':<17} {'Ch':>3} {'EWMA':>6} {'Last':>6} {'Samples':>7}" + Style.RESET_ALL)
+    for entry in entries[:limit]:
+        record = entry["record"]
+        last = entry["samples"][-1][1] if entry["samples"] else None
+        print(f"{(record['ssid'] or '<hidden>')[:24]:<24} {record['bssid']:<17} {record['channel'] or '-':>3} "
+              f"{entry['ewma'] if entry['ewma'] is not None else float('nan'):6.1f} "
+              f"{last if last is not None else float('nan'):6.1f} {len(entry['samples']):>7}")
+    if len(entries) > limit:
+        print(f"... and {len(entries) - limit} more")
+    channels, bands = channel_congestion(survey.present())
+    print(Fore.GREEN + f"{'Band':<8} {'Ch':>3} {'Co-ch':>5} {'Overlap':>7} {'Interference':>12}" + Style.RESET_ALL)
+    for channel in channels:
+        interference = f"{channel['interference_dbm']:.1f} dBm" if channel["interference_dbm"] is not None else "clear"
+        print(f"{channel['band']:<8} {channel['channel']:>3} {channel['co_channel']:>5} {channel['overlapping']:>7} {interference:>12}")
+    for band, score in bands.items():
+        candidates = [c for c in channels if c["band"] == band and c["channel"] in CANDIDATE_CHANNELS]
+        best = min(candidates, key=lambda c: c["interference_dbm"] if c["interference_dbm"] is not None else -999, default=None)
+        advice = f", least congested channel {best['channel']}" if best else ""
+        log_and_print(f"{band} overlap score {score:.2f}{advice}", level="INFO")
+
+def _print_events(events):
+    for kind, entry in events:
+        record = entry["record"]
+        color = Fore.GREEN if kind == "appeared" else Fore.YELLOW
+        print(color + f"{kind:<11} {record['ssid'] or '<hidden>'} ({record['bssid']}) on channel {record['channel']}" + Style.RESET_ALL)
+        logging.info(f"{kind} {record['ssid']} {record['bssid']} channel {record['channel']}")
+
+def replay_survey(scans, backend=None, interval=SURVEY_INTERVAL, survey=None, quiet=False):
+    """Feed recorded scan outputs (texts, in order) through a survey as if taken `interval` apart."""
+    survey = survey or WifiSurvey()
+    start = time.time()
+    for index, text in enumerate(scans):
+        now = start + index * interval
+        events = survey.update(PARSERS[backend or detect_backend(text)](text.splitlines(keepends=True), now=now), now)
+        if not quiet:
+            _print_events(events)
+    return survey
+
+def replay_survey_directory(directory):
+    """Replay every scan file in a directory, in file name order."""
+    names = sorted(name for name in os.listdir(directory) if os.path.isfile(os.path.join(directory, name)))
+    if not names:
+        raise ValueError("no scan files found")
+    texts = []
+    for name in names:
+        with open(os.path.join(directory, name), encoding="utf-8", errors="replace") as scan_file:
+            texts.append(scan_file.read())
+    survey = replay_survey(texts)
+    log_and_print(f"Replayed {len(texts)} scan(s) from {directory}.", level="INFO")
+    print_survey(survey)
+    return survey
+
+def run_survey(interval=SURVEY_INTERVAL, duration=None, record_dir=None):
+    """Re-scan every `interval` seconds until `duration` runs out or Ctrl+C."""
+    command, backend = scan_command()
+    survey = WifiSurvey()
+    if record_dir:
+        os.makedirs(record_dir, exist_ok=True)
+    log_and_print(f"Surveying with {' '.join(command)} every {interval:g}s (Ctrl+C to stop)...", level="INFO")
+    started, failures = time.time(), 0
+    try:
+        while duration is None or time.time() - started < duration:
+            scan_started = time.time()
+            path = os.path.join(record_dir, f"scan-{survey.scans + 1:05d}.txt") if record_dir else None
+            try:
+                # Collect the whole scan first so a failure part-way through doesn't count as misses
+                records = list(stream_scan(command, backend, path))
+            except (subprocess.CalledProcessError, OSError, ValueError) as e:
+                failures += 1
+                log_and_print(f"Wi-Fi scan failed ({failures}/{SURVEY_MAX_FAILURES}): {e}", level="WARNING")
+                if failures >= SURVEY_MAX_FAILURES:
+                    log_and_print("Too many consecutive scan failures, stopping the survey.", level="ERROR")
+                    break
+            else:
+                failures = 0
+                _print_events(survey.update(records, scan_started))
+                print_survey(survey)
+            time.sleep(max(0.0, interval - (time.time() - scan_started)))
+    except KeyboardInterrupt:
+        print()
+    log_and_print(f"Survey finished after {survey.scans} scan(s), {len(survey.bssids)} BSSID(s) tracked.", level="INFO")
+    return survey
+
+def benchmark_survey(scans=60, count=BENCHMARK_BSSIDS):
+    """Time fixture replay and the channel analytics on a generated survey."""
+    outputs = generate_survey_fixture("iwlist", scans, count)
+    start = time.perf_counter()
+    survey = replay_survey(outputs, "iwlist", quiet=True)
+    elapsed = time.perf_counter() - start
+    log_and_print(f"Replayed {scans} scans of ~{count} BSSIDs in {elapsed:.3f}s ({elapsed / scans * 1000:.2f} ms/scan), "
+                  f"{len(survey.present())} present, {len(survey.bssids)} tracked", level="INFO")
+    start = time.perf_counter()
+    channels, bands = channel_congestion(survey.present())
+    elapsed = time.perf_counter() - start
+    log_and_print(f"Channel analytics over {sum(len(e['samples']) for e in survey.present())} samples "
+                  f"in {elapsed * 1000:.2f} ms ({'numpy' if numpy is not None else 'pure Python'})", level="INFO")
+
 def wifi_scan_windows():
     """Scan for Wi-Fi networks on Windows."""
     try:
         command = ["netsh", "wlan", "show", "networks", "mode=bssid"]
         log_and_print(f"Running command: {' '.join(command)}", level="INFO")
-        result = subprocess.run(command, check=True, capture_output=True, text=True)
-        output = result.stdout.strip()
+        records = list(stream_scan(command, "netsh"))
 
-        if not output:
+        if not records:
             log_and_print("No Wi-Fi networks found. Ensure Wi-Fi is enabled.", level="WARNING")
         else:
-            log_and_print("Wi-Fi networks found:", level="INFO")
-            print(Fore.GREEN + output + Style.RESET_ALL)
-            log_and_print(output, level="INFO")
+            log_and_print(f"{len(records)} BSSID(s) found:", level="INFO")
+            print_scan_records(records)
+            logging.info(json.dumps(records))
 
     except subprocess.CalledProcessError as e:
         log_and_print(f"Wi-Fi scan failed: {e}", level="ERROR")
@@ -109,17 +691,16 @@ def wifi_analyzer():
         if system == "windows":
             wifi_scan_windows()
         elif system == "linux":
-            command = ["termux-wifi-scaninfo"] if "com.termux" in os.environ.get("PREFIX", "") else ["iwlist", "scanning"]
+            command, backend = scan_command()
             log_and_print(f"Running command: {' '.join(command)}", level="INFO")
-            result = subprocess.run(command, check=True, capture_output=True, text=True)
-            output = result.stdout.strip()
+            records = list(stream_scan(command, backend))
 
-            if not output:
+            if not records:
                 log_and_print("No Wi-Fi networks found. Ensure Wi-Fi is enabled.", level="WARNING")
             else:
-                log_and_print("Wi-Fi networks found:", level="INFO")
-                print(Fore.GREEN + output + Style.RESET_ALL)
-                log_and_print(output, level="INFO")
+                log_and_print(f"{len(records)} BSSID(s) found:", level="INFO")
+                print_scan_records(records)
+                logging.info(json.dumps(records))
         else:
             log_and_print("Unsupported system for Wi-Fi scanning.", level="ERROR")
             sys.exit(1)
@@ -133,10 +714,39 @@ def wifi_analyzer():
 if __name__ == "__main__":
     log_and_print("Wi-Fi Analyzer script started.", level="INFO")
 
-    # Step 1: Detect environment and install dependencies
-    detect_environment_and_install()
+    print(Fore.CYAN + "1. Scan for Wi-Fi networks" + Style.RESET_ALL)
+    print(Fore.CYAN + "2. Parse a saved scan output file (iwlist, netsh or termux JSON)" + Style.RESET_ALL)
+    print(Fore.CYAN + "3. Benchmark the scan parsers on generated fixtures" + Style.RESET_ALL)
+    print(Fore.CYAN + "4. Survey mode (re-scan on an interval)" + Style.RESET_ALL)
+    print(Fore.CYAN + "5. Replay a recorded survey directory" + Style.RESET_ALL)
+    print(Fore.CYAN + "6. Benchmark survey replay and channel analytics" + Style.RESET_ALL)
+    choice = input(Fore.CYAN + "Select an option (1-6): " + Style.RESET_ALL).strip()
+
+    if choice == "2":
+        path = input(Fore.CYAN + "Path to the scan output: " + Style.RESET_ALL).strip()
+        try:
+            print_scan_records(parse_scan_file(path))
+        except (OSError, ValueError) as e:
+            log_and_print(f"Could not parse {path}: {e}", level="ERROR")
+    elif choice == "3":
+        benchmark_parsers()
+    elif choice == "4":
+        interval = input(Fore.CYAN + f"Seconds between scans [{SURVEY_INTERVAL:g}]: " + Style.RESET_ALL).strip()
+        record_dir = input(Fore.CYAN + "Directory to record raw scans in (blank for none): " + Style.RESET_ALL).strip()
+        run_survey(float(interval) if interval else SURVEY_INTERVAL, record_dir=record_dir or None)
+    elif choice == "5":
+        directory = input(Fore.CYAN + "Survey directory: " + Style.RESET_ALL).strip()
+        try:
+            replay_survey_directory(directory)
+        except (OSError, ValueError) as e:
+            log_and_print(f"Could not replay {directory}: {e}", level="ERROR")
+    elif choice == "6":
+        benchmark_survey()
+    else:
+        # Step 1: Detect environment and install dependencies
+        detect_environment_and_install()
 
-    # Step 2: Run Wi-Fi Analyzer
-    wifi_analyzer()
+        # Step 2: Run Wi-Fi Analyzer
+        wifi_analyzer()
 
     log_and_print("Wi-Fi Analyzer script finished.", level="INFO")